@@ -1,40 +1,62 @@
+from contextlib import asynccontextmanager
+
 from mcp.server.fastmcp import FastMCP
+from tools.utils._clients import (
+    ClientSettings,
+    FaceClientRegistry,
+    set_client_registry,
+)
 from tools.utils._enums import (
     CompareImagesConfig,
     CreateLPGConfig,
     EnrollFaceToLPGConfig,
+    EnrollBlobFoldersToLPGConfig,
     IdentifyFaceInLPGConfig,
+    IdentifyFaceInLPGsConfig,
     ListPersonsInLPGConfig,
+    SearchPersonsInLPGConfig,
     DeletePersonFromLPGConfig,
     DeleteFaceFromLPGConfig,
     DeleteLPGConfig,
     ListLPGConfig,
     OpensetFaceAttribConfig,
     AzureFaceAttribConfig,
+    BatchDetectFacesConfig,
     ListBlobFoldersConfig,
     ListPublicImageUrlsConfig,
     DownloadBlobFolderConfig,
+    ServerStatsConfig,
+    TrainingStatusConfig,
 )
 from tools.CompareImages import compare_source_image_to_target_image
 from tools.CreateLPG import create_large_person_group
 from tools.EnrollFaceToLPG import enroll_face_to_group
-from tools.IdentifyFaceInLPG import identify_face_from_group
+from tools.EnrollBlobFoldersToLPG import enroll_blob_folders_to_group
+from tools.IdentifyFaceInLPG import identify_face_from_group, identify_face_from_groups
 from tools.ListPersonsInLPG import list_persons_in_group
+from tools.SearchPersonsInLPG import search_persons_in_group
 from tools.DeleteFromLPG import delete_person_from_group, delete_face_from_group
 from tools.ListLPGs import list_large_person_groups
 from tools.DeleteLPG import delete_large_person_group
 from tools.OpensetFaceAttrib import get_face_openset_attrib
 from tools.AzureFaceAttrib import get_face_dect
+from tools.BatchDetectFaces import detect_faces_in_batch
 from tools.BlobFolderTools import (
     list_blob_folders_and_choose,
     list_public_image_urls,
     download_blob_folder_from_container,
 )
+from tools.ServerStats import get_server_stats
+from tools.TrainingStatus import get_group_training_status
+from tools.utils._training import get_training_scheduler
 
 
 class FaceMCPServer:
     def __init__(self):
-        self.mcp = FastMCP("azure_ai_face_api")
+        # Long-lived, pooled Face clients shared by every tool
+        self.clients = FaceClientRegistry(ClientSettings.from_env())
+        set_client_registry(self.clients)
+        self.mcp = FastMCP("azure_ai_face_api", lifespan=self._lifespan)
         self.mcp.add_tool(
             name=CompareImagesConfig.TOOL_NAME,
             description=CompareImagesConfig.TOOL_DESC,
@@ -55,11 +77,21 @@ class FaceMCPServer:
             description=IdentifyFaceInLPGConfig.TOOL_DESC,
             fn=identify_face_from_group,
         )
+        self.mcp.add_tool(
+            name=IdentifyFaceInLPGsConfig.TOOL_NAME,
+            description=IdentifyFaceInLPGsConfig.TOOL_DESC,
+            fn=identify_face_from_groups,
+        )
         self.mcp.add_tool(
             name=ListPersonsInLPGConfig.TOOL_NAME,
             description=ListPersonsInLPGConfig.TOOL_DESC,
             fn=list_persons_in_group,
         )
+        self.mcp.add_tool(
+            name=SearchPersonsInLPGConfig.TOOL_NAME,
+            description=SearchPersonsInLPGConfig.TOOL_DESC,
+            fn=search_persons_in_group,
+        )
         self.mcp.add_tool(
             name=DeletePersonFromLPGConfig.TOOL_NAME,
             description=DeletePersonFromLPGConfig.TOOL_DESC,
@@ -90,6 +122,11 @@ class FaceMCPServer:
             description=AzureFaceAttribConfig.TOOL_DESC,
             fn=get_face_dect,
         )
+        self.mcp.add_tool(
+            name=BatchDetectFacesConfig.TOOL_NAME,
+            description=BatchDetectFacesConfig.TOOL_DESC,
+            fn=detect_faces_in_batch,
+        )
         self.mcp.add_tool(
             name=ListBlobFoldersConfig.TOOL_NAME,
             description=ListBlobFoldersConfig.TOOL_DESC,
@@ -105,6 +142,29 @@ class FaceMCPServer:
             description=DownloadBlobFolderConfig.TOOL_DESC,
             fn=download_blob_folder_from_container,
         )
+        self.mcp.add_tool(
+            name=EnrollBlobFoldersToLPGConfig.TOOL_NAME,
+            description=EnrollBlobFoldersToLPGConfig.TOOL_DESC,
+            fn=enroll_blob_folders_to_group,
+        )
+        self.mcp.add_tool(
+            name=TrainingStatusConfig.TOOL_NAME,
+            description=TrainingStatusConfig.TOOL_DESC,
+            fn=get_group_training_status,
+        )
+        self.mcp.add_tool(
+            name=ServerStatsConfig.TOOL_NAME,
+            description=ServerStatsConfig.TOOL_DESC,
+            fn=get_server_stats,
+        )
+
+    @asynccontextmanager
+    async def _lifespan(self, server):
+        try:
+            yield
+        finally:
+            await get_training_scheduler().aclose()
+            await self.clients.aclose()
 
     def run(self):
         self.mcp.run(transport="stdio")
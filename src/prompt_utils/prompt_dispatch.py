@@ -1,3 +1,4 @@
+import asyncio
 from importlib import import_module
 from typing import Any, Callable
 from .prompt_parser import (
@@ -19,6 +20,24 @@ def _load_func(module_path: str, func_name: str) -> Callable[..., Any] | None:
         return None
 
 
+def run_tool(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run an async MCP tool from synchronous code, then start any pending group training
+    and close the pooled clients it opened.
+    """
+    from tools.utils._clients import get_client_registry
+    from tools.utils._training import get_training_scheduler
+
+    async def _run():
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            await get_training_scheduler().aclose()
+            await get_client_registry().aclose()
+
+    return asyncio.run(_run())
+
+
 def dispatch_prompt_detect(prompt: str) -> Any:
     """
     Parse the prompt and call tools.AzureFaceAttrib.get_face_dect(...)
@@ -28,7 +47,8 @@ def dispatch_prompt_detect(prompt: str) -> Any:
 
     fn = _load_func("tools.AzureFaceAttrib", "get_face_dect")
 
-    return fn(
+    return run_tool(
+        fn,
         file_path=intent.file_path,
         is_url=intent.is_url,
         return_HEAD_POSE=intent.return_HEAD_POSE,
@@ -47,7 +67,8 @@ def dispatch_prompt_compare(prompt: str) -> Any:
     intent: ParsedCompare = parse_prompt_for_compare(prompt)
     fn = _load_func("tools.CompareImages", "compare_source_image_to_target_image")
     print(f"Dispatching compare with: {intent}")
-    return fn(
+    return run_tool(
+        fn,
         source_image=intent.left,
         target_image=intent.right,
         comparison_mode="most_similar",
@@ -64,7 +85,8 @@ def dispatch_prompt_enroll(prompt: str) -> Any:
     """
     intent: ParsedEnroll = parse_prompt_for_enroll(prompt)
     fn = _load_func("tools.EnrollFaceToLPG", "enroll_face_to_group")
-    return fn(
+    return run_tool(
+        fn,
         file_path_list=intent.file_path_list,
         person_name=intent.person_name,
         group_uuid=intent.group_uuid,
@@ -1,19 +1,20 @@
-import os
-from typing import Annotated
+from typing import Annotated, Literal
 
-from azure.ai.vision.face import FaceClient
 from azure.ai.vision.face.models import (
     FaceAttributeType,
     FaceDetectionModel,
     FaceRecognitionModel,
 )
-from azure.core.credentials import AzureKeyCredential
 from pydantic import Field
 
+from .utils._clients import get_client_registry
+from .utils._detection_cache import detect_faces
 from .utils._enums import AzureFaceAttribConfig
+from .utils._face_format import format_faces
+from .utils._image_source import ImageSource
 
 
-def get_face_dect(
+async def get_face_dect(
     file_path: Annotated[str, Field(description=AzureFaceAttribConfig.ARGS_FILE_PATH)],
     is_url: Annotated[bool, Field(description=AzureFaceAttribConfig.ARGS_IS_URL)] = False,
     return_HEAD_POSE: Annotated[bool, Field(description=AzureFaceAttribConfig.ARGS_RETURN_HEAD_POSE)] = False,
@@ -25,11 +26,10 @@ def get_face_dect(
     return_QUALITY_FOR_RECOGNITION: Annotated[bool, Field(description=AzureFaceAttribConfig.ARGS_RETURN_QUALITY_FOR_RECOGNITION)] = False,
     return_AGE: Annotated[bool, Field(description=AzureFaceAttribConfig.ARGS_RETURN_AGE)] = False,
     return_landmarks: Annotated[bool, Field(description=AzureFaceAttribConfig.ARGS_RETURN_LANDMARKS)] = False,
+    output_format: Annotated[Literal["text", "json", "columnar"], Field(description=AzureFaceAttribConfig.ARGS_OUTPUT_FORMAT)] = "text",
 ):
     if file_path is None:
         return "The face api did not receive any image. Please provide an image."
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
     face_atributes = []
     if return_HEAD_POSE is True:
         face_atributes.append(FaceAttributeType.HEAD_POSE)
@@ -47,31 +47,23 @@ def get_face_dect(
         face_atributes.append(FaceAttributeType.QUALITY_FOR_RECOGNITION)
     if return_AGE is True:
         face_atributes.append(FaceAttributeType.AGE)
-    with FaceClient(
-        endpoint=ENDPOINT, credential=AzureKeyCredential(KEY),
-        headers = {"X-MS-AZSDK-Telemetry": "sample=mcp-face-detect-attr"}
-    ) as face_client:
-        if is_url is True:
-            detected_faces = face_client.detect_from_url(
-                url=file_path,
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
-                return_face_landmarks=return_landmarks,
-                return_face_attributes=face_atributes
-            )
-        else:
-            if os.path.exists(file_path) is False:
-                return "The client provided image does not exist in its path."
-            
-            detected_faces = face_client.detect(
-                image_content=open(file_path, "rb"),
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
-                return_face_landmarks=return_landmarks,
-                return_face_attributes=face_atributes
-            )
+    face_client = get_client_registry().face_client(
+        telemetry="sample=mcp-face-detect-attr"
+    )
+    async with ImageSource(file_path, is_url=is_url) as image:
+        if not image.ok:
+            return "The client provided image does not exist in its path."
+        detected_faces = await detect_faces(
+            face_client,
+            **image.face_source(),
+            detection_model=FaceDetectionModel.DETECTION03,
+            recognition_model=FaceRecognitionModel.RECOGNITION04,
+            return_face_id=True,
+            return_face_landmarks=return_landmarks,
+            return_face_attributes=face_atributes
+        )
+    if output_format != "text":
+        return format_faces(detected_faces, output_format, face_atributes)
     results = []
     for face in detected_faces:
         result = f"""
@@ -0,0 +1,236 @@
+import glob
+import os
+from collections import Counter
+from typing import Annotated, Literal
+from urllib.parse import quote
+
+from azure.ai.vision.face.models import (
+    FaceAttributeType,
+    FaceDetectionModel,
+    FaceRecognitionModel,
+)
+from mcp.server.fastmcp import Context
+from pydantic import Field
+
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._detection_cache import detect_faces
+from .utils._enums import BatchDetectFacesConfig
+from .utils._face_format import compact_face, flatten_fields
+from .utils._image_source import ImageSource
+from .utils._preprocess import IMAGE_EXTENSIONS
+from .utils._progress import log_message, report_progress
+
+# Flagged, face-less and failed images listed in the summary; the rest are only counted
+MAX_IMAGES_SHOWN = 50
+
+FaceAttributeName = Literal[
+    "headPose",
+    "glasses",
+    "occlusion",
+    "blur",
+    "exposure",
+    "mask",
+    "qualityForRecognition",
+    "age",
+]
+
+
+def _local_images(source: str, recursive: bool) -> list[str]:
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "**", "*") if recursive else os.path.join(source, "*")
+    else:
+        pattern = os.path.expanduser(source)
+    return sorted(
+        path
+        for path in glob.glob(pattern, recursive=True)
+        if path.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path)
+    )
+
+
+async def _blob_images(container_client, prefix: str, recursive: bool) -> list[str]:
+    names = []
+    async for blob in container_client.list_blobs(name_starts_with=prefix):
+        if not blob.name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        if not recursive and "/" in blob.name[len(prefix):]:
+            continue
+        names.append(blob.name)
+    return names
+
+
+def _parse_flag_rules(flag_if: list[str] | None) -> list[tuple[str, str]]:
+    rules = []
+    for rule in flag_if or []:
+        field, _, value = rule.partition("=")
+        if field.strip() and value.strip():
+            rules.append((field.strip(), value.strip()))
+    return rules
+
+
+def _value_text(value) -> str:
+    # JSON spelling for booleans, so 'mask.noseAndMouthCovered=false' matches
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def _shown(lines: list[str]) -> list[str]:
+    if len(lines) <= MAX_IMAGES_SHOWN:
+        return lines
+    return lines[:MAX_IMAGES_SHOWN] + [f"... and {len(lines) - MAX_IMAGES_SHOWN} more"]
+
+
+def summarize_detections(
+    results: list[tuple[str, list[dict] | Exception]], flag_rules: list[tuple[str, str]]
+) -> list[str]:
+    """
+    Aggregate per-image detection results (compacted faces, or the exception the image failed
+    with) into summary blocks: attribute value counts, numeric ranges and image lists.
+    """
+    value_counts: dict[str, Counter] = {}
+    numeric: dict[str, list[float]] = {}
+    flagged, without_faces, failed = [], [], []
+    num_faces = 0
+    for image, faces in results:
+        if isinstance(faces, Exception):
+            failed.append(f"- {image}: {faces}")
+            continue
+        if not faces:
+            without_faces.append(f"- {image}")
+            continue
+        num_faces += len(faces)
+        matches = Counter()
+        for face in faces:
+            fields = flatten_fields(face.get("faceAttributes", {}))
+            for field, value in fields.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numeric.setdefault(field, []).append(float(value))
+                else:
+                    value_counts.setdefault(field, Counter())[_value_text(value)] += 1
+            for field, value in flag_rules:
+                if field in fields and _value_text(fields[field]).lower() == value.lower():
+                    matches[f"{field}={_value_text(fields[field])}"] += 1
+        if matches:
+            reasons = ", ".join(f"{count} face(s) with {match}" for match, count in matches.items())
+            flagged.append(f"- {image}: {reasons}")
+
+    blocks = []
+    if value_counts or numeric:
+        lines = [f"Attribute summary over {num_faces} face(s):"]
+        for field in sorted(value_counts):
+            counts = ", ".join(f"{value}={count}" for value, count in value_counts[field].most_common())
+            lines.append(f"- {field}: {counts}")
+        for field in sorted(numeric):
+            values = numeric[field]
+            lines.append(
+                f"- {field}: min={min(values):.2f}, mean={sum(values) / len(values):.2f}, max={max(values):.2f}"
+            )
+        blocks.append("\n".join(lines))
+    if flag_rules:
+        rules = ", ".join(f"{field}={value}" for field, value in flag_rules)
+        blocks.append(
+            "\n".join([f"Flagged {len(flagged)} image(s) matching {rules}:", *_shown(flagged)])
+        )
+    if without_faces:
+        blocks.append("\n".join(["Images without faces:", *_shown(without_faces)]))
+    if failed:
+        blocks.append("\n".join(["Failed images:", *_shown(failed)]))
+    return blocks
+
+
+async def detect_faces_in_batch(
+    source: Annotated[str, Field(description=BatchDetectFacesConfig.ARGS_SOURCE)],
+    is_blob: Annotated[bool, Field(description=BatchDetectFacesConfig.ARGS_IS_BLOB)] = False,
+    attributes: Annotated[
+        list[FaceAttributeName] | None, Field(description=BatchDetectFacesConfig.ARGS_ATTRIBUTES)
+    ] = None,
+    flag_if: Annotated[list[str] | None, Field(description=BatchDetectFacesConfig.ARGS_FLAG_IF)] = None,
+    recursive: Annotated[bool, Field(description=BatchDetectFacesConfig.ARGS_RECURSIVE)] = False,
+    max_images: Annotated[int, Field(description=BatchDetectFacesConfig.ARGS_MAX_IMAGES, ge=1, le=10000)] = 1000,
+    ctx: Context | None = None,
+) -> str:
+    """
+    Runs face detection over every image of a local directory, glob or blob folder prefix and
+    returns an aggregated summary, reporting progress as images finish.
+    """
+    registry = get_client_registry()
+    if is_blob:
+        account = os.getenv("AZURE_STORAGE_ACCOUNT")
+        container = os.getenv("AZURE_STORAGE_CONTAINER")
+        sas_token = os.getenv("AZURE_STORAGE_SAS_TOKEN")
+        if not all([account, container, sas_token]):
+            return "Missing required environment variables: AZURE_STORAGE_ACCOUNT, AZURE_STORAGE_CONTAINER, AZURE_STORAGE_SAS_TOKEN"
+        account_url = f"https://{account}.blob.core.windows.net"
+        container_client = registry.container_client(account_url, container, sas_token)
+        prefix = source.strip("/") + "/" if source.strip("/") else ""
+        names = await _blob_images(container_client, prefix, recursive)
+        images = [
+            (name, f"{account_url}/{container}/{quote(name, safe='/')}?{sas_token}")
+            for name in names
+        ]
+    else:
+        images = [(path, path) for path in _local_images(source, recursive)]
+    if not images:
+        return BatchDetectFacesConfig.RESULT_NO_IMAGES.format(source=source)
+    num_found = len(images)
+    images = images[:max_images]
+
+    face_attributes = [FaceAttributeType(name) for name in (attributes or ["mask", "glasses"])]
+    face_client = registry.face_client(telemetry="sample=mcp-face-detect-batch")
+    done = 0
+
+    async def _detect(image: str, location: str):
+        nonlocal done
+        try:
+            async with ImageSource(location, is_url=is_blob) as image_source:
+                if not image_source.ok:
+                    raise FileNotFoundError("image file does not exist")
+                faces = await detect_faces(
+                    face_client,
+                    **image_source.face_source(),
+                    detection_model=FaceDetectionModel.DETECTION03,
+                    recognition_model=FaceRecognitionModel.RECOGNITION04,
+                    return_face_id=False,
+                    return_face_attributes=face_attributes,
+                )
+            result = [compact_face(face, face_attributes) for face in faces]
+        except Exception as e:
+            result = e
+        done += 1
+        if isinstance(result, Exception):
+            # Only failures are logged; a log line per image would flood the client on large folders
+            message = BatchDetectFacesConfig.PROGRESS_FAILED.format(
+                image=image, error=result, done=done, total=len(images)
+            )
+            await report_progress(ctx, done, len(images), message, log_level="warning")
+        else:
+            message = BatchDetectFacesConfig.PROGRESS.format(
+                num_faces=len(result), image=image, done=done, total=len(images)
+            )
+            await report_progress(ctx, done, len(images), message, log_level=None)
+        return image, result
+
+    results = await gather_bounded(
+        (_detect(image, location) for image, location in images),
+        registry.settings.max_concurrency,
+    )
+    num_with_faces = sum(1 for _, faces in results if not isinstance(faces, Exception) and faces)
+    num_failed = sum(1 for _, faces in results if isinstance(faces, Exception))
+    output_list = [
+        BatchDetectFacesConfig.RESULT_SUMMARY.format(
+            num_images=len(images),
+            source=source,
+            num_faces=sum(len(faces) for _, faces in results if not isinstance(faces, Exception)),
+            num_with_faces=num_with_faces,
+            num_without_faces=len(images) - num_with_faces - num_failed,
+            num_failed=num_failed,
+        )
+    ]
+    if num_found > len(images):
+        output_list.append(
+            BatchDetectFacesConfig.RESULT_TRUNCATED.format(
+                max_images=max_images, num_found=num_found
+            )
+        )
+    await log_message(ctx, "info", output_list[0])
+    output_list.extend(summarize_detections(results, _parse_flag_rules(flag_if)))
+    return "\n---\n".join(output_list)
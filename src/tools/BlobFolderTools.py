@@ -1,19 +1,36 @@
+import contextlib
 import os
+import tempfile
+from urllib.parse import quote
 
-from azure.storage.blob import ContainerClient
+from azure.core import MatchConditions
 
+from .utils._blob_listing import list_blob_page
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
 from .utils._enums import (
     ListBlobFoldersConfig,
     ListPublicImageUrlsConfig,
     DownloadBlobFolderConfig,
 )
-from typing import Annotated, Dict, List
+from .utils._preprocess import IMAGE_EXTENSIONS
+from typing import Annotated, Dict, List, Optional
 from pydantic import Field
 
+# Downloaded and failed files listed in the result; the rest are only counted
+MAX_FILES_SHOWN = 50
 
-def list_blob_folders_and_choose() -> str:
+
+async def list_blob_folders_and_choose(
+    page_size: Annotated[
+        int, Field(description=ListBlobFoldersConfig.ARGS_PAGE_SIZE, ge=1, le=5000)
+    ] = 100,
+    cursor: Annotated[
+        Optional[str], Field(description=ListBlobFoldersConfig.ARGS_CURSOR)
+    ] = None,
+) -> str:
     """
-    Lists all top-level folders (virtual directories) in the Azure Blob container and asks the user to choose one for enrollment.
+    Lists the top-level folders (virtual directories) in the Azure Blob container, one page at a time, and asks the user to choose one for enrollment.
     """
     account = os.getenv("AZURE_STORAGE_ACCOUNT")
     container = os.getenv("AZURE_STORAGE_CONTAINER")
@@ -23,33 +40,44 @@ def list_blob_folders_and_choose() -> str:
         return "Missing required environment variables: AZURE_STORAGE_ACCOUNT, AZURE_STORAGE_CONTAINER, AZURE_STORAGE_SAS_TOKEN"
 
     account_url = f"https://{account}.blob.core.windows.net"
-    container_client = ContainerClient(
-        account_url, container_name=container, credential=sas_token
+    container_client = get_client_registry().container_client(
+        account_url, container, sas_token
     )
 
-    blob_list = container_client.walk_blobs(delimiter="/")
-    folders = [b.name.rstrip("/") for b in blob_list if b.name.endswith("/")]
-
-    if not folders:
+    page = await list_blob_page(container_client, "", page_size, cursor, folders=True)
+    output = []
+    if page.names:
+        folder_list_str = "\n".join(f"- {folder}" for folder in page.names)
+        output.append(
+            ListBlobFoldersConfig.PROMPT_CHOOSE_FOLDER.format(
+                folder_list=folder_list_str
+            )
+        )
+    if page.next_cursor:
+        output.append(ListBlobFoldersConfig.RESULT_MORE.format(cursor=page.next_cursor))
+    if not output:
         return "No folders found in the container."
-
-    folder_list_str = "\n".join(f"- {folder}" for folder in folders)
-    return ListBlobFoldersConfig.PROMPT_CHOOSE_FOLDER.format(
-        folder_list=folder_list_str
-    )
+    return "\n".join(output)
 
 
-def list_public_image_urls(
+async def list_public_image_urls(
     folder_name: Annotated[
         str, Field(description=ListPublicImageUrlsConfig.ARGS_FOLDER_NAME)
     ],
-) -> Dict[str, List[dict] | str]:
+    page_size: Annotated[
+        int, Field(description=ListPublicImageUrlsConfig.ARGS_PAGE_SIZE, ge=1, le=5000)
+    ] = 200,
+    cursor: Annotated[
+        Optional[str], Field(description=ListPublicImageUrlsConfig.ARGS_CURSOR)
+    ] = None,
+) -> Dict[str, List[str] | str | int | None]:
     """
-    Return FULL, shareable image URLs under `folder_name`, **always with SAS token appended**.
+    Return FULL, shareable image URLs under `folder_name`, **always with SAS token appended**, one page at a time.
 
     Assistant instructions:
     - Show these URLs **verbatim** to the user (do not mask/shorten/remove query params).
     - Prefer code formatting so UIs don't truncate the query string.
+    - If `next_cursor` is set, more images exist; pass it as `cursor` to get the next page.
     """
     account = os.getenv("AZURE_STORAGE_ACCOUNT")
     container = os.getenv("AZURE_STORAGE_CONTAINER")
@@ -61,23 +89,69 @@ def list_public_image_urls(
         ]
 
     account_url = f"https://{account}.blob.core.windows.net"
-    container_client = ContainerClient(
-        account_url, container_name=container, credential=sas_token
+    container_client = get_client_registry().container_client(
+        account_url, container, sas_token
     )
 
-    blobs = container_client.list_blobs(name_starts_with=folder_name + "/")
-    items: List[dict] = []
-    for blob in blobs:
-        if blob.name.endswith("/"):
-            continue
-        # Construct the public URL (with SAS token if needed)
-        url = f"{account_url}/{container}/{blob.name}?{sas_token}"
-        entry = {"name": blob.name, "url_with_token": url}
-        items.append(entry)
-    return {"items": items, "urls_txt": "\n".join(i["url_with_token"] for i in items)}
+    page = await list_blob_page(
+        container_client,
+        folder_name.rstrip("/") + "/",
+        page_size,
+        cursor,
+        suffixes=IMAGE_EXTENSIONS,
+    )
+    # Construct the public URL (with SAS token if needed); the blob name is part of it
+    urls = [
+        f"{account_url}/{container}/{quote(name, safe='/')}?{sas_token}"
+        for name in page.names
+    ]
+    return {"count": len(urls), "urls": urls, "next_cursor": page.next_cursor}
+
+
+def _shown(lines: List[str]) -> str:
+    if len(lines) > MAX_FILES_SHOWN:
+        lines = lines[:MAX_FILES_SHOWN] + [f"... and {len(lines) - MAX_FILES_SHOWN} more"]
+    return "\n".join(lines)
+
+
+def _is_current(local_path: str, blob) -> bool:
+    # Downloaded files get the blob's Last-Modified time, which changes with its ETag
+    try:
+        stat = os.stat(local_path)
+    except FileNotFoundError:
+        return False
+    return stat.st_size == blob.size and int(stat.st_mtime) == int(
+        blob.last_modified.timestamp()
+    )
 
 
-def download_blob_folder_from_container(
+async def _download_blob(container_client, blob, local_path: str) -> None:
+    """
+    Stream a blob to a temporary file next to local_path and rename it into place, so an
+    interrupted download never leaves a partial file behind.
+    """
+    directory = os.path.dirname(local_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + os.path.basename(local_path), suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # Fails instead of mixing versions if the blob is overwritten mid-download
+            downloader = await container_client.download_blob(
+                blob.name, etag=blob.etag, match_condition=MatchConditions.IfNotModified
+            )
+            await downloader.readinto(f)
+        modified = blob.last_modified.timestamp()
+        os.utime(temp_path, (modified, modified))
+        os.replace(temp_path, local_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+
+async def download_blob_folder_from_container(
     folder_name: Annotated[
         str, Field(description=DownloadBlobFolderConfig.ARGS_FOLDER_NAME)
     ],
@@ -87,7 +161,8 @@ def download_blob_folder_from_container(
 ) -> str:
     """
     Downloads all blobs (files) from the specified folder in the Azure Blob container to a local directory,
-    preserving the same subfolder structure as in the storage.
+    preserving the same subfolder structure as in the storage. Blobs are streamed to disk concurrently,
+    and files already downloaded with the same size and modification time are skipped.
     """
     account = os.getenv("AZURE_STORAGE_ACCOUNT")
     container = os.getenv("AZURE_STORAGE_CONTAINER")
@@ -97,29 +172,51 @@ def download_blob_folder_from_container(
         return "Missing required environment variables: AZURE_STORAGE_ACCOUNT, AZURE_STORAGE_CONTAINER, AZURE_STORAGE_SAS_TOKEN"
 
     account_url = f"https://{account}.blob.core.windows.net"
-    container_client = ContainerClient(
-        account_url, container_name=container, credential=sas_token
+    container_client = get_client_registry().container_client(
+        account_url, container, sas_token
     )
 
-    blobs = container_client.list_blobs(name_starts_with=folder_name + "/")
-    downloaded_files = []
-    for blob in blobs:
-        if blob.name.endswith("/"):
-            continue
-        normalized_folder = folder_name.rstrip("/") + "/"
-        rel_path = blob.name[len(normalized_folder) :]
-        local_path = os.path.join(local_dir, rel_path)
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        with open(local_path, "wb") as f:
-            data = container_client.download_blob(blob.name)
-            f.write(data.readall())
-        downloaded_files.append(local_path)
-
-    if not downloaded_files:
+    normalized_folder = folder_name.rstrip("/") + "/"
+    blobs = [
+        blob
+        async for blob in container_client.list_blobs(name_starts_with=normalized_folder)
+        if not blob.name.endswith("/")
+    ]
+    if not blobs:
         return f"No files found in folder '{folder_name}'."
-    return DownloadBlobFolderConfig.RESULT_SUCCESS.format(
-        num_files=len(downloaded_files),
-        folder_name=folder_name,
-        local_dir=local_dir,
-        file_list="\n".join(downloaded_files),
+
+    async def _sync(blob):
+        local_path = os.path.join(local_dir, blob.name[len(normalized_folder) :])
+        if _is_current(local_path, blob):
+            return local_path, None
+        try:
+            await _download_blob(container_client, blob, local_path)
+        except Exception as e:
+            return local_path, e
+        return local_path, True
+
+    results = await gather_bounded(
+        (_sync(blob) for blob in blobs),
+        get_client_registry().settings.blob_max_concurrency,
     )
+    downloaded_files = [path for path, result in results if result is True]
+    failed_files = [f"{path}: {result}" for path, result in results if isinstance(result, Exception)]
+    output = [
+        DownloadBlobFolderConfig.RESULT_SUCCESS.format(
+            num_files=len(downloaded_files),
+            folder_name=folder_name,
+            local_dir=local_dir,
+            num_skipped=sum(1 for _, result in results if result is None),
+        )
+    ]
+    if downloaded_files:
+        output.append(
+            DownloadBlobFolderConfig.RESULT_FILES.format(file_list=_shown(downloaded_files))
+        )
+    if failed_files:
+        output.append(
+            DownloadBlobFolderConfig.RESULT_FAILED.format(
+                num_failed=len(failed_files), file_list=_shown(failed_files)
+            )
+        )
+    return "\n".join(output)
@@ -1,33 +1,33 @@
-import os
 import uuid
 
-from azure.ai.vision.face import FaceAdministrationClient
 from azure.ai.vision.face.models import FaceRecognitionModel
-from azure.core.credentials import AzureKeyCredential
 
+from .utils._clients import get_client_registry
+from .utils._group_index import get_group_index
 
-def create_large_person_group(group_id=None):
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
+
+async def create_large_person_group(group_id=None):
     group_uuid = group_id if group_id else str(uuid.uuid4())
 
-    with FaceAdministrationClient(
-        endpoint=ENDPOINT,
-        credential=AzureKeyCredential(KEY),
-        headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-create-lpg"},
-    ) as face_admin_client:
-        # Check if the group already exists
-        try:
-            face_admin_client.large_person_group.get(large_person_group_id=group_uuid)
-            return f"Large person group with UUID: {group_uuid} already exists."
-        except Exception as e:
-            # If not found, create it
-            if "ResourceNotFound" in str(e) or "not found" in str(e).lower():
-                face_admin_client.large_person_group.create(
-                    large_person_group_id=group_uuid,
-                    name=group_uuid,
-                    recognition_model=FaceRecognitionModel.RECOGNITION04,
-                )
-                return f"Created a large person group with UUID: {group_uuid} successfully."
-            else:
-                raise
+    face_admin_client = get_client_registry().face_admin_client(
+        telemetry="sample=mcp-face-reco-create-lpg"
+    )
+    # Check if the group already exists
+    try:
+        group = await face_admin_client.large_person_group.get(
+            large_person_group_id=group_uuid
+        )
+        get_group_index().upsert_group(group_uuid, group.name, group.user_data)
+        return f"Large person group with UUID: {group_uuid} already exists."
+    except Exception as e:
+        # If not found, create it
+        if "ResourceNotFound" in str(e) or "not found" in str(e).lower():
+            await face_admin_client.large_person_group.create(
+                large_person_group_id=group_uuid,
+                name=group_uuid,
+                recognition_model=FaceRecognitionModel.RECOGNITION04,
+            )
+            get_group_index().upsert_group(group_uuid, group_uuid)
+            return f"Created a large person group with UUID: {group_uuid} successfully."
+        else:
+            raise
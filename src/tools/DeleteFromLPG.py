@@ -1,11 +1,11 @@
-import os
 from typing import Annotated
 
-from azure.ai.vision.face import FaceAdministrationClient
-from azure.core.credentials import AzureKeyCredential
 from pydantic import Field
 
+from .utils._clients import get_client_registry
 from .utils._enums import DeletePersonFromLPGConfig, DeleteFaceFromLPGConfig
+from .utils._group_index import get_group_index
+from .utils._training import get_training_scheduler
 
 # Keep pending confirmations here
 _PENDING_DELETES: dict[str, bool] = {}
@@ -14,7 +14,7 @@ _PENDING_DELETES: dict[str, bool] = {}
 _CONFIRM_WORD = "YES_DELETE"
 
 
-def delete_person_from_group(
+async def delete_person_from_group(
     person_id: Annotated[str, Field(DeletePersonFromLPGConfig.ARGS_PERSON_ID)],
     group_uuid: Annotated[
         str, Field(description=DeletePersonFromLPGConfig.ARGS_GROUP_UUID)
@@ -46,30 +46,28 @@ def delete_person_from_group(
     # Passed confirmation → perform deletion
     _PENDING_DELETES.pop(key, None)
 
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
     output_list = []
 
-    with FaceAdministrationClient(
-        endpoint=ENDPOINT,
-        credential=AzureKeyCredential(KEY),
-        headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-delete"},
-    ) as face_admin_client:
-        try:
-            face_admin_client.large_person_group.delete_person(
-                large_person_group_id=group_uuid, person_id=person_id
-            )
-            output_list.append(
-                f"Deleted person with ID: {person_id} from group: {group_uuid}"
-            )
-        except Exception as e:
-            output_list.append(
-                f"Failed to delete person with ID: {person_id} from group: {group_uuid}. Error: {str(e)}"
-            )
+    face_admin_client = get_client_registry().face_admin_client(
+        telemetry="sample=mcp-face-reco-delete"
+    )
+    try:
+        await face_admin_client.large_person_group.delete_person(
+            large_person_group_id=group_uuid, person_id=person_id
+        )
+        get_training_scheduler().mark_dirty(group_uuid)
+        get_group_index().delete_person(group_uuid, person_id)
+        output_list.append(
+            f"Deleted person with ID: {person_id} from group: {group_uuid}"
+        )
+    except Exception as e:
+        output_list.append(
+            f"Failed to delete person with ID: {person_id} from group: {group_uuid}. Error: {str(e)}"
+        )
     return "\n".join(output_list)
 
 
-def delete_face_from_group(
+async def delete_face_from_group(
     face_id: Annotated[str, Field(DeleteFaceFromLPGConfig.ARGS_FACE_ID)],
     person_id: Annotated[str, Field(DeleteFaceFromLPGConfig.ARGS_PERSON_ID)],
     group_uuid: Annotated[
@@ -102,26 +100,24 @@ def delete_face_from_group(
     # Passed confirmation → perform deletion
     _PENDING_DELETES.pop(key, None)
 
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
     output_list = []
 
-    with FaceAdministrationClient(
-        endpoint=ENDPOINT,
-        credential=AzureKeyCredential(KEY),
-        headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-delete"},
-    ) as face_admin_client:
-        try:
-            face_admin_client.large_person_group.delete_face(
-                large_person_group_id=group_uuid,
-                person_id=person_id,
-                persisted_face_id=face_id,
-            )
-            output_list.append(
-                f"Deleted face with ID: {face_id} from person ID: {person_id} in group: {group_uuid}"
-            )
-        except Exception as e:
-            output_list.append(
-                f"Failed to delete face with ID: {face_id} from person ID: {person_id} in group: {group_uuid}. Error: {str(e)}"
-            )
+    face_admin_client = get_client_registry().face_admin_client(
+        telemetry="sample=mcp-face-reco-delete"
+    )
+    try:
+        await face_admin_client.large_person_group.delete_face(
+            large_person_group_id=group_uuid,
+            person_id=person_id,
+            persisted_face_id=face_id,
+        )
+        get_training_scheduler().mark_dirty(group_uuid)
+        get_group_index().delete_face(group_uuid, person_id, face_id)
+        output_list.append(
+            f"Deleted face with ID: {face_id} from person ID: {person_id} in group: {group_uuid}"
+        )
+    except Exception as e:
+        output_list.append(
+            f"Failed to delete face with ID: {face_id} from person ID: {person_id} in group: {group_uuid}. Error: {str(e)}"
+        )
     return "\n".join(output_list)
@@ -1,11 +1,11 @@
-import os
 from typing import Annotated
 
-from azure.ai.vision.face import FaceAdministrationClient
-from azure.core.credentials import AzureKeyCredential
 from pydantic import Field
 
+from .utils._clients import get_client_registry
 from .utils._enums import DeleteLPGConfig
+from .utils._group_index import get_group_index
+from .utils._training import get_training_scheduler
 
 # In-memory map to track if a group needs confirmation
 _PENDING_DELETES = {}
@@ -14,7 +14,7 @@ _PENDING_DELETES = {}
 _CONFIRM_WORD = "YES_DELETE"
 
 
-def delete_large_person_group(
+async def delete_large_person_group(
     group_uuid: Annotated[str, Field(description=DeleteLPGConfig.ARGS_GROUP_UUID)],
     confirm_text: Annotated[
         str, Field(description=f"Type exactly '{_CONFIRM_WORD}' to confirm deletion")
@@ -41,21 +41,20 @@ def delete_large_person_group(
     # Passed confirmation → perform deletion
     _PENDING_DELETES.pop(group_uuid, None)
 
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
-
-    with FaceAdministrationClient(
-        endpoint=ENDPOINT,
-        credential=AzureKeyCredential(KEY),
-        headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-delete-lpg"},
-    ) as face_admin_client:
-        try:
-            face_admin_client.large_person_group.delete(
-                large_person_group_id=group_uuid
-            )
-            return f"Deleted large person group with UUID: {group_uuid} successfully."
-        except Exception as e:
-            if "ResourceNotFound" in str(e) or "not found" in str(e).lower():
-                return f"Large person group with UUID: {group_uuid} does not exist."
-            else:
-                raise
+
+    face_admin_client = get_client_registry().face_admin_client(
+        telemetry="sample=mcp-face-reco-delete-lpg"
+    )
+    try:
+        await face_admin_client.large_person_group.delete(
+            large_person_group_id=group_uuid
+        )
+        get_training_scheduler().forget(group_uuid)
+        get_group_index().delete_group(group_uuid)
+        return f"Deleted large person group with UUID: {group_uuid} successfully."
+    except Exception as e:
+        if "ResourceNotFound" in str(e) or "not found" in str(e).lower():
+            get_group_index().delete_group(group_uuid)
+            return f"Large person group with UUID: {group_uuid} does not exist."
+        else:
+            raise
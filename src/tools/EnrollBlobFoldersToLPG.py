@@ -0,0 +1,232 @@
+import asyncio
+import os
+from typing import Annotated
+from urllib.parse import quote
+
+import aiohttp
+from azure.core.exceptions import AzureError
+from mcp.server.fastmcp import Context
+from pydantic import Field
+
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._enrollment import enroll_image
+from .utils._enums import EnrollBlobFoldersToLPGConfig, EnrollFaceToLPGConfig
+from .utils._group_index import get_group_index
+from .utils._preprocess import IMAGE_EXTENSIONS
+from .utils._progress import report_progress
+from .utils._training import get_training_scheduler
+
+
+async def _enroll_person_folder(
+    container_client,
+    blob_url_prefix: str,
+    sas_token: str,
+    folder: str,
+    UUID: str,
+    check_quality: bool,
+    image_slots: asyncio.Semaphore,
+    face_client,
+    face_admin_client,
+) -> tuple[list[str], int, int]:
+    """
+    Enroll one person folder; returns its output lines, the number of faces added and the
+    number of images found. Images are enrolled while the folder is still being listed.
+    Failures are reported as output lines, keeping the faces that were added.
+    """
+    person_name = folder.rstrip("/").split("/")[-1]
+    person_task = None
+    image_urls = []
+    image_tasks = []
+    errors = []
+
+    async def _bounded(url: str):
+        async with image_slots:
+            return await enroll_image(
+                url,
+                person_task,
+                person_name,
+                UUID,
+                True,
+                check_quality,
+                face_client,
+                face_admin_client,
+            )
+
+    try:
+        async for blob in container_client.list_blobs(name_starts_with=folder):
+            if not blob.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if person_task is None:
+                # Only create the person once the folder is known to contain an image
+                person_task = asyncio.create_task(
+                    face_admin_client.large_person_group.create_person(
+                        large_person_group_id=UUID,
+                        name=person_name,
+                    )
+                )
+            url = f"{blob_url_prefix}/{quote(blob.name, safe='/')}?{sas_token}"
+            image_urls.append(url)
+            image_tasks.append(asyncio.create_task(_bounded(url)))
+    except (AzureError, aiohttp.ClientError, OSError) as e:
+        errors.append(
+            EnrollBlobFoldersToLPGConfig.RESULT_FOLDER_FAILED.format(folder=folder, error=e)
+        )
+    if person_task is None:
+        if not errors:
+            errors.append(EnrollBlobFoldersToLPGConfig.RESULT_NO_IMAGES.format(folder=folder))
+        return errors, 0, 0
+    try:
+        image_results = await asyncio.gather(*image_tasks, return_exceptions=True)
+    except BaseException:
+        for task in image_tasks:
+            task.cancel()
+        raise
+    added_faces = 0
+    image_output_lines = []
+    # Only report the images that were skipped; successful adds are summarised below
+    for url, result in zip(image_urls, image_results):
+        if isinstance(result, BaseException):
+            image_output_lines.append(
+                f"Image file: {url} could not be enrolled: {result}. Ignoring this image."
+            )
+        elif result[1]:
+            added_faces += 1
+        else:
+            image_output_lines.extend(result[0])
+    try:
+        new_person = await person_task
+    except (AzureError, aiohttp.ClientError, OSError) as e:
+        errors.append(
+            EnrollBlobFoldersToLPGConfig.RESULT_FOLDER_FAILED.format(folder=folder, error=e)
+        )
+        # No person, so no faces were added and the folder does not count as enrolled
+        return errors, 0, 0
+    get_group_index().upsert_person(UUID, new_person.person_id, person_name)
+    output_list = [
+        EnrollBlobFoldersToLPGConfig.RESULT_PERSON.format(
+            person_name=person_name,
+            person_id=new_person.person_id,
+            folder=folder,
+            num_faces=added_faces,
+            num_images=len(image_tasks),
+            group_uuid=UUID,
+        )
+    ]
+    return output_list + errors + image_output_lines, added_faces, len(image_tasks)
+
+
+async def enroll_blob_folders_to_group(
+    group_uuid: Annotated[
+        str, Field(description=EnrollBlobFoldersToLPGConfig.ARGS_GROUP_UUID)
+    ],
+    parent_folder: Annotated[
+        str, Field(description=EnrollBlobFoldersToLPGConfig.ARGS_PARENT_FOLDER)
+    ] = "",
+    folder_names: Annotated[
+        list[str] | None,
+        Field(description=EnrollBlobFoldersToLPGConfig.ARGS_FOLDER_NAMES),
+    ] = None,
+    check_quality: Annotated[
+        bool, Field(description=EnrollBlobFoldersToLPGConfig.ARGS_CHECK_QUALITY)
+    ] = True,
+    ctx: Context | None = None,
+) -> str:
+    """
+    Enrolls every person folder under `parent_folder` in the Azure Blob container into the
+    large person group, streaming blob SAS URLs straight into enrollment.
+    """
+    account = os.getenv("AZURE_STORAGE_ACCOUNT")
+    container = os.getenv("AZURE_STORAGE_CONTAINER")
+    sas_token = os.getenv("AZURE_STORAGE_SAS_TOKEN")
+
+    if not all([account, container, sas_token]):
+        return "Missing required environment variables: AZURE_STORAGE_ACCOUNT, AZURE_STORAGE_CONTAINER, AZURE_STORAGE_SAS_TOKEN"
+
+    UUID = group_uuid
+    account_url = f"https://{account}.blob.core.windows.net"
+    registry = get_client_registry()
+    container_client = registry.container_client(account_url, container, sas_token)
+    face_admin_client = registry.face_admin_client(
+        telemetry="sample=mcp-face-reco-enroll-blob"
+    )
+    face_client = registry.face_client(
+        telemetry="sample=mcp-face-reco-detect-for-enroll-blob"
+    )
+
+    prefix = parent_folder.strip("/") + "/" if parent_folder.strip("/") else ""
+    wanted = {name.strip("/") for name in folder_names} if folder_names else None
+    folders = []
+    async for item in container_client.walk_blobs(name_starts_with=prefix, delimiter="/"):
+        if not item.name.endswith("/"):
+            continue
+        if wanted is not None and item.name[len(prefix):].rstrip("/") not in wanted:
+            continue
+        folders.append(item.name)
+    if not folders:
+        return EnrollBlobFoldersToLPGConfig.RESULT_NO_FOLDERS.format(
+            parent_folder=parent_folder
+        )
+
+    # One cap on in-flight images shared by all persons, so folder concurrency does not multiply it
+    max_concurrency = registry.settings.max_concurrency
+    image_slots = asyncio.Semaphore(max_concurrency)
+    done = 0
+    added_faces = 0
+
+    async def _enroll_and_report(folder: str):
+        nonlocal done, added_faces
+        result = await _enroll_person_folder(
+            container_client,
+            f"{account_url}/{container}",
+            sas_token,
+            folder,
+            UUID,
+            check_quality,
+            image_slots,
+            face_client,
+            face_admin_client,
+        )
+        added_faces += result[1]
+        done += 1
+        await report_progress(
+            ctx,
+            done,
+            len(folders),
+            EnrollBlobFoldersToLPGConfig.PROGRESS.format(
+                num_faces=result[1],
+                num_images=result[2],
+                person_name=folder.rstrip("/").split("/")[-1],
+                done=done,
+                total=len(folders),
+            ),
+        )
+        return result
+
+    try:
+        folder_results = await gather_bounded(
+            (_enroll_and_report(folder) for folder in folders), max_concurrency
+        )
+    finally:
+        if added_faces > 0:
+            # The whole import is trained once, after the last folder has been enrolled,
+            # also covering the faces added before an unexpected error
+            get_training_scheduler().mark_dirty(UUID, mutations=added_faces)
+    output_list = []
+    num_persons = 0
+    for folder_output_list, _, num_images in folder_results:
+        output_list.extend(folder_output_list)
+        num_persons += num_images > 0
+    output_list.append(
+        EnrollBlobFoldersToLPGConfig.RESULT_SUMMARY.format(
+            num_faces=added_faces,
+            num_persons=num_persons,
+            num_folders=len(folders),
+            group_uuid=UUID,
+        )
+    )
+    if added_faces > 0:
+        output_list.append(
+            EnrollFaceToLPGConfig.TRAINING_SCHEDULED.format(group_uuid=UUID)
+        )
+    return "\n---\n".join(output_list)
@@ -1,22 +1,17 @@
-import os
+import asyncio
 from typing import Annotated
-import json
-import requests
 
-from azure.ai.vision.face import FaceAdministrationClient, FaceClient
-from azure.ai.vision.face.models import (
-    FaceAttributeTypeRecognition04,
-    FaceDetectionModel,
-    FaceRecognitionModel,
-    QualityForRecognition,
-)
-from azure.core.credentials import AzureKeyCredential
 from pydantic import Field
 
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._enrollment import enroll_image
 from .utils._enums import EnrollFaceToLPGConfig
+from .utils._group_index import get_group_index
+from .utils._training import get_training_scheduler
 
 
-def enroll_face_to_group(
+async def enroll_face_to_group(
     file_path_list: Annotated[
         list, Field(description=EnrollFaceToLPGConfig.ARGS_FILE_PATH_LIST)
     ],
@@ -33,161 +28,60 @@ def enroll_face_to_group(
         bool, Field(description=EnrollFaceToLPGConfig.ARGS_CHECK_QUALITY)
     ] = True,
 ):
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
     UUID = group_uuid
     output_list = []
-    with (
-        FaceAdministrationClient(
-            endpoint=ENDPOINT,
-            credential=AzureKeyCredential(KEY),
-            headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-enroll"},
-        ) as face_admin_client,
-        FaceClient(
-            endpoint=ENDPOINT,
-            credential=AzureKeyCredential(KEY),
-            headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-detect-for-enroll"},
-        ) as face_client,
-    ):
-        # add person name to the large person group
-        new_person = face_admin_client.large_person_group.create_person(
+    face_admin_client = get_client_registry().face_admin_client(
+        telemetry="sample=mcp-face-reco-enroll"
+    )
+    face_client = get_client_registry().face_client(
+        telemetry="sample=mcp-face-reco-detect-for-enroll"
+    )
+    # add person name to the large person group, while the images are probed and detected
+    person_task = asyncio.create_task(
+        face_admin_client.large_person_group.create_person(
             large_person_group_id=UUID,
             name=person_name,
         )
-        output_list.append(
-            f"Create the person name: {person_name}"
-            f" with person id: {new_person.person_id}"
-            f" in the large person group with group UUID: {UUID}"
+    )
+    added_faces = 0
+
+    async def _enroll(file_path: str) -> tuple[list[str], bool]:
+        nonlocal added_faces
+        image_output_list, added = await enroll_image(
+            file_path,
+            person_task,
+            person_name,
+            UUID,
+            is_url,
+            check_quality,
+            face_client,
+            face_admin_client,
         )
-        for file_path in file_path_list:
-            if is_url:
-                response = requests.head(file_path)
-                if response.status_code != 200:
-                    token = os.getenv("AZURE_STORAGE_SAS_TOKEN")
-                    if token:
-                        sep = "&" if "?" in file_path else "?"
-                        file_path_with_token = f"{file_path}{sep}{token}"
-                        response = requests.head(file_path_with_token)
-                        if response.status_code == 200:
-                            output_list.append(
-                                f"URL: {file_path_with_token} is reachable after adding SAS token."
-                            )
-                            file_path = file_path_with_token
-                        else:
-                            output_list.append(
-                                f"URL: {file_path_with_token} is not reachable even after adding SAS token. Ignoring this image."
-                            )
-                            continue
-                    else:
-                        output_list.append(
-                            f"URL: {file_path} is not reachable and no SAS token is available. Ignoring this image."
-                        )
-                        continue
+        added_faces += added
+        return image_output_list, added
 
-                detected_faces = face_client.detect_from_url(
-                    url=file_path,
-                    detection_model=FaceDetectionModel.DETECTION03,
-                    recognition_model=FaceRecognitionModel.RECOGNITION04,
-                    return_face_id=True,
-                    return_face_attributes=[
-                        FaceAttributeTypeRecognition04.QUALITY_FOR_RECOGNITION
-                    ],
-                )
-            else:
-                if not os.path.exists(file_path):
-                    output_list.append(
-                        f"Image file: {file_path} does not exist. Ignoring this image."
-                    )
-                    continue
-                detected_faces = face_client.detect(
-                    image_content=open(file_path, "rb"),
-                    detection_model=FaceDetectionModel.DETECTION03,
-                    recognition_model=FaceRecognitionModel.RECOGNITION04,
-                    return_face_id=True,
-                    return_face_attributes=[
-                        FaceAttributeTypeRecognition04.QUALITY_FOR_RECOGNITION
-                    ],
-                )
-            detected_face = None
-            if len(detected_faces) < 1:
-                output_list.append(
-                    f"Image file: {file_path} does not contain any faces. "
-                    "Ignoring this image."
-                )
-                continue
-            if check_quality is False:
-                filtered_faces = detected_faces
-            else:
-                filtered_faces = [
-                    face
-                    for face in detected_faces
-                    if face.face_attributes.quality_for_recognition
-                    == QualityForRecognition.HIGH
-                ]
-            if len(filtered_faces) < 1:
-                output_list.append(
-                    f"Image file: {file_path} contains {len(detected_faces)} "
-                    "faces but no faces with high quality for recognition. "
-                    "Ignoring this image."
-                )
-                continue
-            elif len(filtered_faces) == 1:
-                detected_face = filtered_faces[0]
-                output_list.append(
-                    f"Image file: {file_path} contains 1 face for recognition."
-                    f" Face ID: {detected_face.face_id} "
-                    f"(bounding box: {detected_face.face_rectangle})."
-                )
-            else:
-                detected_faces_area_list = [
-                    face.face_rectangle.width * face.face_rectangle.height
-                    for face in filtered_faces
-                ]
-                largest_face_index = detected_faces_area_list.index(
-                    max(detected_faces_area_list)
-                )
-                detected_face = filtered_faces[largest_face_index]
-                output_list.append(
-                    f"Image file: {file_path} contains more than 1 face for recognition. Selecting the largest face."
-                    f" Face ID: {detected_face.face_id} "
-                    f"(bounding box: {detected_face.face_rectangle})."
-                )
-            if is_url:
-                persisted_face = face_admin_client.large_person_group.add_face_from_url(
-                    large_person_group_id=UUID,
-                    person_id=new_person.person_id,
-                    url=file_path,
-                    target_face=[
-                        detected_face.face_rectangle.left,
-                        detected_face.face_rectangle.top,
-                        detected_face.face_rectangle.width,
-                        detected_face.face_rectangle.height,
-                    ],
-                    detection_model=FaceDetectionModel.DETECTION03,
-                    user_data=json.dumps({"file_path": file_path.split("?")[0]}),
-                )
-            else:
-                persisted_face = face_admin_client.large_person_group.add_face(
-                    large_person_group_id=UUID,
-                    person_id=new_person.person_id,
-                    image_content=open(file_path, "rb"),
-                    target_face=[
-                        detected_face.face_rectangle.left,
-                        detected_face.face_rectangle.top,
-                        detected_face.face_rectangle.width,
-                        detected_face.face_rectangle.height,
-                    ],
-                    detection_model=FaceDetectionModel.DETECTION03,
-                    user_data=json.dumps({"file_path": file_path}),
-                )
-            output_list.append(
-                f"Add image file: {file_path} to person name: {person_name} "
-                f"with person id: {new_person.person_id} in the group with "
-                f"group UUID {UUID}. Persisted face ID: {persisted_face.persisted_face_id}"
-            )
-            poller = face_admin_client.large_person_group.begin_train(
-                large_person_group_id=UUID,
-                polling_interval=5,
-            )
-            poller.wait()
+    try:
+        # Images go through probe -> detect -> add_face concurrently; results keep input order
+        image_results = await gather_bounded(
+            (_enroll(file_path) for file_path in file_path_list),
+            get_client_registry().settings.max_concurrency,
+        )
+        new_person = await person_task
+    finally:
+        if added_faces > 0:
+            # One debounced background training for the whole batch instead of one per image,
+            # also covering the faces added before an unexpected error
+            get_training_scheduler().mark_dirty(UUID, mutations=added_faces)
+    get_group_index().upsert_person(UUID, new_person.person_id, person_name)
+    output_list.append(
+        f"Create the person name: {person_name}"
+        f" with person id: {new_person.person_id}"
+        f" in the large person group with group UUID: {UUID}"
+    )
+    for image_output_list, _ in image_results:
+        output_list.extend(image_output_list)
+    if added_faces > 0:
+        output_list.append(
+            EnrollFaceToLPGConfig.TRAINING_SCHEDULED.format(group_uuid=UUID)
+        )
     return "\n---\n".join(output_list)
@@ -1,70 +1,252 @@
-import os
+import asyncio
 from typing import Annotated
 
 from pydantic import Field
-from azure.ai.vision.face import FaceClient
 from azure.ai.vision.face.models import FaceDetectionModel, FaceRecognitionModel
-from azure.core.credentials import AzureKeyCredential
 
-from .utils._enums import IdentifyFaceInLPGConfig
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._detection_cache import detect_faces
+from .utils._enums import IdentifyFaceInLPGConfig, IdentifyFaceInLPGsConfig
+from .utils._group_index import get_group_index
+from .utils._image_source import ImageSource
+from .utils._person_cache import get_person_cache
+from .utils._training import get_training_scheduler
 
 
-def identify_face_from_group(
-    file_path: Annotated[str, Field(description=IdentifyFaceInLPGConfig.ARGS_FILE_PATH)], 
+# Maximum number of faceIds accepted by one identify request
+IDENTIFY_BATCH_SIZE = 10
+
+
+# At most this many enrolled-face user_data entries are shown per candidate
+MAX_USER_DATA_SHOWN = 3
+
+
+def _person_details(person_id: str, persons: dict) -> str:
+    person = persons.get(person_id)
+    if person is None:
+        return ""
+    user_data = list(person.face_user_data[:MAX_USER_DATA_SHOWN])
+    return f" (name: {person.name}, enrolled face user_data: {user_data})"
+
+
+def _other_candidates(candidates, persons: dict, show_group: bool = False) -> str:
+    if not candidates:
+        return ""
+    return ". Other candidates: " + ", ".join(
+        f"person ID: {candidate['personId']}{_person_details(candidate['personId'], persons.get(group_uuid, {}))} "
+        f"(confidence: {candidate['confidence']})"
+        + (f" in the group with UUID: {group_uuid}" if show_group else "")
+        for group_uuid, candidate in candidates
+    )
+
+
+async def _detect_faces_for_identify(face_client, file_path: str, is_url: bool):
+    async with ImageSource(file_path, is_url=is_url) as image:
+        if not image.ok:
+            return None
+        return await detect_faces(
+            face_client,
+            **image.face_source(),
+            detection_model=FaceDetectionModel.DETECTION03,
+            recognition_model=FaceRecognitionModel.RECOGNITION04,
+            return_face_id=True,
+        )
+
+
+async def _identify_in_groups(
+    face_client,
+    face_ids: list[str],
+    group_uuids: list[str],
+    max_candidates: int,
+    confidence_threshold: float | None,
+) -> dict[str, list | Exception]:
+    """
+    Identify the faces in every group. Returns, per group, the identification results in
+    detection order, or the exception that group failed with.
+    """
+    # Enrollments made in this session must be trained before they can be identified
+    await asyncio.gather(
+        *(get_training_scheduler().flush(group_uuid) for group_uuid in group_uuids)
+    )
+    # The service identifies at most IDENTIFY_BATCH_SIZE faces per call, so crowd images are
+    # split into chunks; every (group, chunk) pair runs concurrently under one shared cap
+    chunks = [
+        face_ids[i : i + IDENTIFY_BATCH_SIZE]
+        for i in range(0, len(face_ids), IDENTIFY_BATCH_SIZE)
+    ]
+
+    async def _identify(group_uuid: str, chunk: list[str]):
+        try:
+            return await face_client.identify_from_large_person_group(
+                face_ids=chunk,
+                large_person_group_id=group_uuid,
+                max_num_of_candidates_returned=max_candidates,
+                confidence_threshold=confidence_threshold,
+            )
+        except Exception as e:
+            return e
+
+    chunk_results = await gather_bounded(
+        (_identify(group_uuid, chunk) for group_uuid in group_uuids for chunk in chunks),
+        get_client_registry().settings.max_concurrency,
+    )
+    results = {}
+    for i, group_uuid in enumerate(group_uuids):
+        group_chunks = chunk_results[i * len(chunks) : (i + 1) * len(chunks)]
+        error = next((r for r in group_chunks if isinstance(r, Exception)), None)
+        results[group_uuid] = (
+            error
+            if error is not None
+            else [result for chunk in group_chunks for result in chunk]
+        )
+    return results
+
+
+async def _lookup_persons(candidates_by_group: dict[str, set]) -> dict[str, dict]:
+    # Resolve candidate names from the in-process cache instead of a list_persons round trip
+    async def _lookup(group_uuid: str, person_ids: set):
+        try:
+            return await get_person_cache().lookup(group_uuid, list(person_ids))
+        except Exception:
+            # Names are a convenience; identification results are still returned without them
+            return {}
+
+    group_uuids = [g for g, ids in candidates_by_group.items() if ids]
+    looked_up = await asyncio.gather(
+        *(_lookup(g, candidates_by_group[g]) for g in group_uuids)
+    )
+    return dict(zip(group_uuids, looked_up))
+
+
+async def identify_face_from_group(
+    file_path: Annotated[str, Field(description=IdentifyFaceInLPGConfig.ARGS_FILE_PATH)],
     group_uuid: Annotated[str, Field(description=IdentifyFaceInLPGConfig.ARGS_GROUP_UUID)],
-    is_url: Annotated[bool, Field(description=IdentifyFaceInLPGConfig.ARGS_IS_URL)] = False
+    is_url: Annotated[bool, Field(description=IdentifyFaceInLPGConfig.ARGS_IS_URL)] = False,
+    max_candidates: Annotated[int, Field(description=IdentifyFaceInLPGConfig.ARGS_MAX_CANDIDATES, ge=1, le=100)] = 1,
+    confidence_threshold: Annotated[float | None, Field(description=IdentifyFaceInLPGConfig.ARGS_CONFIDENCE_THRESHOLD, ge=0, le=1)] = None,
 ):
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
     output_list = []
-    with FaceClient(
-        endpoint=ENDPOINT, credential=AzureKeyCredential(KEY), 
-        headers = {"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-identify"}
-    ) as face_client:
-        if is_url is True:
-            faces = face_client.detect_from_url(
-                url=file_path,
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
+    face_client = get_client_registry().face_client(
+        telemetry="sample=mcp-face-reco-identify"
+    )
+    faces = await _detect_faces_for_identify(face_client, file_path, is_url)
+    if faces is None:
+        return f"Image file: {file_path} does not exist."
+    if len(faces) == 0:
+        return f"No face detected in the provided image file: {file_path}"
+    else:
+        output_list.append(
+            f"Detected {len(faces)} face(s) in the provided image file: "
+            f"{file_path}"
+        )
+    face_ids = [face.face_id for face in faces]
+    face_id_to_bbox = {face.face_id: face.face_rectangle for face in faces}
+    identify_results = (
+        await _identify_in_groups(
+            face_client, face_ids, [group_uuid], max_candidates, confidence_threshold
+        )
+    )[group_uuid]
+    if isinstance(identify_results, Exception):
+        raise identify_results
+    persons = await _lookup_persons(
+        {
+            group_uuid: {
+                candidate["personId"]
+                for identify_result in identify_results
+                for candidate in identify_result.candidates or []
+            }
+        }
+    )
+    output_list = []
+    for idx, identify_result in enumerate(identify_results):
+        face_id = face_ids[idx]
+        bbox = face_id_to_bbox.get(face_id, None)
+        if identify_result.candidates:
+            output_list.append(
+                f"Face ID {face_id} (bounding box: {bbox}) in the image was identified as "
+                f"person ID: {identify_result.candidates[0]['personId']}"
+                f"{_person_details(identify_result.candidates[0]['personId'], persons.get(group_uuid, {}))} "
+                f"with confidence: {identify_result.candidates[0]['confidence']} "
+                f"in the group with UUID: {group_uuid}"
+                + _other_candidates(
+                    [(group_uuid, candidate) for candidate in identify_result.candidates[1:]],
+                    persons,
+                )
             )
         else:
-            if not os.path.exists(file_path):
-                return f"Image file: {file_path} does not exist."
-            
-            faces = face_client.detect(
-                image_content=open(file_path, "rb"),
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
+            output_list.append(
+                f"Face ID {face_id} (bounding box: {bbox}) in the image could not be "
+                f"identified in the group with UUID: {group_uuid}"
+            )
+    return "\n---\n".join(output_list)
+
+
+async def identify_face_from_groups(
+    file_path: Annotated[str, Field(description=IdentifyFaceInLPGsConfig.ARGS_FILE_PATH)],
+    group_uuids: Annotated[
+        list[str] | None, Field(description=IdentifyFaceInLPGsConfig.ARGS_GROUP_UUIDS)
+    ] = None,
+    is_url: Annotated[bool, Field(description=IdentifyFaceInLPGsConfig.ARGS_IS_URL)] = False,
+    max_candidates: Annotated[int, Field(description=IdentifyFaceInLPGsConfig.ARGS_MAX_CANDIDATES, ge=1, le=100)] = 1,
+    confidence_threshold: Annotated[float | None, Field(description=IdentifyFaceInLPGsConfig.ARGS_CONFIDENCE_THRESHOLD, ge=0, le=1)] = None,
+):
+    face_client = get_client_registry().face_client(
+        telemetry="sample=mcp-face-reco-identify-multi-group"
+    )
+    if not group_uuids:
+        index = get_group_index()
+        await index.ensure_groups()
+        group_uuids = [group_id for group_id, _ in index.list_groups()]
+        if not group_uuids:
+            return "No large person groups found."
+    # Detect once; the same faceIds are identified in every group
+    faces = await _detect_faces_for_identify(face_client, file_path, is_url)
+    if faces is None:
+        return f"Image file: {file_path} does not exist."
+    if len(faces) == 0:
+        return f"No face detected in the provided image file: {file_path}"
+    face_ids = [face.face_id for face in faces]
+    results = await _identify_in_groups(
+        face_client, face_ids, group_uuids, max_candidates, confidence_threshold
+    )
+    output_list = [
+        f"Detected {len(faces)} face(s) in the provided image file: {file_path}. "
+        f"Searched {len(group_uuids)} group(s)."
+    ]
+    # Merge the candidates of every group per face, best confidence first
+    merged = [[] for _ in face_ids]
+    for group_uuid, group_results in results.items():
+        if isinstance(group_results, Exception):
+            output_list.append(
+                f"Failed to identify in the group with UUID: {group_uuid}. Error: {str(group_results)}"
+            )
+            continue
+        for idx, identify_result in enumerate(group_results):
+            merged[idx].extend(
+                (group_uuid, candidate) for candidate in identify_result.candidates or []
+            )
+    candidates_by_group: dict[str, set] = {}
+    for idx, face_candidates in enumerate(merged):
+        face_candidates.sort(key=lambda item: item[1]["confidence"], reverse=True)
+        del face_candidates[max_candidates:]
+        for group_uuid, candidate in face_candidates:
+            candidates_by_group.setdefault(group_uuid, set()).add(candidate["personId"])
+    persons = await _lookup_persons(candidates_by_group)
+    for face, face_candidates in zip(faces, merged):
+        if face_candidates:
+            group_uuid, best = face_candidates[0]
+            output_list.append(
+                f"Face ID {face.face_id} (bounding box: {face.face_rectangle}) in the image was identified as "
+                f"person ID: {best['personId']}"
+                f"{_person_details(best['personId'], persons.get(group_uuid, {}))} "
+                f"with confidence: {best['confidence']} "
+                f"in the group with UUID: {group_uuid}"
+                + _other_candidates(face_candidates[1:], persons, show_group=True)
             )
-        if len(faces) == 0:
-            return f"No face detected in the provided image file: {file_path}"
         else:
             output_list.append(
-                f"Detected {len(faces)} face(s) in the provided image file: "
-                f"{file_path}"
+                f"Face ID {face.face_id} (bounding box: {face.face_rectangle}) in the image could not be "
+                f"identified in any of the {len(group_uuids)} searched group(s)"
             )
-        face_ids = [face.face_id for face in faces]
-        face_id_to_bbox = {face.face_id: face.face_rectangle for face in faces}
-        identify_results = face_client.identify_from_large_person_group(
-            face_ids=face_ids,
-            large_person_group_id=group_uuid,
-        )
-        output_list = []
-        for idx, identify_result in enumerate(identify_results):
-            face_id = face_ids[idx]
-            bbox = face_id_to_bbox.get(face_id, None)
-            if identify_result.candidates:
-                output_list.append(
-                    f"Face ID {face_id} (bounding box: {bbox}) in the image was identified as "
-                    f"person ID: {identify_result.candidates[0]['personId']} "
-                    f"with confidence: {identify_result.candidates[0]['confidence']} "
-                    f"in the group with UUID: {group_uuid}"
-                )
-            else:
-                output_list.append(
-                    f"Face ID {face_id} (bounding box: {bbox}) in the image could not be "
-                    f"identified in the group with UUID: {group_uuid}"
-                )
-    return "\n---\n".join(output_list)
\ No newline at end of file
+    return "\n---\n".join(output_list)
@@ -1,9 +1,14 @@
-import os
-from azure.ai.vision.face import FaceAdministrationClient
-from azure.core.credentials import AzureKeyCredential
+from typing import Annotated
 
+from pydantic import Field
 
-def list_large_person_groups():
+from .utils._enums import ListLPGConfig
+from .utils._group_index import get_group_index
+
+
+async def list_large_person_groups(
+    refresh: Annotated[bool, Field(description=ListLPGConfig.ARGS_REFRESH)] = False,
+):
     """
     List all large person groups in the configured Azure Face resource.
 
@@ -11,28 +16,13 @@ def list_large_person_groups():
         str: A newline-separated string with Group ID and Name for each large person group,
              or a message indicating none were found.
     """
-    endpoint = os.getenv("AZURE_FACE_ENDPOINT")
-    key = os.getenv("AZURE_FACE_API_KEY")
-
     groups_output = []
 
-    with FaceAdministrationClient(
-        endpoint=endpoint,
-        credential=AzureKeyCredential(key),
-        headers={"X-MS-AZSDK-Telemetry": "sample=mcp-face-reco-list-lpgs"},
-    ) as client:
-        start = None
-        while True:
-            groups = client.large_person_group.get_large_person_groups(
-                start=start, top=1000
-            )
-            if not groups:
-                break
-            for g in groups:
-                group_id = getattr(g, "large_person_group_id", getattr(g, "id", None))
-                name = getattr(g, "name", None)
-                groups_output.append(f"Group ID: {group_id}, Name: {name}")
-            start = groups[-1].large_person_group_id  # pagination anchor
+    # Answered from the local group index, which pages through the service when stale
+    index = get_group_index()
+    await index.ensure_groups(refresh=refresh)
+    for group_id, name in index.list_groups():
+        groups_output.append(f"Group ID: {group_id}, Name: {name}")
 
     return (
         "\n".join(groups_output) if groups_output else "No large person groups found."
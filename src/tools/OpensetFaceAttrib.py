@@ -1,116 +1,277 @@
+import asyncio
 import base64
-import os
-import tempfile
+import json
 from typing import Annotated
 
-from azure.ai.vision.face import FaceClient
 from azure.ai.vision.face.models import FaceDetectionModel, FaceRecognitionModel
-from azure.core.credentials import AzureKeyCredential
 import cv2
-from openai import AzureOpenAI, APIConnectionError
+import numpy as np
+from openai import APIConnectionError
 from pydantic import Field
-import requests
 
+from .utils._answer_cache import answer_key, get_answer_cache
+from .utils._clients import _env_int, get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._detection_cache import detect_faces
 from .utils._enums import OpensetFaceAttribConfig
+from .utils._image_source import ImageSource
+from .utils._openai_backoff import get_openai_backoff
 
 
-def get_face_openset_attrib(
-    file_path: Annotated[str, Field(description=OpensetFaceAttribConfig.ARGS_FILE_PATH)], 
+# Azure OpenAI deployment that answers open-set attribute questions
+OPENAI_DEPLOYMENT = "gpt-4.1"
+
+# Completion tokens allowed per face and attribute answer
+MAX_TOKENS_PER_ANSWER = 20
+
+# Face crops are downscaled to at most this many pixels on their longest side (0 keeps them as is)
+CROP_MAX_SIDE = _env_int("AZURE_OPENAI_CROP_MAX_SIDE", 512)
+
+# Byte budget of one encoded face crop; JPEG quality is lowered step by step to meet it
+CROP_MAX_BYTES = _env_int("AZURE_OPENAI_CROP_MAX_BYTES", 64 * 1024)
+JPEG_QUALITIES = (90, 80, 70, 60, 50)
+
+
+def _crop_face(source_img, face_rectangle, dilation: float) -> tuple[str, int]:
+    """
+    Crop the dilated face rectangle, clamped to the image, and encode it as a JPEG within the
+    size budget. Returns the base64 JPEG and its size in bytes.
+    """
+    img_height, img_width = source_img.shape[:2]
+    cx = (face_rectangle.left +
+          face_rectangle.width / 2)
+    cy = (face_rectangle.top +
+          face_rectangle.height / 2)
+    w = face_rectangle.width * dilation
+    h = face_rectangle.height * dilation
+    dilated_rectangle = {
+        "left": max(0, int(cx - w / 2)),
+        "top": max(0, int(cy - h / 2)),
+        "right": min(img_width, int(cx + w / 2)),
+        "bottom": min(img_height, int(cy + h / 2))
+    }
+    cropped_img = source_img[
+        dilated_rectangle["top"]:max(dilated_rectangle["bottom"], dilated_rectangle["top"] + 1),
+        dilated_rectangle["left"]:max(dilated_rectangle["right"], dilated_rectangle["left"] + 1)
+    ]
+    crop_height, crop_width = cropped_img.shape[:2]
+    longest_side = max(crop_height, crop_width)
+    if CROP_MAX_SIDE > 0 and longest_side > CROP_MAX_SIDE:
+        scale = CROP_MAX_SIDE / longest_side
+        cropped_img = cv2.resize(
+            cropped_img,
+            (max(1, round(crop_width * scale)), max(1, round(crop_height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+    # Highest quality that fits the budget; the lowest one is used if none does
+    for quality in JPEG_QUALITIES:
+        encoded = cv2.imencode(".jpg", cropped_img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1]
+        if encoded.nbytes <= CROP_MAX_BYTES:
+            break
+    return base64.b64encode(encoded).decode('utf-8'), encoded.nbytes
+
+
+def _image_part(cropped_img_str: str) -> dict:
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:image/jpeg;base64,{cropped_img_str}",
+        },
+    }
+
+
+async def _ask_attribute(azure_client, cropped_img_str: str, attribute_name: str) -> str:
+    """Ask for one attribute of one face crop."""
+    input_prompt = [
+        { "type": "text", "text": f"What does the {attribute_name} "
+            "attribute looks like in the following image? Response the "
+            "answer in exactly one word." },
+        _image_part(cropped_img_str),
+    ]
+    messages=[
+        {
+            "role": "user",
+            "content": input_prompt
+        }
+    ]
+    response = await get_openai_backoff().call(
+        azure_client.chat.completions.create,
+        model=OPENAI_DEPLOYMENT,
+        messages=messages,
+        max_tokens=MAX_TOKENS_PER_ANSWER
+    )
+    return response.choices[0].message.content
+
+
+async def _ask_attributes_batch(
+    azure_client, cropped_img_strs: list[str], attribute_names: list[str]
+) -> list[dict[str, str]]:
+    """
+    Ask for every attribute of every face crop in one request. Returns, per crop, the answers
+    found in the JSON reply keyed by attribute name; missing answers are left out.
+    """
+    input_prompt = [
+        { "type": "text", "text": f"The following {len(cropped_img_strs)} images are "
+            "numbered face crops. For every face, describe what each of these attributes "
+            f"looks like: {json.dumps(attribute_names)}. Answer every attribute in exactly "
+            "one word. Respond with a JSON object only, in the form "
+            '{"faces": {"<face number>": {"<attribute>": "<answer>"}}}, using the face '
+            "numbers and the attribute names exactly as given." },
+    ]
+    for number, cropped_img_str in enumerate(cropped_img_strs, start=1):
+        input_prompt.append({ "type": "text", "text": f"Face {number}:" })
+        input_prompt.append(_image_part(cropped_img_str))
+    messages=[
+        {
+            "role": "user",
+            "content": input_prompt
+        }
+    ]
+    response = await get_openai_backoff().call(
+        azure_client.chat.completions.create,
+        model=OPENAI_DEPLOYMENT,
+        messages=messages,
+        max_tokens=MAX_TOKENS_PER_ANSWER * len(cropped_img_strs) * len(attribute_names) + 50,
+        response_format={"type": "json_object"},
+    )
+    try:
+        faces = json.loads(response.choices[0].message.content)["faces"]
+    except (TypeError, ValueError, KeyError):
+        faces = {}
+    if not isinstance(faces, dict):
+        faces = {}
+    answers = []
+    for number in range(1, len(cropped_img_strs) + 1):
+        face_answers = faces.get(str(number))
+        if not isinstance(face_answers, dict):
+            answers.append({})
+            continue
+        by_name = {str(name).strip().lower(): value for name, value in face_answers.items()}
+        answers.append(
+            {
+                attribute_name: str(by_name[attribute_name.lower()])
+                for attribute_name in attribute_names
+                if by_name.get(attribute_name.lower()) is not None
+            }
+        )
+    return answers
+
+
+async def get_face_openset_attrib(
+    file_path: Annotated[str, Field(description=OpensetFaceAttribConfig.ARGS_FILE_PATH)],
     attribute_name: Annotated[str, Field(description=OpensetFaceAttribConfig.ARGS_ATTRIBUTE_NAME)],
     dilation: Annotated[float, Field(description=OpensetFaceAttribConfig.ARGS_DILATION)] = 1.25,
-    is_url: Annotated[bool, Field(description=OpensetFaceAttribConfig.ARGS_IS_URL)] = False
+    is_url: Annotated[bool, Field(description=OpensetFaceAttribConfig.ARGS_IS_URL)] = False,
+    attribute_names: Annotated[list[str] | None, Field(description=OpensetFaceAttribConfig.ARGS_ATTRIBUTE_NAMES)] = None,
+    batched: Annotated[bool, Field(description=OpensetFaceAttribConfig.ARGS_BATCHED)] = True,
 ):
     if file_path is None:
         return "The Azure AI Face API did not receive any image. Please provide an image."
-    ENDPOINT = os.getenv("AZURE_FACE_ENDPOINT")
-    KEY = os.getenv("AZURE_FACE_API_KEY")
-    with FaceClient(
-        endpoint=ENDPOINT, credential=AzureKeyCredential(KEY), 
-        headers = {"X-MS-AZSDK-Telemetry": "sample=mcp-face-detect-openset-attr"}
-    ) as face_client:
-        if is_url is True:
-            detected_faces = face_client.detect_from_url(
-                url=file_path,
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
-            )
-        else:
-            if not os.path.exists(file_path):
-                return f"Image file: {file_path} does not exist."
-            
-            detected_faces = face_client.detect(
-                image_content=open(file_path, "rb"),
-                detection_model=FaceDetectionModel.DETECTION03,
-                recognition_model=FaceRecognitionModel.RECOGNITION04,
-                return_face_id=True,
-            )
-    azure_client = AzureOpenAI(
-        api_version="2025-03-01-preview",
-        api_key=os.getenv('AZURE_OPENAI_API_KEY'),
-        azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
+    face_client = get_client_registry().face_client(
+        telemetry="sample=mcp-face-detect-openset-attr"
     )
-    results = []
-    dilation = 1.25
-    if is_url:
-        response = requests.get(file_path)
-        if response.status_code == 200:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-                tmp_file.write(response.content)
-                file_path = tmp_file.name
-        else:
-            return f"Failed to download image from URL: {file_path} for openset face attribute detection."
-    source_img = cv2.imread(file_path)
-    for detected_face in detected_faces:
-        cx = (detected_face.face_rectangle.left + 
-              detected_face.face_rectangle.width / 2)
-        cy = (detected_face.face_rectangle.top + 
-              detected_face.face_rectangle.height / 2)
-        w = detected_face.face_rectangle.width * dilation
-        h = detected_face.face_rectangle.height * dilation
-        dilated_rectangle = {
-            "left": int(cx - w / 2),
-            "top": int(cy - h / 2),
-            "right": int(cx + w / 2),
-            "bottom": int(cy + h / 2)
-        }
-        cropped_img = source_img[
-            dilated_rectangle["top"]:dilated_rectangle["bottom"],
-            dilated_rectangle["left"]:dilated_rectangle["right"]
-        ]
-        cropped_img = cv2.imencode(".jpg", cropped_img)[1]
-        cropped_img_str = base64.b64encode(cropped_img).decode('utf-8')
-        input_prompt = [
-            { "type": "text", "text": f"What does the {attribute_name} "
-                "attribute looks like in the following image? Response the "
-                "answer in exactly one word." },
-            {
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/jpeg;base64,{cropped_img_str}",
-                },
-            }
-        ]
-        messages=[
-            {
-                "role": "user",
-                "content": input_prompt
-            }
-        ]
-        try:
-            response = azure_client.chat.completions.create(
-                model='gpt-4.1',
-                messages=messages,
-                max_tokens=20
+    # URLs are downloaded once: the same buffer is sent to detection and decoded for cropping
+    async with ImageSource(file_path, is_url=is_url, download=True) as image:
+        if not image.ok:
+            if is_url:
+                reason = f" ({image.error})" if image.error else ""
+                return f"Failed to download image from URL: {file_path} for openset face attribute detection{reason}."
+            return f"Image file: {file_path} does not exist."
+        detected_faces = await detect_faces(
+            face_client,
+            **image.face_source(),
+            detection_model=FaceDetectionModel.DETECTION03,
+            recognition_model=FaceRecognitionModel.RECOGNITION04,
+            return_face_id=True,
+        )
+        # Decoding and cropping are CPU bound; OpenCV releases the GIL, so they run in threads
+        source_img = await asyncio.to_thread(
+            cv2.imdecode, np.frombuffer(image.content, dtype=np.uint8), cv2.IMREAD_COLOR
+        )
+    azure_client = get_client_registry().openai_client(
+        api_version="2025-03-01-preview"
+    )
+    settings = get_client_registry().settings
+    attributes = list(
+        dict.fromkeys(
+            name.strip()
+            for name in [attribute_name, *(attribute_names or [])]
+            if name and name.strip()
+        )
+    )
+    crops = await asyncio.gather(
+        *(
+            asyncio.to_thread(_crop_face, source_img, detected_face.face_rectangle, dilation)
+            for detected_face in detected_faces
+        )
+    )
+    cropped_img_strs = [cropped_img_str for cropped_img_str, _ in crops]
+    # Answers already given for the same crop and attribute are served without an LLM call
+    answer_cache = get_answer_cache()
+    answer_keys = [
+        {name: answer_key(cropped_img_str, name, OPENAI_DEPLOYMENT) for name in attributes}
+        for cropped_img_str in cropped_img_strs
+    ]
+    answers = []
+    for face_keys in answer_keys:
+        face_answers = {}
+        for name, key in face_keys.items():
+            cached = answer_cache.get(key)
+            if cached is not None:
+                face_answers[name] = cached
+        answers.append(face_answers)
+    try:
+        pending = [i for i in range(len(detected_faces)) if len(answers[i]) < len(attributes)]
+        if batched and pending:
+            # The attributes still unanswered for up to openai_faces_per_request faces go into one request
+            pending_attributes = [
+                name for name in attributes if any(name not in answers[i] for i in pending)
+            ]
+            batch_size = max(1, settings.openai_faces_per_request)
+            batches = [
+                pending[i : i + batch_size] for i in range(0, len(pending), batch_size)
+            ]
+            batch_answers = await gather_bounded(
+                (
+                    _ask_attributes_batch(
+                        azure_client, [cropped_img_strs[i] for i in batch], pending_attributes
+                    )
+                    for batch in batches
+                ),
+                settings.openai_max_concurrency,
             )
-        except APIConnectionError:
-            return OpensetFaceAttribConfig.ERROR_AOAI_NOT_CONFIGURED
-        response = response.choices[0].message.content
-        result = f"""
-        Open-set Face Detection Results: 
-        'Face ID': '{detected_face.face_id}' 
+            for batch, face_answers in zip(batches, batch_answers):
+                for i, answer in zip(batch, face_answers):
+                    for name, value in answer.items():
+                        if name not in answers[i]:
+                            answers[i][name] = value
+                            answer_cache.put(answer_keys[i][name], value)
+        # One request per face and attribute, also for answers missing from a batched reply
+        missing = [
+            (i, name)
+            for i in range(len(detected_faces))
+            for name in attributes
+            if name not in answers[i]
+        ]
+        single_answers = await gather_bounded(
+            (_ask_attribute(azure_client, cropped_img_strs[i], name) for i, name in missing),
+            settings.openai_max_concurrency,
+        )
+    except APIConnectionError:
+        return OpensetFaceAttribConfig.ERROR_AOAI_NOT_CONFIGURED
+    for (i, name), answer in zip(missing, single_answers):
+        answers[i][name] = answer
+        answer_cache.put(answer_keys[i][name], answer)
+    results = []
+    for detected_face, face_answers, (_, crop_bytes) in zip(detected_faces, answers, crops):
+        attribute_lines = "\n".join(
+            f"        '{name}': '{face_answers[name]}'" for name in attributes
+        )
+        results.append(f"""
+        Open-set Face Detection Results:
+        'Face ID': '{detected_face.face_id}'
         'Bounding Box': {detected_face.face_rectangle}
-        '{attribute_name}': '{response}'
-        """
-        results.append(result)
-    return "\n---\n".join(results)
\ No newline at end of file
+        'Crop Bytes': {crop_bytes}
+{attribute_lines}
+        """)
+    return "\n---\n".join(results)
@@ -0,0 +1,40 @@
+from typing import Annotated
+
+from pydantic import Field
+
+from .utils._clients import get_client_registry
+from .utils._concurrency import gather_bounded
+from .utils._enums import SearchPersonsInLPGConfig
+from .utils._group_index import get_group_index
+
+
+async def search_persons_in_group(
+    query: Annotated[str, Field(description=SearchPersonsInLPGConfig.ARGS_QUERY)],
+    group_uuid: Annotated[
+        str | None, Field(description=SearchPersonsInLPGConfig.ARGS_GROUP_UUID)
+    ] = None,
+    refresh: Annotated[
+        bool, Field(description=SearchPersonsInLPGConfig.ARGS_REFRESH)
+    ] = False,
+):
+    index = get_group_index()
+    if group_uuid is not None:
+        group_ids = [group_uuid]
+    else:
+        await index.ensure_groups(refresh=refresh)
+        group_ids = [group_id for group_id, _ in index.list_groups()]
+    # Only groups that were never synced (or are stale) go to the Face API
+    await gather_bounded(
+        (index.ensure_group(group_id, refresh=refresh) for group_id in group_ids),
+        get_client_registry().settings.max_concurrency,
+    )
+    output_list = []
+    for group_id, person_id, name, file_path in index.search(query, group_uuid):
+        output_list.append(
+            f"Group ID: {group_id}, Person ID: {person_id}, Name: {name}"
+            + (f", Matching file_path: {file_path}" if file_path else "")
+        )
+    if not output_list:
+        where = f"the group with UUID: {group_uuid}" if group_uuid else "any large person group"
+        return f"No persons matching '{query}' found in {where}."
+    return "\n".join(output_list)
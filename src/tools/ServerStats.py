@@ -0,0 +1,22 @@
+from .utils._answer_cache import get_answer_cache
+from .utils._blob_listing import get_listing_cache
+from .utils._clients import get_client_registry
+from .utils._detection_cache import get_detection_cache
+from .utils._group_index import get_group_index
+from .utils._image_cache import get_image_cache
+from .utils._person_cache import get_person_cache
+
+
+async def get_server_stats() -> dict:
+    """
+    Return runtime statistics of the MCP server's shared caches and Face API rate limiter.
+    """
+    return {
+        "detection_cache": get_detection_cache().stats(),
+        "group_index": get_group_index().stats(),
+        "person_cache": get_person_cache().stats(),
+        "openset_answer_cache": get_answer_cache().stats(),
+        "blob_listing_cache": get_listing_cache().stats(),
+        "url_image_cache": get_image_cache().stats(),
+        "face_rate_limiter": get_client_registry().rate_limiter.stats(),
+    }
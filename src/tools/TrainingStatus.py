@@ -0,0 +1,44 @@
+from typing import Annotated
+
+from pydantic import Field
+
+from .utils._clients import get_client_registry
+from .utils._enums import TrainingStatusConfig
+from .utils._training import get_training_scheduler
+
+
+async def get_group_training_status(
+    group_uuid: Annotated[
+        str | None, Field(description=TrainingStatusConfig.ARGS_GROUP_UUID)
+    ] = None,
+):
+    output_list = []
+    states = get_training_scheduler().status(group_uuid)
+    for gid, state in states.items():
+        output_list.append(
+            f"Group ID: {gid}, Scheduled training status: {state.status}, "
+            f"Pending changes: {state.pending_mutations}, "
+            f"Last trained at: {state.last_trained_at or 'not in this session'}"
+            + (f", Message: {state.message}" if state.message else "")
+        )
+    if group_uuid is not None:
+        # Also ask the service, which knows about trainings started outside this session
+        face_admin_client = get_client_registry().face_admin_client(
+            telemetry="sample=mcp-face-reco-training-status"
+        )
+        try:
+            result = await face_admin_client.large_person_group.get_training_status(
+                large_person_group_id=group_uuid
+            )
+            output_list.append(
+                f"Group ID: {group_uuid}, Service training status: {result.status}, "
+                f"Last successful training: {result.last_successful_training_date_time}"
+                + (f", Message: {result.message}" if result.message else "")
+            )
+        except Exception as e:
+            output_list.append(
+                f"Group ID: {group_uuid}, Service training status unavailable. Error: {str(e)}"
+            )
+    if not output_list:
+        return "No large person group training has been scheduled in this session."
+    return "\n".join(output_list)
@@ -1,8 +1,14 @@
 from ._enums import CompareImagesConfig
 from ._enums import CreateLPGConfig
 from ._enums import EnrollFaceToLPGConfig
+from ._enums import EnrollBlobFoldersToLPGConfig
 from ._enums import IdentifyFaceInLPGConfig
+from ._enums import IdentifyFaceInLPGsConfig
+from ._enums import SearchPersonsInLPGConfig
+from ._enums import TrainingStatusConfig
 from ._enums import OpensetFaceAttribConfig
 from ._enums import AzureFaceAttribConfig
+from ._enums import BatchDetectFacesConfig
 from ._enums import ListBlobFoldersConfig
 from ._enums import DownloadBlobFolderConfig
+from ._enums import ServerStatsConfig
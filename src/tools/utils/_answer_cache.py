@@ -0,0 +1,160 @@
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from ._clients import _env_int
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    crop_sha256 TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    model TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (crop_sha256, attribute, model)
+);
+CREATE INDEX IF NOT EXISTS answers_by_used_at ON answers (used_at);
+"""
+
+
+def answer_key(cropped_img: str | bytes, attribute_name: str, model: str) -> tuple[str, str, str]:
+    """Key of an answer: the crop's content hash, the normalized attribute name and the model."""
+    if isinstance(cropped_img, str):
+        cropped_img = cropped_img.encode("utf-8")
+    attribute = " ".join(attribute_name.lower().split())
+    return hashlib.sha256(cropped_img).hexdigest(), attribute, model
+
+
+class AnswerCache:
+    """
+    LRU cache of open-set attribute answers, keyed by the face crop's content hash, the
+    normalized attribute name and the model deployment.
+
+    With a `path`, answers are also kept in a SQLite file so they survive restarts; entries
+    found there are promoted to memory, and the least recently used are pruned once the file
+    holds more than `max_disk_entries` answers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        path: str | None = None,
+        max_disk_entries: int = 100000,
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._db = None
+        self._disk_entries = 0
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path)
+            self._db.executescript(_SCHEMA)
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        return cls(
+            max_entries=_env_int("AZURE_OPENAI_ANSWER_CACHE_SIZE", 4096),
+            path=os.getenv("AZURE_OPENAI_ANSWER_CACHE_PATH") or None,
+            max_disk_entries=_env_int("AZURE_OPENAI_ANSWER_CACHE_DISK_SIZE", 100000),
+        )
+
+    def get(self, key: tuple[str, str, str]) -> str | None:
+        answer = self._entries.get(key)
+        if answer is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT answer FROM answers WHERE crop_sha256 = ? AND attribute = ? AND model = ?",
+                key,
+            ).fetchone()
+            if row is not None:
+                with self._db:
+                    self._db.execute(
+                        "UPDATE answers SET used_at = ? WHERE crop_sha256 = ? AND attribute = ? AND model = ?",
+                        (time.time(), *key),
+                    )
+                self._remember(key, row[0])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple[str, str, str], answer: str) -> None:
+        if answer is None:
+            return
+        self._remember(key, answer)
+        if self._db is None:
+            return
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO answers (crop_sha256, attribute, model, answer, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, answer, time.time()),
+            )
+            if cursor.rowcount == 0:
+                self._db.execute(
+                    "UPDATE answers SET answer = ?, used_at = ? "
+                    "WHERE crop_sha256 = ? AND attribute = ? AND model = ?",
+                    (answer, time.time(), *key),
+                )
+            self._disk_entries += cursor.rowcount
+            excess = self._disk_entries - self.max_disk_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM answers WHERE rowid IN "
+                    "(SELECT rowid FROM answers ORDER BY used_at LIMIT ?)",
+                    (excess,),
+                )
+                self._disk_entries -= excess
+
+    def _remember(self, key: tuple[str, str, str], answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = answer
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "disk_entries": self._disk_entries,
+            "evictions": self.evictions,
+        }
+
+
+_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        _cache = AnswerCache.from_env()
+    return _cache
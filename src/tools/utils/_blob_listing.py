@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ._clients import _env_int
+
+
+@dataclass(frozen=True)
+class ListingPage:
+    # Blob names, or folder names without the trailing "/" when listing folders
+    names: tuple[str, ...]
+    # Continuation token of the next page, None on the last page
+    next_cursor: str | None
+
+
+class BlobListingCache:
+    """
+    Short-lived LRU cache of blob listing pages, keyed on the container, prefix, page size
+    and continuation token. Paging back and forth or repeating a listing within the TTL does
+    not call the storage service again, while new uploads still show up within seconds.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_pages: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_pages = max_pages
+        self._pages: OrderedDict[tuple, tuple[float, ListingPage]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "BlobListingCache":
+        return cls(ttl_seconds=_env_int("AZURE_STORAGE_LISTING_CACHE_TTL", 30))
+
+    def get(self, key: tuple) -> ListingPage | None:
+        entry = self._pages.get(key)
+        if entry is None:
+            return None
+        expires_at, page = entry
+        if expires_at <= time.monotonic():
+            del self._pages[key]
+            return None
+        self._pages.move_to_end(key)
+        return page
+
+    def put(self, key: tuple, page: ListingPage) -> None:
+        if self.ttl_seconds <= 0 or self.max_pages <= 0:
+            return
+        self._pages[key] = (time.monotonic() + self.ttl_seconds, page)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "pages": len(self._pages),
+        }
+
+
+_cache: BlobListingCache | None = None
+
+
+def get_listing_cache() -> BlobListingCache:
+    global _cache
+    if _cache is None:
+        _cache = BlobListingCache.from_env()
+    return _cache
+
+
+async def list_blob_page(
+    container_client,
+    prefix: str,
+    page_size: int,
+    cursor: str | None = None,
+    *,
+    folders: bool = False,
+    suffixes: tuple[str, ...] | None = None,
+) -> ListingPage:
+    """
+    One page of at most `page_size` entries under `prefix`, starting at continuation token
+    `cursor`: the sub-folders of the prefix when `folders` is set, otherwise every blob below
+    it whose name ends with one of `suffixes` (case-insensitive). The page is fetched with a
+    single List Blobs call and filtered as it streams in.
+    """
+    cache = get_listing_cache()
+    key = (
+        container_client.url,
+        prefix,
+        page_size,
+        cursor,
+        folders,
+        suffixes,
+    )
+    page = cache.get(key)
+    if page is not None:
+        cache.hits += 1
+        return page
+    cache.misses += 1
+    if folders:
+        paged = container_client.walk_blobs(
+            name_starts_with=prefix or None, delimiter="/", results_per_page=page_size
+        )
+    else:
+        paged = container_client.list_blobs(
+            name_starts_with=prefix or None, results_per_page=page_size
+        )
+    pages = paged.by_page(continuation_token=cursor)
+    names = []
+    async for items in pages:
+        async for item in items:
+            if folders:
+                # Blobs directly under the prefix are listed next to the sub-folders
+                if item.name.endswith("/"):
+                    names.append(item.name[len(prefix) :].rstrip("/"))
+            elif not item.name.endswith("/") and (
+                suffixes is None or item.name.lower().endswith(suffixes)
+            ):
+                names.append(item.name)
+        break
+    page = ListingPage(tuple(names), pages.continuation_token or None)
+    cache.put(key, page)
+    return page
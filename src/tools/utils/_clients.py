@@ -0,0 +1,228 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+
+import aiohttp
+from azure.ai.vision.face.aio import FaceAdministrationClient, FaceClient
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.storage.blob.aio import ContainerClient
+from openai import AsyncAzureOpenAI
+
+from ._rate_limit import FaceRateLimiter, JitteredRetryPolicy, RateLimitPolicy
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_rates(name: str) -> dict[str, float]:
+    # "detect=5,identify=2" -> {"detect": 5.0, "identify": 2.0}
+    rates = {}
+    for item in (os.getenv(name) or "").split(","):
+        operation, _, rate = item.partition("=")
+        if operation.strip() and rate.strip():
+            rates[operation.strip().lower()] = float(rate)
+    return rates
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    # Maximum number of keep-alive connections kept per Face endpoint
+    pool_size: int = 10
+    # Seconds to wait for a connection to the Face endpoint
+    connection_timeout: float = 10.0
+    # Seconds to wait for a Face API response
+    read_timeout: float = 60.0
+    # Maximum number of Face API calls a single tool invocation keeps in flight
+    max_concurrency: int = 8
+    # Maximum number of Azure OpenAI requests a single tool invocation keeps in flight
+    openai_max_concurrency: int = 4
+    # Times a request rejected with 429 is retried after the OpenAI SDK's own retries
+    openai_max_retries: int = 5
+    # Maximum number of face crops sent in one batched open-set attribute request
+    openai_faces_per_request: int = 10
+    # Maximum number of blobs a folder download streams at once
+    blob_max_concurrency: int = 10
+    # Face API calls per second admitted per endpoint across the whole process (0 disables)
+    face_rate_limit: float = 10.0
+    # Calls per endpoint that may be sent at once before the rate applies (0 = one second's worth)
+    face_rate_burst: float = 0.0
+    # Lower rates for individual operations, e.g. {"detect": 5, "identify": 2}
+    face_operation_rates: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        return cls(
+            pool_size=_env_int("AZURE_FACE_POOL_SIZE", cls.pool_size),
+            connection_timeout=_env_float(
+                "AZURE_FACE_CONNECTION_TIMEOUT", cls.connection_timeout
+            ),
+            read_timeout=_env_float("AZURE_FACE_READ_TIMEOUT", cls.read_timeout),
+            max_concurrency=_env_int(
+                "AZURE_FACE_MAX_CONCURRENCY", cls.max_concurrency
+            ),
+            openai_max_concurrency=_env_int(
+                "AZURE_OPENAI_MAX_CONCURRENCY", cls.openai_max_concurrency
+            ),
+            openai_max_retries=_env_int(
+                "AZURE_OPENAI_MAX_RETRIES", cls.openai_max_retries
+            ),
+            openai_faces_per_request=_env_int(
+                "AZURE_OPENAI_FACES_PER_REQUEST", cls.openai_faces_per_request
+            ),
+            blob_max_concurrency=_env_int(
+                "AZURE_STORAGE_MAX_CONCURRENCY", cls.blob_max_concurrency
+            ),
+            face_rate_limit=_env_float("AZURE_FACE_RATE_LIMIT", cls.face_rate_limit),
+            face_rate_burst=_env_float("AZURE_FACE_RATE_BURST", cls.face_rate_burst),
+            face_operation_rates=_env_rates("AZURE_FACE_RATE_LIMIT_OPERATIONS"),
+        )
+
+
+class FaceClientRegistry:
+    """
+    Hands out long-lived async clients that share one keep-alive connection pool
+    per (endpoint, credential). Clients are created on first use and closed by aclose().
+    Every Face API request made through these clients is admitted by one shared rate limiter.
+    """
+
+    def __init__(self, settings: ClientSettings | None = None):
+        self.settings = settings or ClientSettings.from_env()
+        self.rate_limiter = FaceRateLimiter(
+            self.settings.face_rate_limit,
+            self.settings.face_rate_burst or None,
+            self.settings.face_operation_rates,
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._sessions: dict[tuple, aiohttp.ClientSession] = {}
+        self._clients: dict[tuple, object] = {}
+
+    def _bind_loop(self) -> None:
+        # aiohttp sessions are tied to the event loop that created them and cannot be closed
+        # from another one, so clients left open on a previous loop would leak their connections
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._sessions or self._clients:
+            raise RuntimeError(
+                "FaceClientRegistry is still bound to another event loop; "
+                "await aclose() before using it from a new loop"
+            )
+        self._loop = loop
+
+    def _session(self, pool_key: tuple) -> aiohttp.ClientSession:
+        self._bind_loop()
+        session = self._sessions.get(pool_key)
+        if session is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.settings.pool_size),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.settings.connection_timeout,
+                    sock_read=self.settings.read_timeout,
+                ),
+            )
+            self._sessions[pool_key] = session
+        return session
+
+    def _transport(self, pool_key: tuple) -> AioHttpTransport:
+        return AioHttpTransport(
+            session=self._session(pool_key),
+            session_owner=False,
+            connection_timeout=self.settings.connection_timeout,
+            read_timeout=self.settings.read_timeout,
+        )
+
+    def _get(self, client_cls, telemetry: str, endpoint: str | None, key: str | None):
+        endpoint = endpoint or os.getenv("AZURE_FACE_ENDPOINT")
+        key = key or os.getenv("AZURE_FACE_API_KEY")
+        self._bind_loop()
+        cache_key = (client_cls.__name__, endpoint, key, telemetry)
+        client = self._clients.get(cache_key)
+        if client is None:
+            client = client_cls(
+                endpoint=endpoint,
+                credential=AzureKeyCredential(key),
+                headers={"X-MS-AZSDK-Telemetry": telemetry},
+                transport=self._transport((endpoint, key)),
+                retry_policy=JitteredRetryPolicy(),
+                custom_hook_policy=RateLimitPolicy(self.rate_limiter),
+            )
+            self._clients[cache_key] = client
+        return client
+
+    def face_client(
+        self, telemetry: str, endpoint: str | None = None, key: str | None = None
+    ) -> FaceClient:
+        return self._get(FaceClient, telemetry, endpoint, key)
+
+    def face_admin_client(
+        self, telemetry: str, endpoint: str | None = None, key: str | None = None
+    ) -> FaceAdministrationClient:
+        return self._get(FaceAdministrationClient, telemetry, endpoint, key)
+
+    def container_client(
+        self, account_url: str, container: str, sas_token: str
+    ) -> ContainerClient:
+        self._bind_loop()
+        cache_key = ("ContainerClient", account_url, container, sas_token)
+        client = self._clients.get(cache_key)
+        if client is None:
+            client = ContainerClient(
+                account_url,
+                container_name=container,
+                credential=sas_token,
+                transport=self._transport((account_url, sas_token)),
+            )
+            self._clients[cache_key] = client
+        return client
+
+    def openai_client(self, api_version: str = "2025-03-01-preview") -> AsyncAzureOpenAI:
+        self._bind_loop()
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+        key = os.getenv("AZURE_OPENAI_API_KEY")
+        cache_key = ("AsyncAzureOpenAI", endpoint, key, api_version)
+        client = self._clients.get(cache_key)
+        if client is None:
+            client = AsyncAzureOpenAI(
+                api_version=api_version,
+                api_key=key,
+                azure_endpoint=endpoint,
+            )
+            self._clients[cache_key] = client
+        return client
+
+    def http_session(self) -> aiohttp.ClientSession:
+        """Shared session for plain HTTP calls such as image downloads and URL probes."""
+        return self._session(("http",))
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.close()
+        for session in self._sessions.values():
+            await session.close()
+        self._clients.clear()
+        self._sessions.clear()
+        self._loop = None
+
+
+_registry: FaceClientRegistry | None = None
+
+
+def set_client_registry(registry: FaceClientRegistry | None) -> None:
+    global _registry
+    _registry = registry
+
+
+def get_client_registry() -> FaceClientRegistry:
+    """Return the process-wide registry, creating a default one if the server has not installed one."""
+    global _registry
+    if _registry is None:
+        _registry = FaceClientRegistry()
+    return _registry
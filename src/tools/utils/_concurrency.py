@@ -0,0 +1,24 @@
+import asyncio
+from typing import Awaitable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], limit: int) -> list[T]:
+    """
+    Await all awaitables with at most `limit` in flight and return their results in input order.
+    If one of them raises, the others are cancelled before the exception propagates.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    tasks = [asyncio.ensure_future(_run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
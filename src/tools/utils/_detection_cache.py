@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from azure.ai.vision.face.models import FaceDetectionResult
+
+from ._clients import _env_int, get_client_registry
+from ._preprocess import PreparedImage, prepare_upload, project_faces
+
+# The Face service keeps detected faceIds for 24 hours by default
+FACE_ID_TTL_SECONDS = 86400
+
+
+@dataclass
+class _Entry:
+    faces: list[dict]
+    size: int
+    expires_at: float
+
+
+class DetectionCache:
+    """
+    Content-addressed LRU cache of Face API detection results.
+
+    Entries are keyed on the image content (bytes hash, or URL plus ETag) together with the
+    detection model, recognition model and requested attributes, and expire before the
+    faceIds they contain do, so an expired faceId is never handed out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: int = FACE_ID_TTL_SECONDS - 3600,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = min(ttl_seconds, FACE_ID_TTL_SECONDS)
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> "DetectionCache":
+        return cls(
+            max_entries=_env_int("AZURE_FACE_DETECTION_CACHE_SIZE", 256),
+            max_bytes=_env_int(
+                "AZURE_FACE_DETECTION_CACHE_MAX_BYTES", 16 * 1024 * 1024
+            ),
+            ttl_seconds=_env_int(
+                "AZURE_FACE_DETECTION_CACHE_TTL", FACE_ID_TTL_SECONDS - 3600
+            ),
+        )
+
+    def get(self, key: tuple) -> list[FaceDetectionResult] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        # Fresh model objects so callers can never mutate the cached copy
+        return [FaceDetectionResult(face) for face in entry.faces]
+
+    def put(self, key: tuple, faces: list[FaceDetectionResult]) -> None:
+        face_dicts = [face.as_dict() for face in faces]
+        size = len(json.dumps(face_dicts))
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(
+            faces=face_dicts,
+            size=size,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    async def get_or_detect(self, key: tuple | None, detect) -> list[FaceDetectionResult]:
+        if key is None:
+            return await detect()
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        # Concurrent requests for the same image share one detect call
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            faces = await asyncio.shield(inflight)
+            return [FaceDetectionResult(face.as_dict()) for face in faces]
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            faces = await detect()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it here so a failure nobody else waited on is not logged as unhandled
+            future.exception()
+            raise
+        else:
+            self.put(key, faces)
+            future.set_result(faces)
+            return faces
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_cache: DetectionCache | None = None
+
+
+def get_detection_cache() -> DetectionCache:
+    global _cache
+    if _cache is None:
+        _cache = DetectionCache.from_env()
+    return _cache
+
+
+def _cache_key(source: tuple, detect_kwargs: dict) -> tuple:
+    attributes = detect_kwargs.get("return_face_attributes") or []
+    return (
+        source,
+        str(detect_kwargs.get("detection_model")),
+        str(detect_kwargs.get("recognition_model")),
+        bool(detect_kwargs.get("return_face_id")),
+        bool(detect_kwargs.get("return_face_landmarks")),
+        tuple(sorted(str(attribute) for attribute in attributes)),
+    )
+
+
+async def _url_validator(url: str) -> str | None:
+    # ETag (or Last-Modified) tells us whether the remote image changed since it was cached
+    try:
+        async with get_client_registry().http_session().head(
+            url, allow_redirects=True
+        ) as response:
+            if response.status != 200:
+                return None
+            return response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
+    except Exception:
+        return None
+
+
+async def detect_faces(
+    face_client,
+    *,
+    image_content: bytes | None = None,
+    url: str | None = None,
+    prepare: Callable[[], Awaitable[PreparedImage]] | None = None,
+    **detect_kwargs,
+) -> list[FaceDetectionResult]:
+    """
+    Cached drop-in for face_client.detect / face_client.detect_from_url.
+    Pass exactly one of image_content (bytes) or url. Raises UnsupportedImageError, before
+    anything is uploaded, if image_content is not a readable image. `prepare` returns the
+    bytes to upload, e.g. ImageSource.prepared to reuse them for a later add_face call.
+    """
+    cache = get_detection_cache()
+    if url is not None:
+        validator = await _url_validator(url)
+        key = _cache_key(("url", url, validator), detect_kwargs) if validator else None
+        return await cache.get_or_detect(
+            key, lambda: face_client.detect_from_url(url=url, **detect_kwargs)
+        )
+    digest = hashlib.sha256(image_content).hexdigest()
+    key = _cache_key(("sha256", digest), detect_kwargs)
+
+    async def _detect():
+        # Oversized images are downscaled before upload; results are in original coordinates
+        prepared = await (prepare() if prepare else prepare_upload(image_content))
+        faces = await face_client.detect(image_content=prepared.content, **detect_kwargs)
+        return project_faces(faces, prepared.scale)
+
+    return await cache.get_or_detect(key, _detect)
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp
+from azure.ai.vision.face.models import (
+    FaceAttributeTypeRecognition04,
+    FaceDetectionModel,
+    FaceRecognitionModel,
+    QualityForRecognition,
+)
+from azure.core.exceptions import AzureError
+
+from ._detection_cache import detect_faces
+from ._group_index import get_group_index
+from ._image_source import ImageSource
+from ._preprocess import UnsupportedImageError
+
+
+async def _load_image(file_path: str, is_url: bool, output_list: list) -> ImageSource | None:
+    # URLs are downloaded once here (this also serves as the reachability probe) and the
+    # same buffer is sent to detect and add_face, so the image crosses the network once
+    image = ImageSource(file_path, is_url=is_url, download=True)
+    await image.load()
+    if image.ok:
+        return image
+    if not is_url:
+        output_list.append(
+            f"Image file: {file_path} does not exist. Ignoring this image."
+        )
+        return None
+    if any(name.lower() == "sig" for name, _ in parse_qsl(urlsplit(file_path).query)):
+        # The URL already carries a SAS token; appending another one cannot help
+        output_list.append(
+            f"URL: {file_path} is not reachable with its SAS token. Ignoring this image."
+        )
+        return None
+    token = os.getenv("AZURE_STORAGE_SAS_TOKEN")
+    if not token:
+        output_list.append(
+            f"URL: {file_path} is not reachable and no SAS token is available. Ignoring this image."
+        )
+        return None
+    sep = "&" if "?" in file_path else "?"
+    file_path_with_token = f"{file_path}{sep}{token}"
+    image = ImageSource(file_path_with_token, is_url=True, download=True)
+    await image.load()
+    if image.ok:
+        output_list.append(
+            f"URL: {file_path_with_token} is reachable after adding SAS token."
+        )
+        return image
+    output_list.append(
+        f"URL: {file_path_with_token} is not reachable even after adding SAS token. Ignoring this image."
+    )
+    return None
+
+
+async def enroll_image(
+    file_path: str,
+    person_task: asyncio.Task,
+    person_name: str,
+    UUID: str,
+    is_url: bool,
+    check_quality: bool,
+    face_client,
+    face_admin_client,
+) -> tuple[list[str], bool]:
+    """
+    Load, detect and add one image to the person `person_task` creates, as the enroll tools
+    do for every image; returns its output lines and whether a face was added. A failure of this image is reported as an output line, so the other images still enroll.
+    """
+    output_list = []
+    try:
+        image = await _load_image(file_path, is_url, output_list)
+        if image is None:
+            return output_list, False
+        try:
+            return await _enroll_loaded_image(
+                image,
+                output_list,
+                person_task,
+                person_name,
+                UUID,
+                check_quality,
+                face_client,
+                face_admin_client,
+            )
+        finally:
+            image.close()
+    except (AzureError, aiohttp.ClientError, OSError) as e:
+        output_list.append(
+            f"Image file: {file_path} could not be enrolled: {e}. Ignoring this image."
+        )
+        return output_list, False
+
+
+async def _enroll_loaded_image(
+    image: ImageSource,
+    output_list: list,
+    person_task: asyncio.Task,
+    person_name: str,
+    UUID: str,
+    check_quality: bool,
+    face_client,
+    face_admin_client,
+) -> tuple[list[str], bool]:
+    file_path = image.path
+    try:
+        detected_faces = await detect_faces(
+            face_client,
+            image_content=image.content,
+            prepare=image.prepared,
+            detection_model=FaceDetectionModel.DETECTION03,
+            recognition_model=FaceRecognitionModel.RECOGNITION04,
+            return_face_id=True,
+            return_face_attributes=[
+                FaceAttributeTypeRecognition04.QUALITY_FOR_RECOGNITION
+            ],
+        )
+    except UnsupportedImageError as e:
+        output_list.append(
+            f"Image file: {file_path} is not a supported image: {e}. Ignoring this image."
+        )
+        return output_list, False
+    detected_face = None
+    if len(detected_faces) < 1:
+        output_list.append(
+            f"Image file: {file_path} does not contain any faces. "
+            "Ignoring this image."
+        )
+        return output_list, False
+    if check_quality is False:
+        filtered_faces = detected_faces
+    else:
+        filtered_faces = [
+            face
+            for face in detected_faces
+            if face.face_attributes.quality_for_recognition
+            == QualityForRecognition.HIGH
+        ]
+    if len(filtered_faces) < 1:
+        output_list.append(
+            f"Image file: {file_path} contains {len(detected_faces)} "
+            "faces but no faces with high quality for recognition. "
+            "Ignoring this image."
+        )
+        return output_list, False
+    elif len(filtered_faces) == 1:
+        detected_face = filtered_faces[0]
+        output_list.append(
+            f"Image file: {file_path} contains 1 face for recognition."
+            f" Face ID: {detected_face.face_id} "
+            f"(bounding box: {detected_face.face_rectangle})."
+        )
+    else:
+        detected_faces_area_list = [
+            face.face_rectangle.width * face.face_rectangle.height
+            for face in filtered_faces
+        ]
+        largest_face_index = detected_faces_area_list.index(
+            max(detected_faces_area_list)
+        )
+        detected_face = filtered_faces[largest_face_index]
+        output_list.append(
+            f"Image file: {file_path} contains more than 1 face for recognition. Selecting the largest face."
+            f" Face ID: {detected_face.face_id} "
+            f"(bounding box: {detected_face.face_rectangle})."
+        )
+    # Upload the same downscaled image detection used, with the face rectangle scaled to it
+    prepared = await image.prepared()
+    # add_face needs the person, which is being created concurrently
+    new_person = await person_task
+    user_data = json.dumps({"file_path": file_path.split("?")[0]})
+    persisted_face = await face_admin_client.large_person_group.add_face(
+        large_person_group_id=UUID,
+        person_id=new_person.person_id,
+        image_content=prepared.content,
+        target_face=[
+            round(detected_face.face_rectangle.left * prepared.scale),
+            round(detected_face.face_rectangle.top * prepared.scale),
+            round(detected_face.face_rectangle.width * prepared.scale),
+            round(detected_face.face_rectangle.height * prepared.scale),
+        ],
+        detection_model=FaceDetectionModel.DETECTION03,
+        user_data=user_data,
+    )
+    get_group_index().add_face(
+        UUID, new_person.person_id, persisted_face.persisted_face_id, user_data
+    )
+    output_list.append(
+        f"Add image file: {file_path} to person name: {person_name} "
+        f"with person id: {new_person.person_id} in the group with "
+        f"group UUID {UUID}. Persisted face ID: {persisted_face.persisted_face_id}"
+    )
+    return output_list, True
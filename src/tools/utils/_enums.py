@@ -29,20 +29,70 @@ class EnrollFaceToLPGConfig(str, Enum):
         "The UUID of the person group to which the person will be enrolled."
     )
     ARGS_CHECK_QUALITY = "Whether to check the quality of the images before enrolling. Default is True. If set to True, the function will check if the images are suitable for face recognition and will not enroll if the quality is insufficient."
+    TRAINING_SCHEDULED = "Training of the large person group with group UUID: {group_uuid} is scheduled in the background and starts once no more faces are added. Identification in this group waits for the training to finish. Call 'azure_face_recognition_training_status' to check its progress."
+
+
+class EnrollBlobFoldersToLPGConfig(str, Enum):
+    TOOL_NAME = "azure_face_recognition_enroll_blob_folders"
+    TOOL_DESC = (
+        "Bulk-enroll persons from the Azure Blob container into a specific large person group. "
+        "Each subfolder (virtual directory) is treated as one person named after the folder, and every image in it is enrolled as a face of that person. "
+        "Persons are enrolled concurrently, progress is reported as folders finish, and the group is trained once at the end."
+    )
+    ARGS_GROUP_UUID = (
+        "The UUID of the person group to which the persons will be enrolled."
+    )
+    ARGS_PARENT_FOLDER = "The folder in the blob container whose subfolders are the person folders. Default is '' (the container root)."
+    ARGS_FOLDER_NAMES = "Optional list of person folder names to enroll. If not provided, every person folder under parent_folder is enrolled."
+    ARGS_CHECK_QUALITY = "Whether to check the quality of the images before enrolling. Default is True. If set to True, images that are not suitable for face recognition are skipped."
+    PROGRESS = "Enrolled {num_faces} of {num_images} image(s) for person '{person_name}' ({done}/{total} folders done)."
+    RESULT_PERSON = "Person name: {person_name} with person id: {person_id} enrolled from folder '{folder}' with {num_faces} of {num_images} image(s) in the group with group UUID: {group_uuid}."
+    RESULT_NO_IMAGES = "Folder '{folder}' contains no images. No person was created."
+    RESULT_FOLDER_FAILED = "Folder '{folder}' could not be fully enrolled: {error}."
+    RESULT_SUMMARY = "Enrolled {num_faces} face(s) for {num_persons} person(s) from {num_folders} folder(s) into the group with group UUID: {group_uuid}."
+    RESULT_NO_FOLDERS = "No person folders found under '{parent_folder}' in the container."
 
 
 class IdentifyFaceInLPGConfig(str, Enum):
     TOOL_NAME = "azure_face_recognition_identify"
-    TOOL_DESC = "Identify a face from a specific large person group leveraging the azure ai face recognition API."
+    TOOL_DESC = "Identify a face from a specific large person group leveraging the azure ai face recognition API. Each candidate is returned with its person ID, person name and the user_data (enrolled image file paths) of its faces, so there is no need to list the persons of the group afterwards."
     ARGS_FILE_PATH = "The absolute file path to the image file. If the file_path is the local file path, complete and fix the file_path. If the file_path is the remote file_path URL, set is_url to True."
     ARGS_GROUP_UUID = "The UUID of the person group in which to identify the face."
     ARGS_IS_URL = "Whether the file_path is a remote file URL or a local file path. YOU (MCP) should set this to True if the file_path is a URL, otherwise set it to False."
+    ARGS_MAX_CANDIDATES = "The maximum number of candidate persons returned for each face, from 1 to 100. Default is 1."
+    ARGS_CONFIDENCE_THRESHOLD = "Optional minimum confidence, from 0 to 1, a candidate needs to be returned. If not provided, the service default threshold is used."
+
+
+class IdentifyFaceInLPGsConfig(str, Enum):
+    TOOL_NAME = "azure_face_recognition_identify_multi_group"
+    TOOL_DESC = "Identify faces across several large person groups at once leveraging the azure ai face recognition API. The image is detected once and identified in every group concurrently; the candidates of all groups are merged per face by confidence. Use this instead of calling the single-group identify once per group."
+    ARGS_FILE_PATH = "The absolute file path to the image file. If the file_path is the local file path, complete and fix the file_path. If the file_path is the remote file_path URL, set is_url to True."
+    ARGS_GROUP_UUIDS = "The UUIDs of the person groups to search. If not provided, every large person group is searched."
+    ARGS_IS_URL = "Whether the file_path is a remote file URL or a local file path. YOU (MCP) should set this to True if the file_path is a URL, otherwise set it to False."
+    ARGS_MAX_CANDIDATES = "The maximum number of candidate persons returned for each face across all groups, from 1 to 100. Default is 1."
+    ARGS_CONFIDENCE_THRESHOLD = "Optional minimum confidence, from 0 to 1, a candidate needs to be returned. If not provided, the service default threshold is used."
+
+
+class TrainingStatusConfig(str, Enum):
+    TOOL_NAME = "azure_face_recognition_training_status"
+    TOOL_DESC = "Report the training status of large person groups. Enrolling or deleting faces schedules one background training per group after a short quiet period; this function shows whether each group is pending, training, succeeded or failed."
+    ARGS_GROUP_UUID = "The UUID of the person group to check. If not provided, report every group with scheduled or recent training in this session."
 
 
 class ListPersonsInLPGConfig(str, Enum):
     TOOL_NAME = "azure_face_recognition_list_persons"
     TOOL_DESC = "List all persons and number of faces per person in a specific large person group."
     ARGS_GROUP_UUID = "The UUID of the person group to list persons and face counts."
+    ARGS_INCLUDE_FACE_DETAILS = "Whether to also list every face of each person with its image file path. Default is True. Set to False to return only the number of faces per person, which is much faster for large groups."
+    ARGS_REFRESH = "Whether to re-sync the group from the Azure AI Face API before listing. Default is False, which answers from the local index. Use True if the group may have been changed outside this MCP server."
+
+
+class SearchPersonsInLPGConfig(str, Enum):
+    TOOL_NAME = "azure_face_recognition_search_persons"
+    TOOL_DESC = "Search enrolled persons by name or by the file path / URL of their enrolled face images. Answered from a local index of the large person groups, so it is much faster than listing every person of a group."
+    ARGS_QUERY = "Case-insensitive text to look for in person names and enrolled image file paths."
+    ARGS_GROUP_UUID = "The UUID of the person group to search. If not provided, every large person group is searched."
+    ARGS_REFRESH = "Whether to re-sync the searched groups from the Azure AI Face API first. Default is False. Use True if groups may have been changed outside this MCP server."
 
 
 class DeletePersonFromLPGConfig(str, Enum):
@@ -86,15 +136,18 @@ class ListLPGConfig(str, Enum):
     TOOL_DESC = (
         "List all large person groups leveraging the azure ai face recognition API."
     )
+    ARGS_REFRESH = "Whether to re-sync the list of groups from the Azure AI Face API. Default is False, which answers from the local index. Use True if groups may have been created or deleted outside this MCP server."
 
 
 class OpensetFaceAttribConfig(str, Enum):
     TOOL_NAME = "azure_face_detection_openset_attribute"
-    TOOL_DESC = "Get the face attribute from the user provided images. This function supports all the possible face or image attributes but excludes the attributes closely related to the following: head pose, glasses, occlusion, blur, exposure, mask, quality, age, and landmarks. This function could be used separately or after the 'azure_face_detection_attribute' function if the user potentially needs any other attribute which is not supported by the 'azure_face_detection_attribute' function. YOU (MCP) must return the error message if the Azure OpenAI configuration file is not set correctly or the image file is not provided."
+    TOOL_DESC = "Get the face attribute from the user provided images. This function supports all the possible face or image attributes but excludes the attributes closely related to the following: head pose, glasses, occlusion, blur, exposure, mask, quality, age, and landmarks. This function could be used separately or after the 'azure_face_detection_attribute' function if the user potentially needs any other attribute which is not supported by the 'azure_face_detection_attribute' function. Several attributes of the same image should be retrieved in one call with attribute_names. YOU (MCP) must return the error message if the Azure OpenAI configuration file is not set correctly or the image file is not provided."
     ARGS_FILE_PATH = "The absolute file path to the image file. If the file_path is the local file path, complete and fix the file_path. If the file_path is the remote file_path URL, set is_url to True."
     ARGS_ATTRIBUTE_NAME = "The name of the attribute to retrieve."
     ARGS_DILATION = "The dilation factor to apply to the detected face rectangle. Default is 1.25, which enlarges the rectangle by 25% on each dimension."
     ARGS_IS_URL = "Whether the file_path is a remote file URL or a local file path. YOU (MCP) should set this to True if the file_path is a URL, otherwise set it to False."
+    ARGS_ATTRIBUTE_NAMES = "Optional additional attribute names to retrieve for the same image, e.g. ['hair color', 'headwear']. YOU (MCP) should pass every attribute the user asks about in one call instead of calling this function once per attribute."
+    ARGS_BATCHED = "Whether to ask about all faces and attributes together in as few Azure OpenAI requests as possible. Default is True. Set to False only to ask about each face and attribute in a separate request."
     ERROR_AOAI_NOT_CONFIGURED = "The Azure OpenAI did not receive any image. To enable open-set face attribute detection, you need access to Azure OpenAI. Please check your .vscode/mcp.json configuration file and ensure the AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_KEY are set correctly. After setting the environment variables, please restart the MCP server and try again."
 
 
@@ -114,6 +167,29 @@ class AzureFaceAttribConfig(str, Enum):
     ARGS_RETURN_LANDMARKS = (
         "Whether to return Facial landmarks information. Default is False."
     )
+    ARGS_OUTPUT_FORMAT = "The format of the detection results. 'text' (default) returns the full results of every face as text. 'json' returns compact JSON with one object per face, only the requested fields and floats rounded to two decimals. 'columnar' returns compact JSON with one array per field in face order, which is the smallest for images with many faces. YOU (MCP) should prefer 'json', or 'columnar' for many faces, when the results are processed further."
+
+
+class BatchDetectFacesConfig(str, Enum):
+    TOOL_NAME = "azure_face_detection_batch"
+    TOOL_DESC = (
+        "Detect faces and their attributes in many images at once, e.g. to audit a folder for mask or glasses compliance. "
+        "The images are a local directory, a local glob pattern, or a folder prefix in the Azure Blob container. "
+        "Images are processed concurrently, progress is reported as images finish, and an aggregated summary is returned instead of per-face results: "
+        "the counts of each attribute value, min/mean/max of numeric attributes, the flagged images, the images without faces and the images that failed. "
+        "YOU (MCP) should use this function instead of calling 'azure_face_detection_attribute' once per image."
+    )
+    ARGS_SOURCE = "A local directory, a local glob pattern such as '/data/photos/**/*.jpg', or, with is_blob set to True, a folder prefix in the Azure Blob container ('' for the container root)."
+    ARGS_IS_BLOB = "Whether the source is a folder prefix in the Azure Blob container configured by AZURE_STORAGE_ACCOUNT, AZURE_STORAGE_CONTAINER and AZURE_STORAGE_SAS_TOKEN. Default is False."
+    ARGS_ATTRIBUTES = "The face attributes to detect and summarize. Values include 'headPose', 'glasses', 'occlusion', 'blur', 'exposure', 'mask', 'qualityForRecognition' and 'age'. Default is ['mask', 'glasses']."
+    ARGS_FLAG_IF = "Optional rules of the form 'field=value'. An image is flagged when any of its faces matches any rule, e.g. ['mask.type=noMask', 'glasses=Sunglasses']. Fields are the attribute names, with nested values joined by dots, and values are compared case-insensitively."
+    ARGS_RECURSIVE = "Whether to include images in subfolders of a local directory or blob folder prefix. Default is False. Glob patterns use '**' instead."
+    ARGS_MAX_IMAGES = "The maximum number of images to process. Default is 1000."
+    PROGRESS = "Detected {num_faces} face(s) in '{image}' ({done}/{total} images done)."
+    PROGRESS_FAILED = "Failed to detect faces in '{image}': {error} ({done}/{total} images done)."
+    RESULT_NO_IMAGES = "No images found in '{source}'."
+    RESULT_SUMMARY = "Processed {num_images} image(s) from '{source}': {num_faces} face(s) in {num_with_faces} image(s), {num_without_faces} image(s) without faces, {num_failed} image(s) failed."
+    RESULT_TRUNCATED = "Only the first {max_images} of {num_found} images were processed. Increase max_images to process more."
 
 
 class ListBlobFoldersConfig(str, Enum):
@@ -128,21 +204,33 @@ class ListBlobFoldersConfig(str, Enum):
         "Please reply with a list of folder names you want to use for enrollment. Each folder should contain face images for a single person, and the folder name should be the person's name or info. "
         "After you choose, I will download all images from those folders or use their URLs for further processing."
     )
+    ARGS_PAGE_SIZE = "The maximum number of folders to list in one call. Default is 100."
+    ARGS_CURSOR = "The cursor returned by the previous call to list the next page of folders. Leave empty to start from the first folder."
+    RESULT_MORE = "More folders are available. To list them, call this tool again with cursor='{cursor}'."
 
 
 class ListPublicImageUrlsConfig(str, Enum):
     TOOL_NAME = "azure_blob_list_public_image_urls"
-    TOOL_DESC = "List all public image URLs in the specified folder in the Azure Blob container. Don't try to modify or shorten any URLs."
+    TOOL_DESC = "List the public image URLs in the specified folder in the Azure Blob container, one page at a time; if next_cursor is returned, call again with it to get the next page. Don't try to modify or shorten any URLs."
     ARGS_FOLDER_NAME = (
         "The name of the folder (virtual directory) in the blob container."
     )
+    ARGS_PAGE_SIZE = "The maximum number of blobs to list in one call; only image files among them are returned. Default is 200."
+    ARGS_CURSOR = "The next_cursor returned by the previous call to list the next page. Leave empty to start from the first image."
 
 
 class DownloadBlobFolderConfig(str, Enum):
     TOOL_NAME = "azure_blob_download_folder"
-    TOOL_DESC = "Download all blobs (files) from the specified folder in the Azure Blob container to a local directory, preserving the same subfolder structure as in the storage."
+    TOOL_DESC = "Download all blobs (files) from the specified folder in the Azure Blob container to a local directory, preserving the same subfolder structure as in the storage. Files that are already up to date locally are skipped, so calling it again only fetches new or changed files."
     ARGS_FOLDER_NAME = (
         "The name of the folder (virtual directory) in the blob container."
     )
     ARGS_LOCAL_DIR = "The local directory where the files will be downloaded. Default is './downloaded_images'."
-    RESULT_SUCCESS = "Downloaded {num_files} files from folder '{folder_name}' to '{local_dir}'.\nFiles:\n{file_list}"
+    RESULT_SUCCESS = "Downloaded {num_files} files from folder '{folder_name}' to '{local_dir}'; {num_skipped} unchanged files were skipped."
+    RESULT_FILES = "Files:\n{file_list}"
+    RESULT_FAILED = "Failed to download {num_failed} files:\n{file_list}"
+
+
+class ServerStatsConfig(str, Enum):
+    TOOL_NAME = "azure_face_server_stats"
+    TOOL_DESC = "Report runtime statistics of this MCP server, such as the hit and miss counters of the face detection cache and the queue depth and throttle counts of the Face API rate limiter. Use this to diagnose performance; it does not call the Azure AI Face API."
@@ -0,0 +1,70 @@
+import json
+
+# Decimal places kept for float values such as age, blur, head pose angles and landmark coordinates
+FLOAT_DIGITS = 2
+
+
+def _round_floats(value):
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    if isinstance(value, dict):
+        return {key: _round_floats(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(item) for item in value]
+    return value
+
+
+def compact_face(face, attributes: list[str] | None = None) -> dict:
+    """
+    JSON-ready dict of one detection result with floats rounded and landmarks as [x, y] pairs.
+    With `attributes`, face attributes other than those requested are left out.
+    """
+    face_dict = face.as_dict() if hasattr(face, "as_dict") else dict(face)
+    if attributes is not None and "faceAttributes" in face_dict:
+        wanted = {str(getattr(attribute, "value", attribute)) for attribute in attributes}
+        face_dict["faceAttributes"] = {
+            name: value for name, value in face_dict["faceAttributes"].items() if name in wanted
+        }
+        if not face_dict["faceAttributes"]:
+            del face_dict["faceAttributes"]
+    landmarks = face_dict.get("faceLandmarks")
+    if landmarks:
+        # Whole-pixel [x, y] pairs instead of {"x": .., "y": ..} objects; landmarks dominate
+        # the payload and sub-pixel positions carry no useful information
+        face_dict["faceLandmarks"] = {
+            name: [round(point["x"]), round(point["y"])] for name, point in landmarks.items()
+        }
+    return _round_floats(face_dict)
+
+
+def flatten_fields(value, prefix: str = "") -> dict:
+    """Leaf values of a nested dict keyed by dotted path, e.g. {"mask.type": "noMask"}."""
+    if not isinstance(value, dict):
+        return {prefix: value}
+    fields = {}
+    for key, item in value.items():
+        fields.update(flatten_fields(item, f"{prefix}.{key}" if prefix else key))
+    return fields
+
+
+def faces_to_columns(faces: list[dict]) -> dict:
+    """
+    Columnar layout of compacted faces: one array per (dotted) field, in face order, with
+    null where a face lacks the field.
+    """
+    columns: dict[str, list] = {}
+    for row, face in enumerate(faces):
+        for field, value in flatten_fields(face).items():
+            columns.setdefault(field, [None] * len(faces))[row] = value
+    return {"count": len(faces), "columns": columns}
+
+
+def format_faces(faces, output_format: str, attributes: list[str] | None = None) -> str:
+    """Serialize detection results as compact JSON rows ("json") or parallel arrays ("columnar")."""
+    compacted = [compact_face(face, attributes) for face in faces]
+    payload = (
+        faces_to_columns(compacted)
+        if output_format == "columnar"
+        else {"count": len(compacted), "faces": compacted}
+    )
+    return json.dumps(payload, separators=(",", ":"))
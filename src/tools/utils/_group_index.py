@@ -0,0 +1,399 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from ._clients import _env_float, get_client_registry
+from ._concurrency import gather_bounded
+
+_TELEMETRY = "sample=mcp-face-reco-index-sync"
+
+# get_large_person_groups and get_persons return at most 1000 items per call
+PAGE_SIZE = 1000
+# Listings of a group retried when a write-through hook changes it meanwhile
+SYNC_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS groups (
+    group_id TEXT PRIMARY KEY,
+    name TEXT,
+    user_data TEXT
+);
+CREATE TABLE IF NOT EXISTS persons (
+    group_id TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    name TEXT,
+    user_data TEXT,
+    PRIMARY KEY (group_id, person_id)
+);
+CREATE INDEX IF NOT EXISTS persons_by_name ON persons (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS faces (
+    group_id TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    persisted_face_id TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    fetched INTEGER NOT NULL DEFAULT 0,
+    user_data TEXT,
+    file_path TEXT,
+    PRIMARY KEY (group_id, person_id, persisted_face_id)
+);
+CREATE INDEX IF NOT EXISTS faces_by_file_path ON faces (file_path);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def _file_path_from_user_data(user_data: str | None) -> str | None:
+    # Enrollment stores {"file_path": ...} as the face user_data
+    if not user_data:
+        return None
+    try:
+        ud = json.loads(user_data)
+    except ValueError:
+        return None
+    return ud.get("file_path") if isinstance(ud, dict) else None
+
+
+def _default_index_path() -> str:
+    # One index per Face resource, so switching endpoints never mixes groups
+    endpoint = os.getenv("AZURE_FACE_ENDPOINT", "")
+    digest = hashlib.sha256(endpoint.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(
+        os.path.expanduser("~"), ".azure-face-mcp", f"group-index-{digest}.sqlite3"
+    )
+
+
+class GroupIndex:
+    """
+    Local SQLite mirror of large person groups, their persons and persisted faces.
+
+    A paged sync with the Face API fills it; the enroll, create and delete tools write
+    through to it, so listing and searching can be answered locally. A group (or the list of
+    groups) is synced again once its last sync is older than `max_age` seconds, which picks
+    up changes made outside this server. Re-syncs only fetch metadata of faces not yet known.
+    """
+
+    def __init__(self, path: str = ":memory:", max_age: float = 3600.0):
+        self.path = path
+        self.max_age = max_age
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        # Bumped on every change to a group, so in-process caches built from it can go stale
+        self._versions: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "GroupIndex":
+        return cls(
+            path=os.getenv("AZURE_FACE_INDEX_PATH") or _default_index_path(),
+            max_age=_env_float("AZURE_FACE_INDEX_MAX_AGE", 3600.0),
+        )
+
+    def version(self, group_id: str) -> int:
+        return self._versions.get(group_id, 0)
+
+    def _bump(self, group_id: str) -> None:
+        self._versions[group_id] = self._versions.get(group_id, 0) + 1
+
+    # Write-through hooks
+
+    def upsert_group(self, group_id: str, name: str | None = None, user_data: str | None = None) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute(
+                "INSERT INTO groups (group_id, name, user_data) VALUES (?, ?, ?) "
+                "ON CONFLICT (group_id) DO UPDATE SET name = excluded.name, user_data = excluded.user_data",
+                (group_id, name, user_data),
+            )
+
+    def delete_group(self, group_id: str) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute("DELETE FROM groups WHERE group_id = ?", (group_id,))
+            self._db.execute("DELETE FROM persons WHERE group_id = ?", (group_id,))
+            self._db.execute("DELETE FROM faces WHERE group_id = ?", (group_id,))
+            self._db.execute("DELETE FROM sync_state WHERE scope = ?", (f"group:{group_id}",))
+
+    def upsert_person(self, group_id: str, person_id: str, name: str | None, user_data: str | None = None) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute(
+                "INSERT INTO persons (group_id, person_id, name, user_data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (group_id, person_id) DO UPDATE SET name = excluded.name, user_data = excluded.user_data",
+                (group_id, person_id, name, user_data),
+            )
+
+    def delete_person(self, group_id: str, person_id: str) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute(
+                "DELETE FROM persons WHERE group_id = ? AND person_id = ?", (group_id, person_id)
+            )
+            self._db.execute(
+                "DELETE FROM faces WHERE group_id = ? AND person_id = ?", (group_id, person_id)
+            )
+
+    def add_face(self, group_id: str, person_id: str, persisted_face_id: str, user_data: str | None) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO faces "
+                "(group_id, person_id, persisted_face_id, position, fetched, user_data, file_path) "
+                "VALUES (?, ?, ?, (SELECT COUNT(*) FROM faces WHERE group_id = ? AND person_id = ?), 1, ?, ?)",
+                (
+                    group_id,
+                    person_id,
+                    persisted_face_id,
+                    group_id,
+                    person_id,
+                    user_data,
+                    _file_path_from_user_data(user_data),
+                ),
+            )
+
+    def delete_face(self, group_id: str, person_id: str, persisted_face_id: str) -> None:
+        self._bump(group_id)
+        with self._db:
+            self._db.execute(
+                "DELETE FROM faces WHERE group_id = ? AND person_id = ? AND persisted_face_id = ?",
+                (group_id, person_id, persisted_face_id),
+            )
+
+    # Sync with the Face API
+
+    def is_fresh(self, scope: str) -> bool:
+        row = self._db.execute(
+            "SELECT synced_at FROM sync_state WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row is not None and time.time() - row[0] < self.max_age
+
+    def _mark_synced(self, scope: str) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync_state (scope, synced_at) VALUES (?, ?)",
+            (scope, time.time()),
+        )
+
+    async def sync_groups(self) -> None:
+        face_admin_client = get_client_registry().face_admin_client(telemetry=_TELEMETRY)
+        versions = dict(self._versions)
+        groups = []
+        start = None
+        while True:
+            page = await face_admin_client.large_person_group.get_large_person_groups(
+                start=start, top=PAGE_SIZE
+            )
+            groups.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            start = page[-1].large_person_group_id
+        listed = {g.large_person_group_id for g in groups}
+        stale = [
+            row[0]
+            for row in self._db.execute("SELECT group_id FROM groups")
+            # A group created while listing is not in the listing yet
+            if row[0] not in listed and self.version(row[0]) == versions.get(row[0], 0)
+        ]
+        for group_id in stale:
+            self.delete_group(group_id)
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO groups (group_id, name, user_data) VALUES (?, ?, ?) "
+                "ON CONFLICT (group_id) DO UPDATE SET name = excluded.name, user_data = excluded.user_data",
+                [(g.large_person_group_id, g.name, g.user_data) for g in groups],
+            )
+            self._mark_synced("groups")
+
+    async def _list_persons(self, face_admin_client, group_id: str) -> list:
+        persons = []
+        start = None
+        while True:
+            page = await face_admin_client.large_person_group.get_persons(
+                large_person_group_id=group_id, start=start, top=PAGE_SIZE
+            )
+            persons.extend(page)
+            if len(page) < PAGE_SIZE:
+                return persons
+            start = page[-1].person_id
+
+    async def sync_group(self, group_id: str, include_face_details: bool = True) -> None:
+        face_admin_client = get_client_registry().face_admin_client(telemetry=_TELEMETRY)
+        for _ in range(SYNC_ATTEMPTS):
+            version = self.version(group_id)
+            persons = await self._list_persons(face_admin_client, group_id)
+            # A face enrolled or deleted while listing may be missing from the listing, so
+            # replacing the group's rows with it would undo that write
+            if self.version(group_id) == version:
+                break
+        else:
+            # Still being written to; keep the write-through rows and sync again next time
+            if include_face_details:
+                await self._fetch_face_details(face_admin_client, group_id)
+            return
+        # Keep the metadata of faces we already know; persisted faces never change content
+        known = {
+            (row[0], row[1]): (row[2], row[3], row[4])
+            for row in self._db.execute(
+                "SELECT person_id, persisted_face_id, fetched, user_data, file_path "
+                "FROM faces WHERE group_id = ?",
+                (group_id,),
+            )
+        }
+        face_rows = []
+        for person in persons:
+            for position, pfid in enumerate(person.persisted_face_ids or []):
+                fetched, user_data, file_path = known.get(
+                    (person.person_id, pfid), (0, None, None)
+                )
+                face_rows.append(
+                    (group_id, person.person_id, pfid, position, fetched, user_data, file_path)
+                )
+        with self._db:
+            self._db.execute("DELETE FROM persons WHERE group_id = ?", (group_id,))
+            self._db.execute("DELETE FROM faces WHERE group_id = ?", (group_id,))
+            self._db.executemany(
+                "INSERT INTO persons (group_id, person_id, name, user_data) VALUES (?, ?, ?, ?)",
+                [(group_id, p.person_id, p.name, p.user_data) for p in persons],
+            )
+            self._db.executemany(
+                "INSERT INTO faces "
+                "(group_id, person_id, persisted_face_id, position, fetched, user_data, file_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                face_rows,
+            )
+            self._db.execute(
+                "INSERT OR IGNORE INTO groups (group_id) VALUES (?)", (group_id,)
+            )
+            self._mark_synced(f"group:{group_id}")
+        self._bump(group_id)
+        if include_face_details:
+            await self._fetch_face_details(face_admin_client, group_id)
+
+    async def _fetch_face_details(
+        self, face_admin_client, group_id: str, person_ids: list[str] | None = None
+    ) -> None:
+        missing = self._db.execute(
+            "SELECT person_id, persisted_face_id FROM faces WHERE group_id = ? AND fetched = 0",
+            (group_id,),
+        ).fetchall()
+        if person_ids is not None:
+            wanted = set(person_ids)
+            missing = [row for row in missing if row[0] in wanted]
+        if not missing:
+            return
+
+        async def _get_face(person_id: str, pfid: str):
+            try:
+                return await face_admin_client.large_person_group.get_face(
+                    large_person_group_id=group_id,
+                    person_id=person_id,
+                    persisted_face_id=pfid,
+                )
+            except Exception:
+                # The face may have been deleted since the person listing; it is retried next sync
+                return None
+
+        faces = await gather_bounded(
+            (_get_face(person_id, pfid) for person_id, pfid in missing),
+            get_client_registry().settings.max_concurrency,
+        )
+        with self._db:
+            self._db.executemany(
+                "UPDATE faces SET fetched = 1, user_data = ?, file_path = ? "
+                "WHERE group_id = ? AND person_id = ? AND persisted_face_id = ?",
+                [
+                    (face.user_data, _file_path_from_user_data(face.user_data), group_id, person_id, pfid)
+                    for (person_id, pfid), face in zip(missing, faces)
+                    if face is not None
+                ],
+            )
+        self._bump(group_id)
+
+    async def ensure_groups(self, refresh: bool = False) -> None:
+        if refresh or not self.is_fresh("groups"):
+            await self.sync_groups()
+
+    async def ensure_group(self, group_id: str, include_face_details: bool = True, refresh: bool = False) -> None:
+        if refresh or not self.is_fresh(f"group:{group_id}"):
+            await self.sync_group(group_id, include_face_details=include_face_details)
+        elif include_face_details:
+            await self._fetch_face_details(
+                get_client_registry().face_admin_client(telemetry=_TELEMETRY), group_id
+            )
+
+    async def ensure_face_details(self, group_id: str, person_ids: list[str]) -> None:
+        """Fetch the metadata of the given persons' faces that the index does not have yet."""
+        await self._fetch_face_details(
+            get_client_registry().face_admin_client(telemetry=_TELEMETRY),
+            group_id,
+            person_ids,
+        )
+
+    # Queries
+
+    def list_groups(self) -> list[tuple[str, str | None]]:
+        return self._db.execute(
+            "SELECT group_id, name FROM groups ORDER BY group_id"
+        ).fetchall()
+
+    def list_persons(self, group_id: str) -> list[tuple[str, str | None, list[tuple]]]:
+        """Persons of a group as (person_id, name, [(persisted_face_id, user_data, file_path), ...])."""
+        faces: dict[str, list[tuple]] = {}
+        for person_id, pfid, user_data, file_path in self._db.execute(
+            "SELECT person_id, persisted_face_id, user_data, file_path FROM faces "
+            "WHERE group_id = ? ORDER BY person_id, position",
+            (group_id,),
+        ):
+            faces.setdefault(person_id, []).append((pfid, user_data, file_path))
+        return [
+            (person_id, name, faces.get(person_id, []))
+            for person_id, name in self._db.execute(
+                "SELECT person_id, name FROM persons WHERE group_id = ? ORDER BY person_id",
+                (group_id,),
+            )
+        ]
+
+    def search(self, query: str, group_id: str | None = None) -> list[tuple]:
+        """
+        Case-insensitive substring search over person names and face file paths.
+        Returns (group_id, person_id, name, matching file_path or None) rows.
+        """
+        # The query is matched literally, so '%' and '_' in it are not wildcards
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        group_filter = "" if group_id is None else " AND p.group_id = ?"
+        group_args = () if group_id is None else (group_id,)
+        by_name = self._db.execute(
+            "SELECT p.group_id, p.person_id, p.name, NULL FROM persons p "
+            "WHERE p.name LIKE ? ESCAPE '\\'" + group_filter,
+            (pattern, *group_args),
+        ).fetchall()
+        by_file_path = self._db.execute(
+            "SELECT p.group_id, p.person_id, p.name, f.file_path FROM faces f "
+            "JOIN persons p ON p.group_id = f.group_id AND p.person_id = f.person_id "
+            "WHERE f.file_path LIKE ? ESCAPE '\\'" + group_filter,
+            (pattern, *group_args),
+        ).fetchall()
+        return sorted(set(by_name + by_file_path), key=lambda row: (row[0], row[2] or "", row[3] or ""))
+
+    def stats(self) -> dict:
+        stats = {"path": self.path}
+        for table in ("groups", "persons", "faces"):
+            stats[table] = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return stats
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_index: GroupIndex | None = None
+
+
+def get_group_index() -> GroupIndex:
+    global _index
+    if _index is None:
+        _index = GroupIndex.from_env()
+    return _index
@@ -0,0 +1,336 @@
+import asyncio
+import contextlib
+import getpass
+import hashlib
+import os
+import re
+import sqlite3
+import stat
+import tempfile
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ._clients import _env_int, get_client_registry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    validated_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_by_used_at ON images (used_at);
+CREATE INDEX IF NOT EXISTS images_by_sha256 ON images (sha256);
+"""
+
+# Query parameters of an Azure Storage SAS token; they grant access but do not select content
+SAS_PARAMETERS = frozenset(
+    {
+        "sv", "ss", "srt", "sp", "se", "st", "spr", "sig", "sr", "si", "sip", "ses", "sdd",
+        "skoid", "sktid", "skt", "ske", "sks", "skv", "saoid", "suoid", "scid",
+        "rscc", "rscd", "rsce", "rscl", "rsct",
+    }
+)
+
+_CHUNK_SIZE = 64 * 1024
+
+# Subdirectory of the cache directory that holds the index and the image files; nothing
+# outside it is ever written or deleted
+CACHE_SUBDIR = "azure-face-mcp-cache"
+_CONTENT_NAME = re.compile(r"[0-9a-f]{64}")
+# Unreferenced files younger than this may belong to a download of another server process
+_ORPHAN_MIN_AGE_SECONDS = 3600
+
+
+def cache_url_key(url: str) -> str:
+    """The URL an image is cached under: its SAS token, if any, and fragment removed."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if any(name.lower() == "sig" for name, _ in query):
+        query = [(name, value) for name, value in query if name.lower() not in SAS_PARAMETERS]
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), "")
+    )
+
+
+def _user_id() -> str:
+    return str(os.getuid()) if hasattr(os, "getuid") else getpass.getuser()
+
+
+def _make_private_dir(path: str) -> None:
+    """Create `path` with mode 0700, refusing a directory that another user could write."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(
+            f"Image cache directory {path} is not a directory owned by the current user; "
+            "set AZURE_FACE_IMAGE_CACHE_PATH to a private location"
+        )
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        os.chmod(path, 0o700)
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    # HTTP status of the download, 200 when served from the cache
+    status: int
+    # Local file holding the image content, None when it could not be downloaded
+    path: str | None = None
+
+
+class ImageCache:
+    """
+    Disk cache of images downloaded by URL, so each remote image crosses the network once.
+
+    Entries are keyed on the URL without its SAS token, so rotated tokens still hit, and the
+    content is stored once per SHA-256 however many URLs point to it. An entry is revalidated
+    with a conditional GET (ETag or Last-Modified) once it is older than `revalidate_seconds`,
+    and the least recently used entries are evicted once the files exceed `max_bytes`.
+
+    Files are kept in a subdirectory of `directory` that the cache creates itself, readable
+    only by the current user.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        revalidate_seconds: int = 60,
+    ):
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), f"azure-face-mcp-images-{_user_id()}"
+        )
+        self.content_dir = os.path.join(self.directory, CACHE_SUBDIR)
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._db = None
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ImageCache":
+        return cls(
+            directory=os.getenv("AZURE_FACE_IMAGE_CACHE_PATH") or None,
+            max_bytes=_env_int("AZURE_FACE_IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+            revalidate_seconds=_env_int("AZURE_FACE_IMAGE_CACHE_REVALIDATE", 60),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            _make_private_dir(self.content_dir)
+            self._db = sqlite3.connect(os.path.join(self.content_dir, "index.sqlite"))
+            self._db.executescript(_SCHEMA)
+            known = set()
+            for sha256, size in self._db.execute(
+                "SELECT sha256, MAX(size) FROM images GROUP BY sha256"
+            ):
+                known.add(sha256)
+                self._bytes += size
+            self._remove_orphans(known)
+        return self._db
+
+    def _remove_orphans(self, known: set[str]) -> None:
+        # Content left behind by an interrupted download or a failed eviction
+        stale_before = time.time() - _ORPHAN_MIN_AGE_SECONDS
+        for entry in os.scandir(self.content_dir):
+            orphan = (_CONTENT_NAME.fullmatch(entry.name) and entry.name not in known) or (
+                entry.name.endswith(".part")
+            )
+            if not orphan or not entry.is_file(follow_symlinks=False):
+                continue
+            with contextlib.suppress(OSError):
+                if entry.stat(follow_symlinks=False).st_mtime < stale_before:
+                    os.remove(entry.path)
+
+    def _content_path(self, sha256: str) -> str:
+        return os.path.join(self.content_dir, sha256)
+
+    async def fetch(self, url: str) -> CachedImage:
+        """
+        Return the cached file of the image at `url`, downloading it if it is not cached or
+        has changed. Concurrent fetches of the same URL share one download.
+        """
+        key = cache_url_key(url)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            image = await self._fetch(url, key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it here so a failure nobody else waited on is not logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(image)
+            return image
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, url: str, key: str) -> CachedImage:
+        db = self._open()
+        row = db.execute(
+            "SELECT etag, last_modified, sha256, validated_at FROM images WHERE url = ?", (key,)
+        ).fetchone()
+        if row is not None and not os.path.exists(self._content_path(row[2])):
+            row = None
+        now = time.time()
+        if row is not None and now - row[3] < self.revalidate_seconds:
+            self.hits += 1
+            self._touch(key, now, validated=False)
+            return CachedImage(200, self._content_path(row[2]))
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        async with get_client_registry().http_session().get(url, headers=headers) as response:
+            if response.status == 304 and row is not None:
+                self.hits += 1
+                self.revalidated += 1
+                self._touch(key, now, validated=True)
+                return CachedImage(200, self._content_path(row[2]))
+            if response.status != 200:
+                return CachedImage(response.status)
+            self.misses += 1
+            sha256, size = await self._store(response)
+            self._put(
+                key,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                sha256,
+                size,
+            )
+        return CachedImage(200, self._content_path(sha256))
+
+    async def _store(self, response) -> tuple[str, int]:
+        # Streamed to a temporary file and renamed to its content hash once complete
+        fd, temp_path = tempfile.mkstemp(dir=self.content_dir, suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            if os.path.exists(self._content_path(sha256)):
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, self._content_path(sha256))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+            raise
+        return sha256, size
+
+    def _touch(self, key: str, now: float, validated: bool) -> None:
+        with self._db:
+            if validated:
+                self._db.execute(
+                    "UPDATE images SET used_at = ?, validated_at = ? WHERE url = ?", (now, now, key)
+                )
+            else:
+                self._db.execute("UPDATE images SET used_at = ? WHERE url = ?", (now, key))
+
+    def _put(
+        self, key: str, etag: str | None, last_modified: str | None, sha256: str, size: int
+    ) -> None:
+        now = time.time()
+        with self._db:
+            previous = self._db.execute("SELECT sha256 FROM images WHERE url = ?", (key,)).fetchone()
+            if not self._referenced(sha256):
+                self._bytes += size
+            self._db.execute(
+                "INSERT OR REPLACE INTO images "
+                "(url, etag, last_modified, sha256, size, validated_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, sha256, size, now, now),
+            )
+            if previous is not None and previous[0] != sha256:
+                self._release(previous[0], size=None)
+            self._evict(keep=sha256)
+
+    def _referenced(self, sha256: str) -> bool:
+        return (
+            self._db.execute("SELECT 1 FROM images WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+            is not None
+        )
+
+    def _release(self, sha256: str, size: int | None) -> None:
+        # Delete the content once no URL refers to it any more
+        if self._referenced(sha256):
+            return
+        path = self._content_path(sha256)
+        if size is None:
+            with contextlib.suppress(OSError):
+                size = os.path.getsize(path)
+        self._bytes -= size or 0
+        # A file still open elsewhere cannot be removed on Windows; it is cleaned up on restart
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+    def _evict(self, keep: str) -> None:
+        # The image just fetched is kept even if it alone exceeds the budget
+        while self._bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, sha256, size FROM images WHERE sha256 != ? ORDER BY used_at LIMIT 1",
+                (keep,),
+            ).fetchone()
+            if row is None:
+                return
+            self._db.execute("DELETE FROM images WHERE url = ?", (row[0],))
+            self._release(row[1], row[2])
+            self.evictions += 1
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        entries = 0
+        if self._db is not None:
+            entries = self._db.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+
+_cache: ImageCache | None = None
+
+
+def get_image_cache() -> ImageCache:
+    global _cache
+    if _cache is None:
+        _cache = ImageCache.from_env()
+    return _cache
@@ -0,0 +1,123 @@
+import asyncio
+import mmap
+import os
+
+import aiohttp
+
+from ._clients import _env_int, get_client_registry
+from ._image_cache import get_image_cache
+from ._preprocess import PreparedImage, prepare_upload
+
+# Local images at least this large are memory-mapped instead of copied into memory
+MMAP_THRESHOLD = _env_int("AZURE_FACE_IMAGE_MMAP_THRESHOLD", 4 * 1024 * 1024)
+
+
+class ImageSource:
+    """
+    An image read once and shared by every Face API call of one tool invocation.
+
+    Local files are read into memory (memory-mapped when large). URLs are read through the
+    local image cache, so a remote image is downloaded once and later calls reuse the file.
+    With the cache disabled, URLs are either left for the Face service to fetch, or downloaded
+    once with `download=True` when the caller needs the bytes more than once. Use it as an async
+    context manager so the buffer is released.
+    """
+
+    def __init__(self, path: str, is_url: bool = False, download: bool = False):
+        self.path = path
+        self.is_url = is_url
+        self.download = download
+        self.status: int | None = None
+        # Why a URL could not be downloaded when no HTTP status was received
+        self.error: str | None = None
+        self._content: memoryview | None = None
+        self._mmap: mmap.mmap | None = None
+        self._prepared: PreparedImage | None = None
+
+    async def __aenter__(self) -> "ImageSource":
+        await self.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def load(self) -> None:
+        if self.is_url:
+            await self._load_url()
+            return
+        if not os.path.exists(self.path):
+            return
+        self._read_file(self.path)
+        self.status = 200
+
+    async def _load_url(self) -> None:
+        cache = get_image_cache()
+        try:
+            if not cache.enabled:
+                if self.download:
+                    async with get_client_registry().http_session().get(self.path) as response:
+                        self.status = response.status
+                        if response.status == 200:
+                            self._content = memoryview(await response.read())
+                return
+            image = await cache.fetch(self.path)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Reported like an HTTP error status; without `download` the Face service fetches
+            # the URL itself
+            self.status = None
+            self.error = str(e) or type(e).__name__
+            return
+        if image.path is not None:
+            # Read before anything else runs, so the file cannot be evicted in between
+            self._read_file(image.path)
+            self.status = 200
+        elif self.download:
+            self.status = image.status
+
+    def _read_file(self, path: str) -> None:
+        with open(path, "rb") as image_file:
+            size = os.fstat(image_file.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                self._mmap = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._content = memoryview(self._mmap)
+            else:
+                self._content = memoryview(image_file.read())
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 or (self.is_url and not self.download)
+
+    @property
+    def content(self) -> memoryview | None:
+        return self._content
+
+    async def prepared(self) -> PreparedImage:
+        """
+        The bytes to upload for this image, prepared once and shared by detection and add_face.
+        Raises UnsupportedImageError if the content is not a readable image.
+        """
+        if self._prepared is None:
+            self._prepared = await prepare_upload(self._content)
+        return self._prepared
+
+    def face_source(self) -> dict:
+        """Keyword arguments selecting this image for detect_faces / add_face."""
+        if self.is_url and self._content is None:
+            return {"url": self.path}
+        return {"image_content": self._content}
+
+    def close(self) -> None:
+        # A request payload may still reference the buffer; it is then freed once collected
+        if self._content is not None:
+            try:
+                self._content.release()
+            except BufferError:
+                pass
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+        self._content = None
+        self._mmap = None
+        self._prepared = None
@@ -0,0 +1,78 @@
+import asyncio
+import email.utils
+import random
+import time
+
+from openai import RateLimitError
+
+from ._clients import get_client_registry
+
+# Bounds in seconds for the backoff between retries of a throttled request
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+def _retry_after(error: RateLimitError) -> float | None:
+    """Seconds the service asked us to wait, from the retry-after-ms or Retry-After header."""
+    headers = error.response.headers
+    for header, divisor in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return float(value) / divisor
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        parsed = email.utils.parsedate_tz(value)
+        if parsed is not None:
+            return email.utils.mktime_tz(parsed) - time.time()
+    return None
+
+
+class RateLimitBackoff:
+    """
+    Retries Azure OpenAI requests rejected with 429 once the SDK's own retries are used up.
+
+    The pause is shared: when one request is throttled, every request sent through the same
+    instance waits until the deployment is expected to accept calls again, instead of each
+    concurrent request running into the limit on its own.
+    """
+
+    def __init__(self, max_retries: int = 5):
+        self.max_retries = max_retries
+        self._resume_at = 0.0
+
+    async def _wait_turn(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def call(self, request, *args, **kwargs):
+        """Await `request(*args, **kwargs)`, backing off and retrying on RateLimitError."""
+        attempt = 0
+        while True:
+            await self._wait_turn()
+            try:
+                return await request(*args, **kwargs)
+            except RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None or delay <= 0:
+                    # Full jitter keeps throttled requests from retrying in lockstep
+                    delay = random.uniform(0, INITIAL_BACKOFF * 2**attempt)
+                delay = min(delay, MAX_BACKOFF)
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                attempt += 1
+
+
+_backoff: RateLimitBackoff | None = None
+
+
+def get_openai_backoff() -> RateLimitBackoff:
+    global _backoff
+    if _backoff is None:
+        _backoff = RateLimitBackoff(get_client_registry().settings.openai_max_retries)
+    return _backoff
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ._clients import _env_int
+from ._group_index import get_group_index
+
+
+@dataclass(frozen=True)
+class PersonInfo:
+    name: str | None
+    face_user_data: tuple[str, ...] = ()
+
+
+@dataclass
+class _GroupEntry:
+    version: int
+    persons: dict[str, PersonInfo]
+    # Persons whose face user_data has been loaded; names are loaded for the whole group
+    detailed: set[str]
+
+
+class PersonNameCache:
+    """
+    In-process personId -> name (and enrolled face user_data) map per large person group.
+
+    A group is loaded in bulk from the local group index, which pages through the Face API
+    when the group is not synced yet. An entry is dropped as soon as the index records a change
+    to its group (enroll, delete or re-sync), and whole groups are evicted least recently used
+    once more than `max_persons` persons are cached.
+    """
+
+    def __init__(self, max_persons: int = 50000):
+        self.max_persons = max_persons
+        self._groups: OrderedDict[str, _GroupEntry] = OrderedDict()
+        self._persons = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "PersonNameCache":
+        return cls(max_persons=_env_int("AZURE_FACE_PERSON_CACHE_SIZE", 50000))
+
+    async def lookup(self, group_id: str, person_ids: list[str]) -> dict[str, PersonInfo]:
+        index = get_group_index()
+        wanted = set(person_ids)
+        entry = self._fresh_entry(group_id)
+        if entry is not None and wanted <= entry.detailed:
+            self.hits += 1
+            return {pid: entry.persons[pid] for pid in wanted if pid in entry.persons}
+        self.misses += 1
+        detailed = set(entry.detailed) if entry is not None else set()
+        refreshed = False
+        while True:
+            await index.ensure_group(group_id, include_face_details=False, refresh=refreshed)
+            # Face metadata is only fetched for the persons asked for, not the whole group
+            await index.ensure_face_details(group_id, list(wanted))
+            persons = {
+                person_id: PersonInfo(
+                    name=name,
+                    face_user_data=tuple(user_data for _, user_data, _ in faces if user_data),
+                )
+                for person_id, name, faces in index.list_persons(group_id)
+            }
+            if refreshed or wanted <= persons.keys():
+                break
+            # Persons the index does not know were enrolled outside this server: re-sync once
+            refreshed = True
+        self._store(
+            group_id,
+            _GroupEntry(
+                version=index.version(group_id), persons=persons, detailed=detailed | wanted
+            ),
+        )
+        return {pid: persons[pid] for pid in wanted if pid in persons}
+
+    def _fresh_entry(self, group_id: str) -> _GroupEntry | None:
+        entry = self._groups.get(group_id)
+        if entry is None:
+            return None
+        if entry.version != get_group_index().version(group_id):
+            self.invalidate(group_id)
+            return None
+        self._groups.move_to_end(group_id)
+        return entry
+
+    def _store(self, group_id: str, entry: _GroupEntry) -> None:
+        self.invalidate(group_id)
+        if len(entry.persons) > self.max_persons:
+            return
+        self._groups[group_id] = entry
+        self._persons += len(entry.persons)
+        while self._persons > self.max_persons:
+            oldest = next(iter(self._groups))
+            self.invalidate(oldest)
+            self.evictions += 1
+
+    def invalidate(self, group_id: str) -> None:
+        entry = self._groups.pop(group_id, None)
+        if entry is not None:
+            self._persons -= len(entry.persons)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "groups": len(self._groups),
+            "persons": self._persons,
+            "evictions": self.evictions,
+        }
+
+
+_cache: PersonNameCache | None = None
+
+
+def get_person_cache() -> PersonNameCache:
+    global _cache
+    if _cache is None:
+        _cache = PersonNameCache.from_env()
+    return _cache
@@ -0,0 +1,157 @@
+import asyncio
+import struct
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from azure.ai.vision.face.models import FaceDetectionResult
+
+from ._clients import _env_int
+
+# The Face API accepts image files of up to 6 MB
+MAX_UPLOAD_BYTES = 6 * 1024 * 1024
+
+# Faces down to 36x36 pixels are detected in images up to 1920x1080; larger images need
+# proportionally larger faces, so fitting an image into this size loses no detectable face
+MAX_UPLOAD_SIDE = _env_int("AZURE_FACE_UPLOAD_MAX_SIDE", 1920)
+UPLOAD_JPEG_QUALITY = _env_int("AZURE_FACE_UPLOAD_JPEG_QUALITY", 90)
+
+# Formats the Face API decodes itself; other formats OpenCV can read are converted to JPEG
+_FACE_API_FORMATS = ("jpeg", "png", "gif", "bmp")
+
+# File extensions of the images prepare_upload accepts, i.e. the Face API formats plus the
+# WEBP and TIFF files it converts; other files in an image folder are skipped
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff")
+
+
+class UnsupportedImageError(ValueError):
+    """The image is corrupt or in a format that can neither be uploaded nor converted."""
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    content: bytes | memoryview
+    # Size of the uploaded image relative to the original (1.0 when sent unchanged)
+    scale: float = 1.0
+
+
+def _jpeg_size(data) -> tuple[int, int] | None:
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        # Start-of-frame markers carry the dimensions; C4, C8 and CC are other segments
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def sniff_image(data) -> tuple[str, int | None, int | None] | None:
+    """
+    Format and (width, height) read from the file header only, or None if the data is not a
+    recognised image. The size is None for formats that are always converted.
+    """
+    header = bytes(data[:32])
+    try:
+        if header.startswith(b"\xff\xd8\xff"):
+            size = _jpeg_size(data)
+            return ("jpeg", *size) if size else None
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return ("png", *struct.unpack(">II", header[16:24]))
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return ("gif", *struct.unpack("<HH", header[6:10]))
+        if header.startswith(b"BM"):
+            width, height = struct.unpack("<ii", header[18:26])
+            return "bmp", abs(width), abs(height)
+    except struct.error:
+        return None
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "webp", None, None
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff", None, None
+    return None
+
+
+def _fit_scale(width: int, height: int) -> float:
+    if MAX_UPLOAD_SIDE <= 0:
+        return 1.0
+    long_side, short_side = max(width, height), min(width, height)
+    return min(1.0, MAX_UPLOAD_SIDE / long_side, MAX_UPLOAD_SIDE * 9 / 16 / short_side)
+
+
+def _reencode(data) -> PreparedImage:
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise UnsupportedImageError("the image data is corrupt or cannot be decoded")
+    height, width = image.shape[:2]
+    scale = _fit_scale(width, height)
+    if scale < 1.0:
+        image = cv2.resize(
+            image,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+        scale = image.shape[1] / width
+    quality = UPLOAD_JPEG_QUALITY
+    encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1]
+    while encoded.nbytes > MAX_UPLOAD_BYTES and quality > 50:
+        quality -= 10
+        encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])[1]
+    return PreparedImage(encoded.tobytes(), scale)
+
+
+async def prepare_upload(data) -> PreparedImage:
+    """
+    Validate an image by its header and return the bytes to upload to the Face API. Images
+    already within the Face API limits are sent unchanged; larger ones are downscaled and
+    re-encoded as JPEG in a worker thread.
+    """
+    info = sniff_image(data)
+    if info is None:
+        raise UnsupportedImageError(
+            "the image is not a JPEG, PNG, GIF, BMP, WEBP or TIFF file, or its header is corrupt"
+        )
+    image_format, width, height = info
+    if (
+        image_format in _FACE_API_FORMATS
+        and width
+        and height
+        and _fit_scale(width, height) == 1.0
+        and len(data) <= MAX_UPLOAD_BYTES
+    ):
+        return PreparedImage(data)
+    return await asyncio.to_thread(_reencode, data)
+
+
+def project_faces(faces: list[FaceDetectionResult], scale: float) -> list[FaceDetectionResult]:
+    """Map face rectangles and landmarks detected on a downscaled image back to the original."""
+    if scale == 1.0:
+        return faces
+    projected = []
+    for face in faces:
+        face_dict = face.as_dict()
+        rectangle = face_dict.get("faceRectangle")
+        if rectangle:
+            face_dict["faceRectangle"] = {
+                name: round(value / scale) for name, value in rectangle.items()
+            }
+        landmarks = face_dict.get("faceLandmarks")
+        if landmarks:
+            face_dict["faceLandmarks"] = {
+                name: {"x": round(point["x"] / scale, 1), "y": round(point["y"] / scale, 1)}
+                for name, point in landmarks.items()
+            }
+        projected.append(FaceDetectionResult(face_dict))
+    return projected
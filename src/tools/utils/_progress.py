@@ -0,0 +1,37 @@
+from typing import Literal
+
+from mcp.server.fastmcp import Context
+
+LogLevel = Literal["debug", "info", "warning", "error"]
+
+
+async def report_progress(
+    ctx: Context | None,
+    progress: float,
+    total: float | None = None,
+    message: str | None = None,
+    log_level: LogLevel | None = "info",
+) -> None:
+    """
+    Send an MCP progress notification (and the message as a log at `log_level`, unless it is
+    None) for long-running tools. A no-op when the tool is not called through an MCP request.
+    """
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress, total, message)
+        if message and log_level:
+            await ctx.log(log_level, message)
+    except ValueError:
+        # Context is not bound to an MCP request, e.g. when FastMCP.call_tool is used directly
+        pass
+
+
+async def log_message(ctx: Context | None, level: LogLevel, message: str) -> None:
+    """Send an MCP log message; a no-op when the tool is not called through an MCP request."""
+    if ctx is None:
+        return
+    try:
+        await ctx.log(level, message)
+    except ValueError:
+        pass
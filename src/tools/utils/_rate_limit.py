@@ -0,0 +1,154 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+from azure.core.pipeline.policies import AsyncHTTPPolicy, AsyncRetryPolicy
+
+
+class TokenBucket:
+    """
+    Token bucket admitting `rate` requests per second with bursts of up to `burst`.
+
+    Requests reserve their slot on arrival, so waiters are admitted in arrival order without
+    a lock. pause() holds every request back until a throttled endpoint accepts calls again.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst else rate)
+        self._interval = 1.0 / rate
+        # Theoretical arrival time of the next request; up to burst - 1 slots may be used early
+        self._tat = 0.0
+        self._tolerance = (self.burst - 1) * self._interval
+        self._resume_at = 0.0
+        self.requests = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.throttled = 0
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        tat = max(self._tat, now, self._resume_at)
+        self._tat = tat + self._interval
+        return max(tat - self._tolerance - now, self._resume_at - now, 0.0)
+
+    async def acquire(self) -> None:
+        self.requests += 1
+        delay = self._reserve()
+        if delay <= 0:
+            return
+        self.waited += 1
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.monotonic()
+        try:
+            await asyncio.sleep(delay)
+            # A pause that started while this request was queued applies to it as well
+            while (remaining := self._resume_at - time.monotonic()) > 0:
+                await asyncio.sleep(remaining)
+        finally:
+            self.queue_depth -= 1
+            self.wait_seconds += time.monotonic() - started
+
+    def pause(self, seconds: float) -> None:
+        self.throttled += 1
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "requests": self.requests,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "throttled": self.throttled,
+        }
+
+
+def face_operation(url: str) -> str:
+    """Face API operation of a request URL, e.g. 'detect' or 'largepersongroups'."""
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if "face" in segments:
+        # /face/<api version>/<operation>/...
+        segments = segments[segments.index("face") + 2 :]
+    return segments[0].lower() if segments else ""
+
+
+class FaceRateLimiter:
+    """
+    Process-wide limiter for Face API calls: one token bucket per Face endpoint, plus an
+    optional bucket per operation (detect, identify, findsimilars, verify, largepersongroups,
+    ...) with its own rate. A request waits until every bucket that applies to it admits it.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: float | None = None,
+        operation_rates: dict[str, float] | None = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.operation_rates = operation_rates or {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, name: str, rate: float, burst: float | None) -> TokenBucket:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = TokenBucket(rate, burst)
+        return bucket
+
+    def buckets_for(self, url: str) -> list[TokenBucket]:
+        host = urlparse(url).netloc
+        buckets = []
+        if self.rate > 0:
+            buckets.append(self._bucket(host, self.rate, self.burst))
+        operation = face_operation(url)
+        operation_rate = self.operation_rates.get(operation, 0)
+        if operation_rate > 0:
+            buckets.append(self._bucket(f"{host} {operation}", operation_rate, None))
+        return buckets
+
+    def stats(self) -> dict:
+        return {name: bucket.stats() for name, bucket in self._buckets.items()}
+
+
+class RateLimitPolicy(AsyncHTTPPolicy):
+    """
+    Pipeline policy placed after the retry policy, so every attempt, retries included, waits
+    for a token. A 429 pauses the endpoint's buckets for the Retry-After time (or a jittered
+    second when there is none), so concurrent calls back off together.
+    """
+
+    def __init__(self, limiter: FaceRateLimiter):
+        super().__init__()
+        self._limiter = limiter
+
+    async def send(self, request):
+        buckets = self._limiter.buckets_for(request.http_request.url)
+        for bucket in buckets:
+            await bucket.acquire()
+        response = await self.next.send(request)
+        if response.http_response.status_code == 429:
+            retry_after = AsyncRetryPolicy().get_retry_after(response)
+            delay = retry_after if retry_after else random.uniform(0.5, 1.5)
+            for bucket in buckets:
+                bucket.pause(delay)
+        return response
+
+
+class JitteredRetryPolicy(AsyncRetryPolicy):
+    """
+    azure-core's retry policy, which already retries 429 and honours Retry-After, with jitter
+    added to its exponential backoff so throttled calls do not retry in lockstep.
+    """
+
+    def get_backoff_time(self, settings) -> float:
+        backoff = super().get_backoff_time(settings)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
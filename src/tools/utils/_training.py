@@ -0,0 +1,155 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from ._clients import _env_float, get_client_registry
+
+_TELEMETRY = "sample=mcp-face-reco-train"
+
+
+@dataclass
+class GroupTrainingState:
+    # idle | pending | training | succeeded | failed
+    status: str = "idle"
+    pending_mutations: int = 0
+    last_mutation_at: float = 0.0
+    last_trained_at: str | None = None
+    message: str | None = None
+    flush_requested: bool = False
+    wake: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+
+class TrainingScheduler:
+    """
+    Debounced per-group training of large person groups.
+
+    Enroll and delete call mark_dirty(); once a group has seen no mutation for
+    `quiet_period` seconds it is trained once in the background, polling the training
+    status with exponential backoff up to `max_poll_interval` seconds.
+    """
+
+    def __init__(self, quiet_period: float = 5.0, max_poll_interval: float = 30.0):
+        self.quiet_period = quiet_period
+        self.max_poll_interval = max_poll_interval
+        self._states: dict[str, GroupTrainingState] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "TrainingScheduler":
+        return cls(
+            quiet_period=_env_float("AZURE_FACE_TRAINING_QUIET_PERIOD", 5.0),
+            max_poll_interval=_env_float("AZURE_FACE_TRAINING_MAX_POLL_INTERVAL", 30.0),
+        )
+
+    def mark_dirty(self, group_uuid: str, mutations: int = 1) -> None:
+        state = self._states.setdefault(group_uuid, GroupTrainingState())
+        state.pending_mutations += mutations
+        state.last_mutation_at = time.monotonic()
+        if state.status != "training":
+            state.status = "pending"
+        task = self._tasks.get(group_uuid)
+        if task is None or task.done():
+            self._tasks[group_uuid] = asyncio.create_task(self._run(group_uuid))
+
+    async def flush(self, group_uuid: str) -> GroupTrainingState | None:
+        """Train now if mutations are pending and wait for the group's training to finish."""
+        state = self._states.get(group_uuid)
+        task = self._tasks.get(group_uuid)
+        if state is None or task is None or task.done():
+            return state
+        state.flush_requested = True
+        state.wake.set()
+        await asyncio.wait([task])
+        return state
+
+    def forget(self, group_uuid: str) -> None:
+        task = self._tasks.pop(group_uuid, None)
+        if task is not None:
+            task.cancel()
+        self._states.pop(group_uuid, None)
+
+    async def _run(self, group_uuid: str) -> None:
+        state = self._states[group_uuid]
+        while True:
+            # Wait for a quiet period with no new mutations, unless a flush was requested
+            while not state.flush_requested:
+                delay = state.last_mutation_at + self.quiet_period - time.monotonic()
+                if delay <= 0:
+                    break
+                state.wake.clear()
+                try:
+                    await asyncio.wait_for(state.wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            state.pending_mutations = 0
+            await self._train(group_uuid, state)
+            if state.pending_mutations == 0:
+                break
+        state.flush_requested = False
+
+    async def _train(self, group_uuid: str, state: GroupTrainingState) -> None:
+        face_admin_client = get_client_registry().face_admin_client(telemetry=_TELEMETRY)
+        state.message = None
+        try:
+            await face_admin_client.large_person_group.begin_train(
+                large_person_group_id=group_uuid, polling=False
+            )
+            state.status = "training"
+            interval = 0.5
+            while True:
+                await asyncio.sleep(interval)
+                result = await face_admin_client.large_person_group.get_training_status(
+                    large_person_group_id=group_uuid
+                )
+                if result.status in ("succeeded", "failed"):
+                    break
+                interval = min(interval * 2, self.max_poll_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.status = "failed"
+            state.message = str(e)
+            return
+        state.status = result.status
+        state.message = result.message
+        if result.status == "succeeded":
+            state.last_trained_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def status(self, group_uuid: str | None = None) -> dict[str, GroupTrainingState]:
+        if group_uuid is not None:
+            return {group_uuid: self._states[group_uuid]} if group_uuid in self._states else {}
+        return dict(self._states)
+
+    async def aclose(self) -> None:
+        """Cancel background polling, but still start training for groups with pending mutations."""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        face_admin_client = None
+        for group_uuid, state in self._states.items():
+            if state.status != "pending" and state.pending_mutations == 0:
+                continue
+            face_admin_client = face_admin_client or get_client_registry().face_admin_client(
+                telemetry=_TELEMETRY
+            )
+            try:
+                await face_admin_client.large_person_group.begin_train(
+                    large_person_group_id=group_uuid, polling=False
+                )
+                state.status = "training"
+            except Exception as e:
+                state.status = "failed"
+                state.message = str(e)
+        self._states.clear()
+
+
+_scheduler: TrainingScheduler | None = None
+
+
+def get_training_scheduler() -> TrainingScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TrainingScheduler.from_env()
+    return _scheduler
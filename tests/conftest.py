@@ -1,5 +1,15 @@
 # conftest.py
+import asyncio
+import json
+import sys
 from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils import _clients
 
 try:
     from dotenv import load_dotenv  # pip install python-dotenv
@@ -9,3 +19,76 @@ try:
     print(f"[pytest] .env loaded from {env_path}")
 except Exception as e:
     print(f"[pytest] Could not load .env: {e}")
+
+
+class StubLargePersonGroup:
+    """In-memory stand-in for FaceAdministrationClient.large_person_group."""
+
+    def __init__(self, persons=()):
+        self.persons = list(persons)
+        self.get_persons_calls = []
+        self.get_face_calls = 0
+        self.train_calls = []
+        self.status_calls = 0
+
+    async def get_persons(self, large_person_group_id, start=None, top=None):
+        self.get_persons_calls.append(start)
+        ordered = sorted(self.persons, key=lambda p: p.person_id)
+        if start is not None:
+            ordered = [p for p in ordered if p.person_id > start]
+        return ordered[:top]
+
+    async def get_face(self, large_person_group_id, person_id, persisted_face_id):
+        self.get_face_calls += 1
+        return SimpleNamespace(
+            user_data=json.dumps({"file_path": f"/faces/{persisted_face_id}.jpg"})
+        )
+
+    async def begin_train(self, large_person_group_id, polling):
+        self.train_calls.append(large_person_group_id)
+
+    async def get_training_status(self, large_person_group_id):
+        self.status_calls += 1
+        return SimpleNamespace(status="succeeded", message=None)
+
+    async def create_person(self, large_person_group_id, name):
+        person = SimpleNamespace(
+            person_id=f"p{len(self.persons)}", name=name, user_data=None, persisted_face_ids=[]
+        )
+        self.persons.append(person)
+        return person
+
+    async def add_face(self, large_person_group_id, person_id, image_content, **kwargs):
+        person = next(p for p in self.persons if p.person_id == person_id)
+        person.persisted_face_ids.append(f"{person_id}-f{len(person.persisted_face_ids)}")
+        return SimpleNamespace(persisted_face_id=person.persisted_face_ids[-1])
+
+
+class StubRegistry:
+    settings = _clients.ClientSettings()
+
+    def __init__(self, persons=()):
+        self.lpg = StubLargePersonGroup(persons)
+        # Set by tests that detect faces, e.g. to a SimpleNamespace with an async detect
+        self.face = None
+
+    def face_admin_client(self, telemetry):
+        return SimpleNamespace(large_person_group=self.lpg)
+
+    def face_client(self, telemetry):
+        return self.face
+
+
+@pytest.fixture
+def run_with_stub_registry():
+    """Run `coro_fn()` with a stub client registry; returns its result and the stub group."""
+
+    def _run(coro_fn, persons=()):
+        registry = StubRegistry(persons)
+        _clients.set_client_registry(registry)
+        try:
+            return asyncio.run(coro_fn()), registry.lpg
+        finally:
+            _clients.set_client_registry(None)
+
+    return _run
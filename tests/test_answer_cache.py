@@ -0,0 +1,45 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._answer_cache import AnswerCache, answer_key
+
+
+def test_key_normalizes_attribute_name():
+    assert answer_key("crop", "  Hair   Color ", "gpt-4.1") == answer_key("crop", "hair color", "gpt-4.1")
+    assert answer_key("crop", "hair color", "gpt-4.1") != answer_key("crop", "hair color", "gpt-4o")
+    assert answer_key("crop", "hair color", "gpt-4.1") != answer_key("other", "hair color", "gpt-4.1")
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = AnswerCache(max_entries=2)
+    a, b, c = (answer_key(crop, "glasses", "m") for crop in ("a", "b", "c"))
+    cache.put(a, "none")
+    cache.put(b, "sunglasses")
+    assert cache.get(a) == "none"
+    cache.put(c, "reading")
+    assert cache.get(b) is None
+    assert cache.get(a) == "none"
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["evictions"] == 1
+
+
+def test_disk_tier_survives_restart_and_is_pruned(tmp_path):
+    path = str(tmp_path / "answers.sqlite3")
+    cache = AnswerCache(max_entries=8, path=path, max_disk_entries=2)
+    keys = [answer_key(crop, "hair color", "m") for crop in ("a", "b", "c")]
+    for key, answer in zip(keys, ("brown", "black", "blond")):
+        cache.put(key, answer)
+    cache.close()
+
+    reopened = AnswerCache(max_entries=8, path=path, max_disk_entries=2)
+    # The oldest answer was pruned from the file; the others are served from disk
+    assert reopened.get(keys[0]) is None
+    assert reopened.get(keys[2]) == "blond"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.stats()["disk_entries"] == 2
+    # Promoted to memory, so the next lookup does not touch the file
+    assert reopened.get(keys[2]) == "blond"
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
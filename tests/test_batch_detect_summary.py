@@ -0,0 +1,82 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.BatchDetectFaces import _parse_flag_rules, detect_faces_in_batch, summarize_detections
+from tools.utils import _clients, _detection_cache
+from tools.utils._detection_cache import DetectionCache
+
+
+def _face(glasses: str, mask_type: str, covered: bool, age: float) -> dict:
+    return {
+        "faceRectangle": {"top": 0, "left": 0, "width": 10, "height": 10},
+        "faceAttributes": {
+            "glasses": glasses,
+            "mask": {"type": mask_type, "noseAndMouthCovered": covered},
+            "age": age,
+        },
+    }
+
+
+def test_summary_counts_values_and_flags_matching_images():
+    results = [
+        ("a.jpg", [_face("NoGlasses", "faceMask", True, 20.0), _face("Sunglasses", "noMask", False, 40.0)]),
+        ("b.jpg", [_face("NoGlasses", "faceMask", True, 30.0)]),
+        ("c.jpg", []),
+        ("d.jpg", FileNotFoundError("image file does not exist")),
+    ]
+    blocks = summarize_detections(
+        results, _parse_flag_rules(["mask.noseAndMouthCovered=false", "glasses = SUNGLASSES", "bad"])
+    )
+    summary, flagged, without_faces, failed = blocks
+    assert "Attribute summary over 3 face(s):" in summary
+    assert "- glasses: NoGlasses=2, Sunglasses=1" in summary
+    assert "- mask.noseAndMouthCovered: true=2, false=1" in summary
+    assert "- age: min=20.00, mean=30.00, max=40.00" in summary
+    assert flagged.splitlines()[0] == (
+        "Flagged 1 image(s) matching mask.noseAndMouthCovered=false, glasses=SUNGLASSES:"
+    )
+    assert "- a.jpg: 1 face(s) with mask.noseAndMouthCovered=false, 1 face(s) with glasses=Sunglasses" in flagged
+    assert without_faces == "Images without faces:\n- c.jpg"
+    assert failed == "Failed images:\n- d.jpg: image file does not exist"
+
+
+class _Context:
+    def __init__(self):
+        self.progress = []
+        self.logs = []
+
+    async def report_progress(self, progress, total, message):
+        self.progress.append(progress)
+
+    async def log(self, level, message):
+        self.logs.append((level, message))
+
+
+def test_progress_is_reported_per_image_but_only_failures_and_summary_are_logged(
+    tmp_path, monkeypatch, run_with_stub_registry
+):
+    for i in range(3):
+        image = cv2.imencode(".png", np.full((8, 8, 3), i, np.uint8))[1]
+        (tmp_path / f"{i}.png").write_bytes(image.tobytes())
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    monkeypatch.setattr(_detection_cache, "_cache", DetectionCache())
+    ctx = _Context()
+
+    async def detect(image_content, **kwargs):
+        return []
+
+    async def run():
+        _clients.get_client_registry().face = SimpleNamespace(detect=detect)
+        return await detect_faces_in_batch(str(tmp_path), ctx=ctx)
+
+    run_with_stub_registry(run)
+    assert ctx.progress == [1, 2, 3, 4]
+    assert [level for level, _ in ctx.logs] == ["warning", "info"]
+    assert ctx.logs[0][1].startswith("Failed to detect faces in")
+    assert ctx.logs[1][1].startswith("Processed 4 image(s)")
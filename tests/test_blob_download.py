@@ -0,0 +1,93 @@
+import asyncio
+import os
+import pathlib
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import tools.BlobFolderTools as blob_tools
+from tools.utils._clients import ClientSettings, FaceClientRegistry, set_client_registry
+
+
+class _Downloader:
+    def __init__(self, data: bytes, fail: bool):
+        self.data = data
+        self.fail = fail
+
+    async def readinto(self, stream) -> int:
+        stream.write(self.data[: len(self.data) // 2])
+        if self.fail:
+            raise ConnectionError("connection reset")
+        stream.write(self.data[len(self.data) // 2 :])
+        return len(self.data)
+
+
+class _Container:
+    def __init__(self):
+        self.blobs = {}
+        self.downloads = []
+        self.fail = set()
+
+    def put(self, name: str, data: bytes, modified: int):
+        self.blobs[name] = (data, datetime.fromtimestamp(modified, timezone.utc))
+
+    async def list_blobs(self, name_starts_with: str):
+        for name, (data, modified) in self.blobs.items():
+            if name.startswith(name_starts_with):
+                yield SimpleNamespace(name=name, size=len(data), last_modified=modified, etag=f'"{modified}"')
+
+    async def download_blob(self, name: str, **kwargs):
+        self.downloads.append(name)
+        return _Downloader(self.blobs[name][0], name in self.fail)
+
+
+@pytest.fixture
+def container(monkeypatch):
+    container = _Container()
+    registry = FaceClientRegistry(ClientSettings())
+    monkeypatch.setattr(registry, "container_client", lambda *args: container)
+    set_client_registry(registry)
+    for name in ("AZURE_STORAGE_ACCOUNT", "AZURE_STORAGE_CONTAINER", "AZURE_STORAGE_SAS_TOKEN"):
+        monkeypatch.setenv(name, "x")
+    yield container
+    set_client_registry(None)
+
+
+def _download(local_dir) -> str:
+    return asyncio.run(blob_tools.download_blob_folder_from_container("alice", str(local_dir)))
+
+
+def test_resync_downloads_only_new_or_changed_blobs(container, tmp_path):
+    for i in range(5):
+        container.put(f"alice/{i}.jpg", bytes([i]) * 100, 1_700_000_000)
+    container.put("alice/sub/5.jpg", b"x" * 10, 1_700_000_000)
+    assert "Downloaded 6 files" in _download(tmp_path)
+    assert (tmp_path / "sub" / "5.jpg").read_bytes() == b"x" * 10
+
+    container.downloads.clear()
+    result = _download(tmp_path)
+    assert "Downloaded 0 files" in result and "6 unchanged files were skipped" in result
+    assert container.downloads == []
+
+    container.put("alice/1.jpg", b"new" * 50, 1_700_000_100)
+    container.put("alice/6.jpg", b"y", 1_700_000_000)
+    result = _download(tmp_path)
+    assert sorted(container.downloads) == ["alice/1.jpg", "alice/6.jpg"]
+    assert "Downloaded 2 files" in result and "5 unchanged" in result
+    assert (tmp_path / "1.jpg").read_bytes() == b"new" * 50
+
+
+def test_failed_download_leaves_no_partial_file(container, tmp_path):
+    container.put("alice/0.jpg", b"old" * 10, 1_700_000_000)
+    _download(tmp_path)
+    container.put("alice/0.jpg", b"new" * 1000, 1_700_000_100)
+    container.fail.add("alice/0.jpg")
+    result = _download(tmp_path)
+    assert "Failed to download 1 files" in result and "connection reset" in result
+    # The previous version is kept and no temporary file is left behind
+    assert os.listdir(tmp_path) == ["0.jpg"]
+    assert (tmp_path / "0.jpg").read_bytes() == b"old" * 10
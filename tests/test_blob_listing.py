@@ -0,0 +1,106 @@
+import asyncio
+import pathlib
+import sys
+
+from aiohttp import web
+from azure.storage.blob.aio import ContainerClient
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._blob_listing import BlobListingCache, list_blob_page
+import tools.utils._blob_listing as blob_listing
+
+BLOBS = [f"alice/{i:03}.{'txt' if i % 4 == 0 else 'jpg'}" for i in range(10)] + [
+    "bob/1.jpg",
+    "carol/sub/1.png",
+    "readme.md",
+]
+
+
+def _blob_xml(name: str) -> str:
+    return (
+        f"<Blob><Name>{name}</Name><Properties><Content-Length>1</Content-Length>"
+        "<BlobType>BlockBlob</BlobType></Properties></Blob>"
+    )
+
+
+CALLS = []
+
+
+async def _list(request: web.Request) -> web.Response:
+    # Minimal List Blobs: the marker is the index of the first entry of the page
+    CALLS.append(request.query_string)
+    prefix = request.query.get("prefix", "")
+    size = int(request.query["maxresults"])
+    start = int(request.query.get("marker") or 0)
+    entries = [name for name in BLOBS if name.startswith(prefix)]
+    if "delimiter" in request.query:
+        # Names below a sub-folder collapse into one "<prefix><folder>/" entry
+        entries = sorted(
+            {prefix + name[len(prefix) :].partition("/")[0] + "/" if "/" in name[len(prefix) :] else name for name in entries}
+        )
+    page = entries[start : start + size]
+    items = "".join(
+        f"<BlobPrefix><Name>{name}</Name></BlobPrefix>" if name.endswith("/") else _blob_xml(name)
+        for name in page
+    )
+    next_marker = str(start + size) if start + size < len(entries) else ""
+    body = (
+        '<?xml version="1.0" encoding="utf-8"?><EnumerationResults>'
+        f"<Blobs>{items}</Blobs><NextMarker>{next_marker}</NextMarker></EnumerationResults>"
+    )
+    return web.Response(body=body, content_type="application/xml")
+
+
+def _run(scenario):
+    async def _main():
+        CALLS.clear()
+        app = web.Application()
+        app.router.add_get("/images", _list)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        blob_listing._cache = BlobListingCache(ttl_seconds=30)
+        client = ContainerClient(f"http://127.0.0.1:{port}", "images", credential="sig=x")
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    return asyncio.run(_main())
+
+
+def test_pages_follow_the_cursor_and_keep_images_only():
+    async def _scenario(client):
+        pages = []
+        cursor = None
+        while True:
+            page = await list_blob_page(client, "alice/", 4, cursor, suffixes=(".jpg",))
+            pages.append(page.names)
+            if not (cursor := page.next_cursor):
+                return pages
+
+    pages = _run(_scenario)
+    assert pages == [
+        ("alice/001.jpg", "alice/002.jpg", "alice/003.jpg"),
+        ("alice/005.jpg", "alice/006.jpg", "alice/007.jpg"),
+        ("alice/009.jpg",),
+    ]
+
+
+def test_folders_are_listed_and_repeated_listings_are_cached():
+    async def _scenario(client):
+        first = await list_blob_page(client, "", 2, folders=True)
+        again = await list_blob_page(client, "", 2, folders=True)
+        second = await list_blob_page(client, "", 2, first.next_cursor, folders=True)
+        return first, again, second, len(CALLS)
+
+    first, again, second, calls = _run(_scenario)
+    assert first.names == ("alice", "bob") and again == first
+    # readme.md sits at the top level and is not a folder
+    assert second.names == ("carol",) and second.next_cursor is None
+    assert calls == 2
+    assert blob_listing.get_listing_cache().stats()["hits"] == 1
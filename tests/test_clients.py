@@ -0,0 +1,30 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._clients import ClientSettings, FaceClientRegistry
+
+
+def test_registry_must_be_closed_before_moving_to_another_loop():
+    registry = FaceClientRegistry(ClientSettings())
+
+    async def _open():
+        return registry.http_session()
+
+    async def _open_and_close():
+        session = registry.http_session()
+        await registry.aclose()
+        return session
+
+    asyncio.run(_open())
+    # The session of the finished loop was never closed, so it cannot be dropped silently
+    with pytest.raises(RuntimeError, match="aclose"):
+        asyncio.run(_open())
+    asyncio.run(registry.aclose())
+    session = asyncio.run(_open_and_close())
+    assert session.closed
+    asyncio.run(_open_and_close())
@@ -0,0 +1,33 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._concurrency import gather_bounded
+
+
+def test_results_keep_input_order_and_a_failure_cancels_the_rest():
+    finished = []
+
+    async def _work(i):
+        await asyncio.sleep(0.01 * (5 - i))
+        if i == 3:
+            raise ValueError(i)
+        await asyncio.sleep(0.05)
+        finished.append(i)
+        return i
+
+    async def run():
+        assert await gather_bounded((asyncio.sleep(0.01 * i, i) for i in range(5)), 2) == [
+            0, 1, 2, 3, 4,
+        ]
+        with pytest.raises(ValueError):
+            await gather_bounded((_work(i) for i in range(5)), 5)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    # The awaitables still running when 3 failed were cancelled instead of running on
+    assert finished == []
@@ -0,0 +1,110 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from azure.ai.vision.face.models import FaceDetectionResult
+
+from tools.utils._detection_cache import DetectionCache, _cache_key
+
+
+def _faces(face_id: str, count: int = 1) -> list[FaceDetectionResult]:
+    return [
+        FaceDetectionResult(
+            {
+                "faceId": f"{face_id}-{i}",
+                "faceRectangle": {"top": i, "left": i, "width": 10, "height": 10},
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def test_hit_returns_copy_and_counts():
+    cache = DetectionCache()
+    calls = []
+
+    async def detect():
+        calls.append(1)
+        return _faces("a")
+
+    async def run():
+        first = await cache.get_or_detect(("k",), detect)
+        second = await cache.get_or_detect(("k",), detect)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert second[0].face_id == first[0].face_id
+    second[0].face_rectangle.left = 999
+    assert cache.get(("k",))[0].face_rectangle.left == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_entries():
+    cache = DetectionCache(max_entries=2)
+    cache.put(("a",), _faces("a"))
+    cache.put(("b",), _faces("b"))
+    assert cache.get(("a",)) is not None  # "a" is now most recently used
+    cache.put(("c",), _faces("c"))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    one_face_size = cache_size_of(_faces("a"))
+    cache = DetectionCache(max_bytes=one_face_size * 2)
+    cache.put(("a",), _faces("a"))
+    cache.put(("b",), _faces("b"))
+    cache.put(("c",), _faces("c"))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= one_face_size * 2
+    cache.put(("big",), _faces("big", count=10))
+    assert cache.get(("big",)) is None
+
+
+def cache_size_of(faces) -> int:
+    cache = DetectionCache()
+    cache.put(("x",), faces)
+    return cache.stats()["bytes"]
+
+
+def test_expired_face_ids_are_not_returned():
+    cache = DetectionCache(ttl_seconds=0)
+    cache.put(("a",), _faces("a"))
+    assert cache.get(("a",)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_ttl_never_exceeds_face_id_lifetime():
+    assert DetectionCache(ttl_seconds=10**9).ttl_seconds <= 86400
+
+
+def test_concurrent_requests_share_one_detect():
+    cache = DetectionCache()
+    calls = []
+
+    async def detect():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _faces("a")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_detect(("k",), detect) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r[0].face_id == "a-0" for r in results)
+
+
+def test_key_depends_on_models_and_attributes():
+    base = {"detection_model": "detection_03", "recognition_model": "recognition_04", "return_face_id": True}
+    key = _cache_key(("sha256", "x"), base)
+    assert key != _cache_key(("sha256", "x"), {**base, "return_face_attributes": ["glasses"]})
+    assert key != _cache_key(("sha256", "x"), {**base, "detection_model": "detection_01"})
+    assert _cache_key(("sha256", "x"), {**base, "return_face_attributes": ["mask", "glasses"]}) == _cache_key(
+        ("sha256", "x"), {**base, "return_face_attributes": ["glasses", "mask"]}
+    )
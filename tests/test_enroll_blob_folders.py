@@ -0,0 +1,56 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+from azure.core.exceptions import ServiceRequestError
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools import EnrollBlobFoldersToLPG
+from tools.utils import _clients, _group_index
+from tools.utils._group_index import GroupIndex
+from tools.utils._training import TrainingScheduler
+
+
+class _Container:
+    """Blob container of person folders; listing `broken/` fails after its first blob."""
+
+    def __init__(self, folders):
+        self.folders = folders
+
+    async def walk_blobs(self, name_starts_with, delimiter):
+        for folder in self.folders:
+            yield SimpleNamespace(name=f"{folder}/")
+
+    async def list_blobs(self, name_starts_with):
+        for name in self.folders[name_starts_with.rstrip("/")]:
+            yield SimpleNamespace(name=f"{name_starts_with}{name}")
+        if name_starts_with == "broken/":
+            raise ServiceRequestError("connection reset")
+
+
+def test_failing_images_and_folders_do_not_abort_the_import(monkeypatch, run_with_stub_registry):
+    for name in ("AZURE_STORAGE_ACCOUNT", "AZURE_STORAGE_CONTAINER", "AZURE_STORAGE_SAS_TOKEN"):
+        monkeypatch.setenv(name, "x")
+    container = _Container({"alice": ["1.jpg", "2.jpg"], "broken": ["1.jpg"], "bob": ["1.jpg"]})
+    scheduler = TrainingScheduler(quiet_period=60)
+    monkeypatch.setattr(_group_index, "_index", GroupIndex())
+    monkeypatch.setattr(EnrollBlobFoldersToLPG, "get_training_scheduler", lambda: scheduler)
+
+    async def enroll_image(url, person_task, *args):
+        if "bob" in url:
+            raise RuntimeError("unexpected")
+        await person_task
+        return [f"added {url}"], True
+
+    monkeypatch.setattr(EnrollBlobFoldersToLPG, "enroll_image", enroll_image)
+
+    async def run():
+        _clients.get_client_registry().container_client = lambda *args: container
+        return await EnrollBlobFoldersToLPG.enroll_blob_folders_to_group("g1")
+
+    result, lpg = run_with_stub_registry(run)
+    assert "Folder 'broken/' could not be fully enrolled: connection reset." in result
+    assert "bob/1.jpg?x could not be enrolled: unexpected." in result
+    assert "Enrolled 3 face(s) for 3 person(s) from 3 folder(s)" in result
+    assert scheduler.status("g1")["g1"].pending_mutations == 3
@@ -0,0 +1,57 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from azure.ai.vision.face.models import FaceDetectionResult
+from azure.core.exceptions import HttpResponseError
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools import EnrollFaceToLPG
+from tools.utils import _clients, _detection_cache, _group_index
+from tools.utils._detection_cache import DetectionCache
+from tools.utils._group_index import GroupIndex
+from tools.utils._training import TrainingScheduler
+
+
+def _write_images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"{i}.png"
+        path.write_bytes(cv2.imencode(".png", np.full((32, 32, 3), i, np.uint8))[1].tobytes())
+        paths.append(str(path))
+    return paths
+
+
+def test_failing_image_is_reported_and_the_others_are_still_trained(
+    tmp_path, monkeypatch, run_with_stub_registry
+):
+    paths = _write_images(tmp_path, 3)
+    bad = pathlib.Path(paths[1]).read_bytes()
+    scheduler = TrainingScheduler(quiet_period=60)
+    monkeypatch.setattr(_detection_cache, "_cache", DetectionCache())
+    monkeypatch.setattr(_group_index, "_index", GroupIndex())
+    monkeypatch.setattr(EnrollFaceToLPG, "get_training_scheduler", lambda: scheduler)
+
+    async def detect(image_content, **kwargs):
+        if image_content == bad:
+            raise HttpResponseError(message="(InvalidImage) Decoding error.")
+        return [
+            FaceDetectionResult(
+                {"faceId": "f", "faceRectangle": {"top": 1, "left": 1, "width": 8, "height": 8}}
+            )
+        ]
+
+    async def run():
+        _clients.get_client_registry().face = SimpleNamespace(detect=detect)
+        return await EnrollFaceToLPG.enroll_face_to_group(
+            paths, "Alice", "g1", check_quality=False
+        )
+
+    result, lpg = run_with_stub_registry(run)
+    assert f"Image file: {paths[1]} could not be enrolled: (InvalidImage)" in result
+    assert result.count("Add image file:") == 2
+    assert len(lpg.persons[0].persisted_face_ids) == 2
+    assert scheduler.status("g1")["g1"].pending_mutations == 2
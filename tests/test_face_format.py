@@ -0,0 +1,75 @@
+import json
+import pathlib
+import sys
+
+from azure.ai.vision.face.models import FaceAttributeType, FaceDetectionResult
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._face_format import format_faces
+
+_LANDMARK_NAMES = (
+    "pupilLeft", "pupilRight", "noseTip", "mouthLeft", "mouthRight", "eyebrowLeftOuter",
+    "eyebrowLeftInner", "eyeLeftOuter", "eyeLeftTop", "eyeLeftBottom", "eyeLeftInner",
+    "eyebrowRightInner", "eyebrowRightOuter", "eyeRightInner", "eyeRightTop",
+    "eyeRightBottom", "eyeRightOuter", "noseRootLeft", "noseRootRight", "noseLeftAlarTop",
+    "noseRightAlarTop", "noseLeftAlarOutTip", "noseRightAlarOutTip", "upperLipTop",
+    "upperLipBottom", "underLipTop", "underLipBottom",
+)
+
+
+def _face(i: int, with_mask: bool = True) -> FaceDetectionResult:
+    attributes = {
+        "headPose": {"pitch": -3.123456, "roll": 1.987654, "yaw": 12.345678},
+        "glasses": "NoGlasses",
+        "age": 30.123456 + i,
+        "blur": {"blurLevel": "low", "value": 0.0123456},
+    }
+    if with_mask:
+        attributes["mask"] = {"type": "noMask", "noseAndMouthCovered": False}
+    return FaceDetectionResult(
+        {
+            "faceId": f"face-{i}",
+            "faceRectangle": {"top": 10 * i, "left": 20 * i, "width": 80, "height": 90},
+            "faceLandmarks": {
+                name: {"x": 100.123456 + n, "y": 200.654321 + n}
+                for n, name in enumerate(_LANDMARK_NAMES)
+            },
+            "faceAttributes": attributes,
+        }
+    )
+
+
+def test_json_rows_round_floats_and_keep_returned_fields_only():
+    payload = json.loads(format_faces([_face(0)], "json"))
+    face = payload["faces"][0]
+    assert payload["count"] == 1
+    assert face["faceAttributes"]["age"] == 30.12
+    assert face["faceAttributes"]["headPose"] == {"pitch": -3.12, "roll": 1.99, "yaw": 12.35}
+    assert face["faceLandmarks"]["pupilLeft"] == [100, 201]
+    assert "occlusion" not in face["faceAttributes"]
+
+
+def test_columnar_layout_is_parallel_arrays_and_much_smaller_than_text():
+    faces = [_face(i, with_mask=i != 1) for i in range(20)]
+    payload = json.loads(format_faces(faces, "columnar"))
+    columns = payload["columns"]
+    assert payload["count"] == 20
+    assert columns["faceId"][:2] == ["face-0", "face-1"]
+    assert columns["faceAttributes.age"][3] == 33.12
+    # Missing fields stay aligned with the face order
+    assert columns["faceAttributes.mask.type"][1] is None
+    assert all(len(column) == 20 for column in columns.values())
+    assert columns["faceLandmarks.noseTip"][0] == [102, 203]
+    text_size = sum(len(str(face)) for face in faces)
+    assert len(format_faces(faces, "json")) * 3 < text_size * 2
+    assert len(format_faces(faces, "columnar")) * 3 < text_size
+
+
+def test_only_requested_attributes_are_kept():
+    payload = json.loads(
+        format_faces([_face(0)], "json", [FaceAttributeType.AGE, FaceAttributeType.MASK])
+    )
+    assert set(payload["faces"][0]["faceAttributes"]) == {"age", "mask"}
+    payload = json.loads(format_faces([_face(0)], "json", []))
+    assert "faceAttributes" not in payload["faces"][0]
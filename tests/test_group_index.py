@@ -0,0 +1,112 @@
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils import _clients, _group_index
+from tools.utils._group_index import GroupIndex
+
+
+def _person(i: int, faces: int = 1):
+    return SimpleNamespace(
+        person_id=f"p{i:04d}",
+        name=f"Person {i}",
+        user_data=None,
+        persisted_face_ids=[f"f{i}-{j}" for j in range(faces)],
+    )
+
+
+def test_sync_pages_through_all_persons(monkeypatch, run_with_stub_registry):
+    monkeypatch.setattr(_group_index, "PAGE_SIZE", 2)
+    index = GroupIndex()
+
+    _, lpg = run_with_stub_registry(
+        lambda: index.sync_group("g1", include_face_details=False),
+        [_person(i) for i in range(5)],
+    )
+    assert lpg.get_persons_calls == [None, "p0001", "p0003"]
+    assert len(index.list_persons("g1")) == 5
+    assert lpg.get_face_calls == 0
+
+
+def test_resync_only_fetches_new_faces(run_with_stub_registry):
+    index = GroupIndex()
+    persons = [_person(0, faces=2)]
+    _, lpg = run_with_stub_registry(lambda: index.sync_group("g1"), persons)
+    assert lpg.get_face_calls == 2
+
+    persons.append(_person(1))
+    _, lpg = run_with_stub_registry(lambda: index.sync_group("g1"), persons)
+    assert lpg.get_face_calls == 1
+    assert index.list_persons("g1")[1][2] == [("f1-0", json.dumps({"file_path": "/faces/f1-0.jpg"}), "/faces/f1-0.jpg")]
+
+
+def test_fresh_group_is_answered_locally(run_with_stub_registry):
+    index = GroupIndex()
+    _, lpg = run_with_stub_registry(lambda: index.ensure_group("g1"), [_person(0)])
+    assert lpg.get_persons_calls == [None]
+    _, lpg = run_with_stub_registry(lambda: index.ensure_group("g1"), [_person(0)])
+    assert lpg.get_persons_calls == []
+
+
+def test_write_through_and_search():
+    index = GroupIndex()
+    index.upsert_group("g1", "g1")
+    index.upsert_person("g1", "p1", "Bob")
+    index.add_face("g1", "p1", "f1", json.dumps({"file_path": "https://x/reco/Bob/1.jpg"}))
+    index.add_face("g1", "p1", "f2", json.dumps({"file_path": "https://x/reco/Bob/2.jpg"}))
+    index.upsert_person("g1", "p2", "Emily")
+    assert [face[0] for face in index.list_persons("g1")[0][2]] == ["f1", "f2"]
+    assert index.search("emily") == [("g1", "p2", "Emily", None)]
+    assert index.search("2.jpg") == [("g1", "p1", "Bob", "https://x/reco/Bob/2.jpg")]
+
+    index.delete_face("g1", "p1", "f1")
+    assert [face[0] for face in index.list_persons("g1")[0][2]] == ["f2"]
+    index.delete_person("g1", "p2")
+    assert index.search("emily") == []
+    index.delete_group("g1")
+    assert index.list_groups() == []
+    assert index.list_persons("g1") == []
+
+
+def test_search_matches_wildcard_characters_literally():
+    index = GroupIndex()
+    index.upsert_group("g1", "g1")
+    index.upsert_person("g1", "p1", "a_b")
+    index.upsert_person("g1", "p2", "axb")
+    index.upsert_person("g1", "p3", "50% off")
+    index.upsert_person("g1", "p4", "500 off")
+    index.upsert_person("g1", "p5", "back\\slash")
+    assert [row[2] for row in index.search("a_b")] == ["a_b"]
+    assert [row[2] for row in index.search("50%")] == ["50% off"]
+    assert [row[2] for row in index.search("k\\s")] == ["back\\slash"]
+
+
+def test_face_enrolled_during_sync_is_kept(run_with_stub_registry):
+    index = GroupIndex()
+    index.upsert_person("g1", "p0000", "Person 0")
+
+    async def sync():
+        lpg = _clients.get_client_registry().lpg
+        get_persons = lpg.get_persons
+
+        async def get_persons_while_enrolling(*args, **kwargs):
+            page = [
+                SimpleNamespace(**{**vars(p), "persisted_face_ids": list(p.persisted_face_ids)})
+                for p in await get_persons(*args, **kwargs)
+            ]
+            if len(lpg.get_persons_calls) == 1:
+                # The enroll tool adds a face after the first listing was answered
+                lpg.persons[0].persisted_face_ids.append("new")
+                index.add_face("g1", "p0000", "new", None)
+            return page
+
+        lpg.get_persons = get_persons_while_enrolling
+        await index.sync_group("g1", include_face_details=False)
+
+    _, lpg = run_with_stub_registry(sync, [_person(0)])
+    assert lpg.get_persons_calls == [None, None]
+    assert [face[0] for face in index.list_persons("g1")[0][2]] == ["f0-0", "new"]
+    assert index.is_fresh("group:g1")
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import pathlib
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._clients import get_client_registry
+from tools.utils._image_cache import CACHE_SUBDIR, ImageCache, cache_url_key
+
+IMAGES = {}
+REQUESTS = []
+
+
+async def _image(request: web.Request) -> web.StreamResponse:
+    REQUESTS.append((request.path, request.headers.get("If-None-Match")))
+    body = IMAGES.get(request.path)
+    if body is None:
+        return web.Response(status=404)
+    etag = f'"{hash(body)}"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    await asyncio.sleep(0.05)
+    return web.Response(body=body, headers={"ETag": etag})
+
+
+def _run(scenario, cache: ImageCache):
+    async def _main():
+        REQUESTS.clear()
+        app = web.Application()
+        app.router.add_get("/{name}", _image)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        try:
+            return await scenario(base)
+        finally:
+            cache.close()
+            await get_client_registry().aclose()
+            await runner.cleanup()
+
+    return asyncio.run(_main())
+
+
+def test_url_key_drops_sas_token_only():
+    url = "https://acct.blob.core.windows.net/c/a.jpg?sv=2022-11-02&sp=r&se=2030&sig=abc%3D"
+    assert cache_url_key(url) == "https://acct.blob.core.windows.net/c/a.jpg"
+    assert cache_url_key("https://Example.com/img?id=3&sp=1#x") == "https://example.com/img?id=3&sp=1"
+
+
+def test_images_are_downloaded_once_and_revalidated_by_etag(tmp_path):
+    IMAGES.update({"/a.jpg": b"a" * 1000, "/b.jpg": b"a" * 1000})
+    cache = ImageCache(str(tmp_path), revalidate_seconds=60)
+
+    async def _scenario(base):
+        first = await asyncio.gather(*(cache.fetch(f"{base}/a.jpg?sig=1") for _ in range(5)))
+        again = await cache.fetch(f"{base}/a.jpg?sig=2")
+        cache.revalidate_seconds = 0
+        revalidated = await cache.fetch(f"{base}/a.jpg?sig=3")
+        same_content = await cache.fetch(f"{base}/b.jpg")
+        missing = await cache.fetch(f"{base}/missing.jpg")
+        return first, again, revalidated, same_content, missing, cache.stats()
+
+    first, again, revalidated, same_content, missing, stats = _run(_scenario, cache)
+    assert len({image.path for image in first}) == 1 and again == first[0]
+    assert revalidated == first[0] and same_content.path == first[0].path
+    assert missing.status == 404 and missing.path is None
+    # One download shared by the concurrent fetches, one 304 revalidation, b.jpg, missing.jpg
+    assert [path for path, _ in REQUESTS] == ["/a.jpg", "/a.jpg", "/b.jpg", "/missing.jpg"]
+    assert REQUESTS[1][1] is not None
+    assert stats["revalidated"] == 1 and stats["entries"] == 2 and stats["bytes"] == 1000
+
+
+def test_least_recently_used_images_are_evicted_over_the_byte_budget(tmp_path):
+    IMAGES.update({f"/{i}.jpg": bytes([i]) * 400 for i in range(4)})
+    cache = ImageCache(str(tmp_path), max_bytes=1000)
+
+    async def _scenario(base):
+        for i in (0, 1, 0, 2, 3):
+            await cache.fetch(f"{base}/{i}.jpg")
+        return await cache.fetch(f"{base}/0.jpg"), cache.stats()
+
+    image, stats = _run(_scenario, cache)
+    # 1.jpg was least recently used and made way for 2.jpg, 0.jpg for 3.jpg, 2.jpg for 0.jpg
+    assert stats["evictions"] == 3 and stats["bytes"] == 800
+    assert [path for path, _ in REQUESTS].count("/0.jpg") == 2
+    assert len([name for name in os.listdir(tmp_path / CACHE_SUBDIR) if name != "index.sqlite"]) == 2
+    assert pathlib.Path(image.path).read_bytes() == b"\x00" * 400
+
+
+def test_only_stale_cache_files_are_removed_from_the_private_subdirectory(tmp_path):
+    (tmp_path / "my_photo.jpg").write_bytes(b"mine")
+    content_dir = tmp_path / CACHE_SUBDIR
+    content_dir.mkdir(mode=0o755)
+    stale, fresh = "a" * 64, "b" * 64
+    for name in (stale, fresh, "old.part", "new.part", "notes.txt"):
+        (content_dir / name).write_bytes(b"x")
+    for name in (stale, "old.part", "notes.txt"):
+        os.utime(content_dir / name, (0, 0))
+    cache = ImageCache(str(tmp_path))
+    cache._open()
+    cache.close()
+    assert (tmp_path / "my_photo.jpg").read_bytes() == b"mine"
+    assert sorted(os.listdir(content_dir)) == sorted([fresh, "index.sqlite", "new.part", "notes.txt"])
+    if os.name == "posix":
+        assert content_dir.stat().st_mode & 0o777 == 0o700
@@ -0,0 +1,116 @@
+import asyncio
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import aiohttp
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils import _image_source
+from tools.utils._image_cache import CachedImage
+from tools.utils._image_source import ImageSource
+
+
+def _load(path, **kwargs) -> ImageSource:
+    image = ImageSource(str(path), **kwargs)
+    asyncio.run(image.load())
+    return image
+
+
+def test_local_image_is_read_once_into_memory(tmp_path):
+    path = tmp_path / "face.jpg"
+    path.write_bytes(b"jpeg-bytes")
+    image = _load(path)
+    assert image.ok
+    assert image._mmap is None
+    assert image.face_source()["image_content"].tobytes() == b"jpeg-bytes"
+    image.close()
+    assert image.content is None
+
+
+def test_large_local_image_is_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(_image_source, "MMAP_THRESHOLD", 4)
+    path = tmp_path / "face.jpg"
+    path.write_bytes(b"large-jpeg-bytes")
+    image = _load(path)
+    assert image._mmap is not None
+    assert bytes(image.content) == b"large-jpeg-bytes"
+    mapping = image._mmap
+    image.close()
+    assert mapping.closed
+
+
+def test_memory_map_is_closed_even_if_the_view_is_still_referenced(tmp_path, monkeypatch):
+    monkeypatch.setattr(_image_source, "MMAP_THRESHOLD", 4)
+    path = tmp_path / "face.jpg"
+    path.write_bytes(b"large-jpeg-bytes")
+    image = _load(path)
+    image.content.release()
+
+    class _ExportedView:
+        def release(self):
+            raise BufferError("memoryview has 1 exported buffer")
+
+    image._content = _ExportedView()
+    mapping = image._mmap
+    image.close()
+    assert mapping.closed
+
+
+def test_missing_local_image_is_not_ok(tmp_path):
+    image = _load(tmp_path / "missing.jpg")
+    assert not image.ok
+
+
+def test_url_is_read_from_the_image_cache_or_left_for_the_service(tmp_path, monkeypatch):
+    cached = tmp_path / "cached.jpg"
+    cached.write_bytes(b"jpeg-bytes")
+    fetched = []
+
+    async def _fetch(url):
+        fetched.append(url)
+        return CachedImage(200, str(cached)) if "cached" in url else CachedImage(403)
+
+    monkeypatch.setattr(
+        _image_source, "get_image_cache", lambda: SimpleNamespace(enabled=True, fetch=_fetch)
+    )
+    image = _load("https://example.com/cached.jpg", is_url=True)
+    assert image.ok and image.face_source()["image_content"].tobytes() == b"jpeg-bytes"
+    image = _load("https://example.com/private.jpg", is_url=True)
+    assert image.ok
+    assert image.face_source() == {"url": "https://example.com/private.jpg"}
+    assert not _load("https://example.com/private.jpg", is_url=True, download=True).ok
+    assert len(fetched) == 3
+
+
+def test_unreachable_url_is_reported_instead_of_raised(monkeypatch):
+    async def _fetch(url):
+        raise aiohttp.ClientConnectionError("Connection refused")
+
+    cache = SimpleNamespace(enabled=True, fetch=_fetch)
+    monkeypatch.setattr(_image_source, "get_image_cache", lambda: cache)
+    image = _load("https://example.com/face.jpg", is_url=True, download=True)
+    assert not image.ok and image.status is None
+    assert image.error == "Connection refused"
+    # Without download the Face service still gets a chance to fetch the URL itself
+    assert _load("https://example.com/face.jpg", is_url=True).ok
+
+
+def test_prepared_upload_is_computed_once(tmp_path, monkeypatch):
+    calls = []
+
+    async def _prepare(data):
+        calls.append(bytes(data))
+        return "prepared"
+
+    monkeypatch.setattr(_image_source, "prepare_upload", _prepare)
+    path = tmp_path / "face.jpg"
+    path.write_bytes(b"jpeg-bytes")
+    image = _load(path)
+
+    async def _twice():
+        return await image.prepared(), await image.prepared()
+
+    assert asyncio.run(_twice()) == ("prepared", "prepared")
+    assert calls == [b"jpeg-bytes"]
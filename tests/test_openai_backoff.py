@@ -0,0 +1,63 @@
+import asyncio
+import pathlib
+import sys
+import time
+
+import httpx2
+from openai import RateLimitError
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._openai_backoff import RateLimitBackoff, _retry_after
+
+
+def _rate_limit_error(headers=None):
+    request = httpx2.Request("POST", "https://example.openai.azure.com/chat/completions")
+    response = httpx2.Response(429, headers=headers or {}, request=request)
+    return RateLimitError("Too Many Requests", response=response, body=None)
+
+
+def test_retry_after_prefers_milliseconds_header():
+    assert _retry_after(_rate_limit_error({"retry-after-ms": "250", "retry-after": "3"})) == 0.25
+    assert _retry_after(_rate_limit_error({"retry-after": "2"})) == 2.0
+    assert _retry_after(_rate_limit_error()) is None
+
+
+def test_throttled_request_is_retried_after_retry_after():
+    calls = []
+
+    async def request(value):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise _rate_limit_error({"retry-after-ms": "50"})
+        return value
+
+    result = asyncio.run(RateLimitBackoff(max_retries=5).call(request, "ok"))
+    assert result == "ok"
+    assert len(calls) == 3
+    assert calls[2] - calls[0] >= 0.09
+
+
+def test_pause_is_shared_and_retries_are_bounded():
+    async def run():
+        backoff = RateLimitBackoff(max_retries=1)
+
+        async def throttled():
+            raise _rate_limit_error({"retry-after-ms": "100"})
+
+        async def ok():
+            return time.monotonic()
+
+        start = time.monotonic()
+        throttled_task = asyncio.create_task(backoff.call(throttled))
+        await asyncio.sleep(0.01)
+        # Sent while the deployment is throttled, so it waits for the shared pause
+        finished = await backoff.call(ok)
+        assert finished - start >= 0.09
+        try:
+            await throttled_task
+        except RateLimitError:
+            return
+        raise AssertionError("RateLimitError was not raised after max_retries")
+
+    asyncio.run(run())
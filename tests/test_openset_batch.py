@@ -0,0 +1,42 @@
+import asyncio
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.OpensetFaceAttrib import _ask_attributes_batch
+
+
+def _stub_client(content: str):
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, requests
+
+
+def test_batch_sends_all_crops_in_one_json_request():
+    reply = {"faces": {"1": {"Hair Color": "brown", "glasses": "none"}, "2": {"hair color": "black"}}}
+    client, requests = _stub_client(json.dumps(reply))
+    answers = asyncio.run(
+        _ask_attributes_batch(client, ["AAAA", "BBBB"], ["hair color", "glasses"])
+    )
+    assert len(requests) == 1
+    assert requests[0]["response_format"] == {"type": "json_object"}
+    image_parts = [p for p in requests[0]["messages"][0]["content"] if p["type"] == "image_url"]
+    assert len(image_parts) == 2
+    # Attribute names are matched case-insensitively; missing answers are left out
+    assert answers == [{"hair color": "brown", "glasses": "none"}, {"hair color": "black"}]
+
+
+def test_batch_returns_no_answers_for_invalid_json():
+    client, _ = _stub_client("not json")
+    answers = asyncio.run(_ask_attributes_batch(client, ["AAAA"], ["hair color"]))
+    assert answers == [{}]
@@ -0,0 +1,36 @@
+import base64
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools import OpensetFaceAttrib
+from tools.OpensetFaceAttrib import _crop_face
+
+
+def _decode(cropped_img_str: str):
+    data = np.frombuffer(base64.b64decode(cropped_img_str), dtype=np.uint8)
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def test_crop_is_clamped_to_image_bounds():
+    source_img = np.full((100, 200, 3), 128, dtype=np.uint8)
+    rectangle = SimpleNamespace(left=0, top=0, width=40, height=40)
+    cropped_img_str, size = _crop_face(source_img, rectangle, 1.5)
+    # The dilated rectangle reaches past the top-left corner; only the part inside is kept
+    assert _decode(cropped_img_str).shape[:2] == (50, 50)
+    assert size == len(base64.b64decode(cropped_img_str))
+
+
+def test_large_crop_is_resized_and_fits_byte_budget(monkeypatch):
+    monkeypatch.setattr(OpensetFaceAttrib, "CROP_MAX_SIDE", 256)
+    monkeypatch.setattr(OpensetFaceAttrib, "CROP_MAX_BYTES", 40 * 1024)
+    source_img = (np.random.default_rng(0).random((1200, 1600, 3)) * 255).astype(np.uint8)
+    rectangle = SimpleNamespace(left=400, top=200, width=800, height=600)
+    cropped_img_str, size = _crop_face(source_img, rectangle, 1.0)
+    assert max(_decode(cropped_img_str).shape[:2]) == 256
+    assert size <= 40 * 1024
@@ -0,0 +1,77 @@
+import json
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils import _group_index
+from tools.utils._group_index import GroupIndex
+from tools.utils._person_cache import PersonNameCache
+
+
+def _person(i: int):
+    return SimpleNamespace(
+        person_id=f"p{i}", name=f"Person {i}", user_data=None, persisted_face_ids=[f"f{i}"]
+    )
+
+
+def test_group_is_loaded_once_and_only_candidates_get_details(monkeypatch, run_with_stub_registry):
+    monkeypatch.setattr(_group_index, "_index", GroupIndex())
+    cache = PersonNameCache()
+    persons = [_person(i) for i in range(5)]
+
+    async def run():
+        first = await cache.lookup("g1", ["p1"])
+        second = await cache.lookup("g1", ["p1"])
+        return first, second
+
+    (first, second), lpg = run_with_stub_registry(run, persons)
+    assert first["p1"].name == "Person 1"
+    assert first["p1"].face_user_data == (json.dumps({"file_path": "/faces/f1.jpg"}),)
+    assert second == first
+    assert len(lpg.get_persons_calls) == 1
+    assert lpg.get_face_calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_index_change_invalidates_group(monkeypatch, run_with_stub_registry):
+    index = GroupIndex()
+    monkeypatch.setattr(_group_index, "_index", index)
+    cache = PersonNameCache()
+
+    async def run():
+        await cache.lookup("g1", ["p1"])
+        index.upsert_person("g1", "p9", "Enrolled Later")
+        return await cache.lookup("g1", ["p9"])
+
+    result, lpg = run_with_stub_registry(run, [_person(1)])
+    assert result["p9"].name == "Enrolled Later"
+    assert len(lpg.get_persons_calls) == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_unknown_person_triggers_one_resync(monkeypatch, run_with_stub_registry):
+    monkeypatch.setattr(_group_index, "_index", GroupIndex())
+    cache = PersonNameCache()
+
+    async def run():
+        return await cache.lookup("g1", ["p1", "missing"])
+
+    result, lpg = run_with_stub_registry(run, [_person(1)])
+    assert set(result) == {"p1"}
+    assert len(lpg.get_persons_calls) == 2
+
+
+def test_groups_are_evicted_beyond_max_persons(monkeypatch, run_with_stub_registry):
+    monkeypatch.setattr(_group_index, "_index", GroupIndex())
+    cache = PersonNameCache(max_persons=3)
+
+    async def run():
+        await cache.lookup("g1", ["p0"])
+        await cache.lookup("g2", ["p0"])
+
+    run_with_stub_registry(run, [_person(0), _person(1)])
+    assert cache.stats()["groups"] == 1
+    assert cache.stats()["persons"] == 2
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,69 @@
+import asyncio
+import pathlib
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from azure.ai.vision.face.models import FaceDetectionResult
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._preprocess import (
+    MAX_UPLOAD_BYTES,
+    UnsupportedImageError,
+    prepare_upload,
+    project_faces,
+    sniff_image,
+)
+
+EXAMPLE = pathlib.Path(__file__).resolve().parents[1] / "example" / "detection1.jpg"
+
+
+def _encode(ext: str, width: int, height: int, noise: bool = False) -> bytes:
+    if noise:
+        image = (np.random.default_rng(0).random((height, width, 3)) * 255).astype(np.uint8)
+    else:
+        image = np.full((height, width, 3), 127, dtype=np.uint8)
+    return cv2.imencode(ext, image, [cv2.IMWRITE_JPEG_QUALITY, 100])[1].tobytes()
+
+
+def test_sniff_reads_size_from_headers():
+    assert sniff_image(_encode(".jpg", 640, 480)) == ("jpeg", 640, 480)
+    assert sniff_image(_encode(".png", 33, 44)) == ("png", 33, 44)
+    assert sniff_image(_encode(".bmp", 20, 10)) == ("bmp", 20, 10)
+    assert sniff_image(b"not an image at all") is None
+
+
+def test_small_images_are_sent_unchanged_and_corrupt_ones_rejected():
+    data = EXAMPLE.read_bytes()
+    prepared = asyncio.run(prepare_upload(data))
+    assert prepared.content is data and prepared.scale == 1.0
+    with pytest.raises(UnsupportedImageError):
+        asyncio.run(prepare_upload(b"GIF89" + b"\x00" * 10))
+    with pytest.raises(UnsupportedImageError):
+        # A valid PNG header followed by garbage cannot be downscaled
+        asyncio.run(prepare_upload(_encode(".png", 4000, 3000)[:64] + b"\x00" * 64))
+
+
+def test_large_image_is_downscaled_under_limits():
+    data = _encode(".jpg", 6000, 4000, noise=True)
+    assert len(data) > MAX_UPLOAD_BYTES
+    prepared = asyncio.run(prepare_upload(data))
+    assert sniff_image(prepared.content) == ("jpeg", 1620, 1080)
+    assert prepared.scale == pytest.approx(0.27)
+    assert len(prepared.content) <= MAX_UPLOAD_BYTES
+
+
+def test_faces_are_projected_back_to_original_coordinates():
+    face = FaceDetectionResult(
+        {
+            "faceRectangle": {"top": 27, "left": 54, "width": 27, "height": 30},
+            "faceLandmarks": {"noseTip": {"x": 67.5, "y": 40.5}},
+            "faceAttributes": {"age": 30.0},
+        }
+    )
+    (projected,) = project_faces([face], 0.27)
+    assert projected.face_rectangle.as_dict() == {"top": 100, "left": 200, "width": 100, "height": 111}
+    assert projected.face_landmarks.nose_tip.as_dict() == {"x": 250.0, "y": 150.0}
+    assert projected.face_attributes.age == 30.0
@@ -0,0 +1,83 @@
+import asyncio
+import pathlib
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._rate_limit import (
+    FaceRateLimiter,
+    RateLimitPolicy,
+    TokenBucket,
+    face_operation,
+)
+
+ENDPOINT = "https://example.cognitiveservices.azure.com/face/v1.2-preview.1"
+
+
+def test_bucket_admits_burst_then_spaces_requests_at_rate():
+    bucket = TokenBucket(rate=50, burst=5)
+
+    async def _run():
+        admitted = []
+        start = time.monotonic()
+
+        async def _acquire():
+            await bucket.acquire()
+            admitted.append(time.monotonic() - start)
+
+        await asyncio.gather(*(_acquire() for _ in range(15)))
+        return sorted(admitted)
+
+    admitted = asyncio.run(_run())
+    assert all(t < 0.01 for t in admitted[:5])
+    # The remaining 10 requests are spread over 10 / 50 = 0.2 seconds
+    assert admitted[-1] == pytest.approx(0.2, abs=0.05)
+    stats = bucket.stats()
+    assert stats["requests"] == 15 and stats["waited"] == 10
+    assert stats["max_queue_depth"] == 10 and stats["queue_depth"] == 0
+
+
+def test_operation_buckets_apply_on_top_of_the_endpoint_bucket():
+    assert face_operation(f"{ENDPOINT}/detect?returnFaceId=true") == "detect"
+    assert face_operation(f"{ENDPOINT}/largepersongroups/g1/persons") == "largepersongroups"
+    limiter = FaceRateLimiter(rate=10, operation_rates={"identify": 2})
+    assert len(limiter.buckets_for(f"{ENDPOINT}/detect")) == 1
+    assert [b.rate for b in limiter.buckets_for(f"{ENDPOINT}/identify")] == [10, 2]
+    assert FaceRateLimiter(rate=0).buckets_for(f"{ENDPOINT}/detect") == []
+
+
+class _Next:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.sent_at = []
+
+    async def send(self, request):
+        self.sent_at.append(time.monotonic())
+        status = self.statuses.pop(0)
+        return SimpleNamespace(
+            http_response=SimpleNamespace(
+                status_code=status,
+                headers={"Retry-After": "0.3"} if status == 429 else {},
+            )
+        )
+
+
+def test_429_pauses_every_request_to_the_endpoint_for_retry_after():
+    limiter = FaceRateLimiter(rate=100)
+    policy = RateLimitPolicy(limiter)
+    policy.next = _Next([429, 200])
+    request = SimpleNamespace(http_request=SimpleNamespace(url=f"{ENDPOINT}/detect"))
+
+    async def _run():
+        await policy.send(request)
+        await policy.send(request)
+
+    asyncio.run(_run())
+    first, second = policy.next.sent_at
+    assert second - first == pytest.approx(0.3, abs=0.05)
+    (stats,) = limiter.stats().values()
+    assert stats["throttled"] == 1 and stats["waited"] == 1
@@ -0,0 +1,62 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from tools.utils._training import TrainingScheduler
+
+
+def test_mutations_within_quiet_period_train_once(run_with_stub_registry):
+    scheduler = TrainingScheduler(quiet_period=0.05)
+
+    async def run():
+        for _ in range(20):
+            scheduler.mark_dirty("g1")
+        await asyncio.sleep(0.01)
+        scheduler.mark_dirty("g1")
+        assert scheduler.status("g1")["g1"].status == "pending"
+        await asyncio.sleep(0.8)
+        assert scheduler.status("g1")["g1"].status == "succeeded"
+
+    _, lpg = run_with_stub_registry(run)
+    assert lpg.train_calls == ["g1"]
+
+
+def test_flush_trains_immediately(run_with_stub_registry):
+    scheduler = TrainingScheduler(quiet_period=60)
+
+    async def run():
+        scheduler.mark_dirty("g1")
+        state = await asyncio.wait_for(scheduler.flush("g1"), timeout=5)
+        assert state.status == "succeeded"
+        assert state.pending_mutations == 0
+
+    _, lpg = run_with_stub_registry(run)
+    assert lpg.train_calls == ["g1"]
+
+
+def test_close_starts_pending_training(run_with_stub_registry):
+    scheduler = TrainingScheduler(quiet_period=60)
+
+    async def run():
+        scheduler.mark_dirty("g1")
+        scheduler.mark_dirty("g2")
+        await scheduler.aclose()
+
+    _, lpg = run_with_stub_registry(run)
+    assert sorted(lpg.train_calls) == ["g1", "g2"]
+    assert lpg.status_calls == 0
+
+
+def test_forget_cancels_scheduled_training(run_with_stub_registry):
+    scheduler = TrainingScheduler(quiet_period=0.05)
+
+    async def run():
+        scheduler.mark_dirty("g1")
+        scheduler.forget("g1")
+        await asyncio.sleep(0.2)
+        assert scheduler.status() == {}
+
+    _, lpg = run_with_stub_registry(run)
+    assert lpg.train_calls == []